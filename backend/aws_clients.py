@@ -0,0 +1,234 @@
+"""Lazily created, connection-pooled DynamoDB access for the Lambda handler.
+
+Nothing AWS-related is imported until the first table call, so routes that
+never touch DynamoDB (CORS preflight, 404s) skip the botocore import and
+client construction entirely. Tables are served by the low-level
+``dynamodb`` client (no boto3 resource model to load) behind a small
+``Table`` wrapper that keeps the boto3 ``Table`` call signatures, so the
+handler and ``local_dynamodb`` stand-ins stay interchangeable.
+
+The client is created once per container and reused across warm
+invocations, keeping its pooled HTTPS connections alive.
+
+Offline tools (export_responses.py, session_summary.py) have no Lambda
+deadline and no RetryingTable, so ``cli_table`` gives them a separate
+client with botocore standard retries instead.
+
+Configuration (environment):
+    DDB_MAX_POOL_CONNECTIONS   connection pool size (default 10)
+    DDB_CONNECT_TIMEOUT        seconds (default 1)
+    DDB_READ_TIMEOUT           seconds (default 3)
+    DDB_MAX_ATTEMPTS           botocore attempts incl. retries (default 1: retries are
+                               done by retry.RetryingTable within the Lambda deadline)
+    DDB_PREWARM                "1" to build the client during Lambda init
+    SQS_MAX_ATTEMPTS           botocore attempts for the write-behind SQS client (default 3;
+                               nothing else retries SendMessageBatch)
+    DDB_CLI_MAX_ATTEMPTS       botocore attempts for the offline tools' client (default 10)
+"""
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+# 초기화 단계별 소요 시간 (ms) - 콜드 스타트 분석용
+_init_timings: Dict[str, float] = {}
+_client = None
+_sqs_client = None
+_cli_client = None
+_client_lock = threading.Lock()
+_serializer = None
+_deserializer = None
+
+
+def _timed(phase: str):
+    class _Timer:
+        def __enter__(self):
+            self.start = time.perf_counter()
+
+        def __exit__(self, *exc):
+            _init_timings[phase] = round((time.perf_counter() - self.start) * 1000.0, 3)
+    return _Timer()
+
+
+def client_config_kwargs() -> Dict[str, Any]:
+    return {
+        'max_pool_connections': int(os.environ.get('DDB_MAX_POOL_CONNECTIONS', '10')),
+        'connect_timeout': float(os.environ.get('DDB_CONNECT_TIMEOUT', '1')),
+        'read_timeout': float(os.environ.get('DDB_READ_TIMEOUT', '3')),
+        'tcp_keepalive': True,
+        'retries': {'mode': 'standard', 'total_max_attempts': int(os.environ.get('DDB_MAX_ATTEMPTS', '1'))},
+    }
+
+
+def sqs_config_kwargs() -> Dict[str, Any]:
+    # DynamoDB 와 달리 SQS 호출은 RetryingTable 을 거치지 않으므로 botocore 재시도 사용
+    return dict(client_config_kwargs(),
+                retries={'mode': 'standard', 'total_max_attempts': int(os.environ.get('SQS_MAX_ATTEMPTS', '3'))})
+
+
+def cli_config_kwargs() -> Dict[str, Any]:
+    # 오프라인 도구는 Lambda 마감 시간도 RetryingTable 도 없으므로 스로틀링은 botocore 가 재시도
+    return dict(client_config_kwargs(),
+                retries={'mode': 'standard', 'total_max_attempts': int(os.environ.get('DDB_CLI_MAX_ATTEMPTS', '10'))})
+
+
+def dynamodb_client():
+    """The container-wide low-level DynamoDB client (created on first use)."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                with _timed('import_botocore_ms'):
+                    import botocore.session
+                    from botocore.config import Config
+                with _timed('create_client_ms'):
+                    session = botocore.session.get_session()
+                    _client = session.create_client('dynamodb', config=Config(**client_config_kwargs()))
+    return _client
+
+
+def sqs_client():
+    """The container-wide SQS client (write-behind mode only, created on first use)."""
+    global _sqs_client
+    if _sqs_client is None:
+        with _client_lock:
+            if _sqs_client is None:
+                import botocore.session
+                from botocore.config import Config
+                session = botocore.session.get_session()
+                _sqs_client = session.create_client('sqs', config=Config(**sqs_config_kwargs()))
+    return _sqs_client
+
+
+def cli_client():
+    """DynamoDB client for offline tools (created on first use)."""
+    global _cli_client
+    if _cli_client is None:
+        with _client_lock:
+            if _cli_client is None:
+                import botocore.session
+                from botocore.config import Config
+                session = botocore.session.get_session()
+                _cli_client = session.create_client('dynamodb', config=Config(**cli_config_kwargs()))
+    return _cli_client
+
+
+def cli_table(name: str) -> 'Table':
+    """``Table`` for offline tools, on the retrying ``cli_client``."""
+    return Table(name, cli_client())
+
+
+def _codecs():
+    global _serializer, _deserializer
+    if _serializer is None:
+        with _timed('import_types_ms'):
+            from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+        _serializer, _deserializer = TypeSerializer(), TypeDeserializer()
+    return _serializer, _deserializer
+
+
+def init_timings() -> Dict[str, float]:
+    """Copy of the per-phase init timings recorded so far in this container."""
+    return dict(_init_timings)
+
+
+def error_code(exc: BaseException) -> Optional[str]:
+    """DynamoDB error code of a botocore ``ClientError`` (None for anything else).
+
+    Duck-typed so callers do not have to import botocore just to inspect errors.
+    """
+    response = getattr(exc, 'response', None)
+    if isinstance(response, dict):
+        return response.get('Error', {}).get('Code')
+    return None
+
+
+def reset() -> None:
+    """Forget the cached client (tests only)."""
+    global _client, _sqs_client, _cli_client
+    _client = None
+    _sqs_client = None
+    _cli_client = None
+    _init_timings.clear()
+
+
+class Table:
+    """boto3 ``Table``-compatible wrapper over the low-level client.
+
+    Python values in Key/Item/ExpressionAttributeValues/ExclusiveStartKey are
+    serialized to DynamoDB JSON on the way out and responses are
+    deserialized back, exactly like the resource layer does.
+    """
+
+    _SERIALIZED_ARGS = ('Key', 'Item', 'ExclusiveStartKey')
+    _DESERIALIZED_FIELDS = ('Item', 'Attributes', 'LastEvaluatedKey')
+
+    def __init__(self, name: str, client: Any = None):
+        self.name = name
+        self.table_name = name
+        self._client = client
+
+    @property
+    def client(self):
+        return self._client or dynamodb_client()
+
+    def _request(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        serializer, _ = _codecs()
+        request = dict(kwargs)
+        request['TableName'] = self.name
+        for arg in self._SERIALIZED_ARGS:
+            if arg in request:
+                request[arg] = {k: serializer.serialize(v) for k, v in request[arg].items()}
+        if 'ExpressionAttributeValues' in request:
+            request['ExpressionAttributeValues'] = {
+                k: serializer.serialize(v) for k, v in request['ExpressionAttributeValues'].items()}
+        return request
+
+    def _response(self, response: Dict[str, Any]) -> Dict[str, Any]:
+        _, deserializer = _codecs()
+        for field in self._DESERIALIZED_FIELDS:
+            if field in response:
+                response[field] = {k: deserializer.deserialize(v) for k, v in response[field].items()}
+        if 'Items' in response:
+            response['Items'] = [{k: deserializer.deserialize(v) for k, v in item.items()}
+                                 for item in response['Items']]
+        return response
+
+    def put_item(self, **kwargs: Any) -> Dict[str, Any]:
+        return self._response(self.client.put_item(**self._request(kwargs)))
+
+    def get_item(self, **kwargs: Any) -> Dict[str, Any]:
+        return self._response(self.client.get_item(**self._request(kwargs)))
+
+    def update_item(self, **kwargs: Any) -> Dict[str, Any]:
+        return self._response(self.client.update_item(**self._request(kwargs)))
+
+    def delete_item(self, **kwargs: Any) -> Dict[str, Any]:
+        return self._response(self.client.delete_item(**self._request(kwargs)))
+
+    def query(self, **kwargs: Any) -> Dict[str, Any]:
+        return self._response(self.client.query(**self._request(kwargs)))
+
+    def scan(self, **kwargs: Any) -> Dict[str, Any]:
+        return self._response(self.client.scan(**self._request(kwargs)))
+
+
+class LazyTable:
+    """Module-level placeholder that builds its ``Table`` on first use."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._table: Optional[Table] = None
+
+    def __getattr__(self, attr: str) -> Any:
+        if attr.startswith('_'):
+            raise AttributeError(attr)
+        if self._table is None:
+            self._table = Table(self.name)
+        return getattr(self._table, attr)
+
+
+if os.environ.get('DDB_PREWARM') == '1':
+    # Lambda init 단계에서 미리 생성 (provisioned concurrency 사용 시 첫 요청 전에 완료됨)
+    dynamodb_client()
+    _codecs()
@@ -0,0 +1,2 @@
+"""Local load/latency benchmarks for the backend (run from backend/, e.g.
+``python -m benchmarks.handler_bench``). Nothing here talks to AWS."""
@@ -0,0 +1,72 @@
+"""Cold-start cost of DynamoDB setup: boto3 resource vs lazy low-level client.
+
+Each sample runs in a fresh interpreter so module caches are cold::
+
+    python -m benchmarks.cold_start_bench --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Optional
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# 이전 방식: import 시점에 boto3 resource + Table 두 개 생성
+RESOURCE_SCRIPT = """
+import json, time
+t0 = time.perf_counter()
+import boto3
+t1 = time.perf_counter()
+dynamodb = boto3.resource('dynamodb')
+dynamodb.Table('phonitale-user-responses'); dynamodb.Table('phonitale-user-consent')
+t2 = time.perf_counter()
+print(json.dumps({'module_import_ms': (t1 - t0) * 1e3, 'first_table_ms': (t2 - t1) * 1e3}))
+"""
+
+# 현재 방식: lambda_function import 후 첫 테이블 사용 시점에 client 생성
+CLIENT_SCRIPT = """
+import json, time
+t0 = time.perf_counter()
+import lambda_function, aws_clients
+t1 = time.perf_counter()
+lambda_function.table_responses.client
+aws_clients._codecs()
+t2 = time.perf_counter()
+print(json.dumps({'module_import_ms': (t1 - t0) * 1e3, 'first_table_ms': (t2 - t1) * 1e3,
+                  'phases': aws_clients.init_timings()}))
+"""
+
+
+def sample(script: str) -> Dict[str, float]:
+    env = dict(os.environ, AWS_DEFAULT_REGION=os.environ.get('AWS_DEFAULT_REGION', 'us-east-2'))
+    out = subprocess.run([sys.executable, '-c', script], cwd=BACKEND_DIR, env=env,
+                         check=True, capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def run(runs: int = 5) -> Dict[str, Dict[str, float]]:
+    report = {}
+    for name, script in (('boto3_resource', RESOURCE_SCRIPT), ('lazy_client', CLIENT_SCRIPT)):
+        samples = [sample(script) for _ in range(runs)]
+        report[name] = {
+            'module_import_ms': statistics.median(s['module_import_ms'] for s in samples),
+            'first_table_ms': statistics.median(s['first_table_ms'] for s in samples),
+        }
+        report[name]['total_ms'] = report[name]['module_import_ms'] + report[name]['first_table_ms']
+        if 'phases' in samples[-1]:
+            report[name]['phases'] = samples[-1]['phases']
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args(argv)
+    print(json.dumps(run(args.runs), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""Bulk regrading throughput: AnswerIndex.grade per row vs grade_batch.
+
+Grades synthetic recognition responses (a few distinct answers, as in real
+exports) against the repository word file, with the normalize() memo
+cleared before each variant::
+
+    python -m benchmarks.grading_bench --responses 100000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import grading  # noqa: E402
+
+
+def measure(fn: Callable[[], List[Optional[bool]]], count: int) -> Dict[str, Any]:
+    grading.normalize.cache_clear()
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    return {
+        'seconds': elapsed,
+        'us_per_response': elapsed / count * 1e6,
+        'normalize_calls': grading.normalize.cache_info().misses,
+    }
+
+
+def run(responses: int = 100000, seed: int = 2) -> Dict[str, Dict[str, Any]]:
+    index = grading.answer_index()
+    if index is None:
+        raise SystemExit('word file not found (see words.py)')
+    rng = random.Random(seed)
+    known = sorted(index.accepted['recognition'])
+    words = [rng.choice(known) for _ in range(responses)]
+    answers = [rng.choice(['모름', '', f'답{rng.randint(0, 50)}']) for _ in range(responses)]
+    return {
+        'grade': measure(lambda: [index.grade('recognition', w, r) for w, r in zip(words, answers)], responses),
+        'grade_batch': measure(lambda: index.grade_batch('recognition', words, answers), responses),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--responses', type=int, default=100000)
+    args = parser.parse_args(argv)
+
+    report = run(args.responses)
+    print(f"{'variant':<12} {'seconds':>8} {'us/resp':>8} {'normalize':>10}")
+    for name, row in report.items():
+        print(f"{name:<12} {row['seconds']:>8.3f} {row['us_per_response']:>8.2f} {row['normalize_calls']:>10}")
+
+
+if __name__ == '__main__':
+    main()
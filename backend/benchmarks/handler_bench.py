@@ -0,0 +1,161 @@
+"""Latency / throughput / allocation benchmark for lambda_handler.
+
+Drives the real handler with synthetic sessions (see sessions.py) against
+in-memory tables and reports per (route, page_type) statistics::
+
+    python -m benchmarks.handler_bench --participants 50
+    python -m benchmarks.handler_bench --json bench_handler.json
+
+Timings are taken in one pass and allocations in a second pass, because
+tracemalloc itself slows every allocation down.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-2')
+
+import lambda_function  # noqa: E402
+from local_dynamodb import LocalDynamoDB, patch_handler_tables  # noqa: E402
+from benchmarks.sessions import load_words, session_events  # noqa: E402
+
+GroupKey = Tuple[str, str]
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100.0 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+
+def group_key(event: Dict[str, Any]) -> GroupKey:
+    route = f"{event['httpMethod']} {event.get('resource') or event['path']}"
+    page_type = '-'
+    if event.get('body'):
+        try:
+            body = json.loads(event['body'])
+            if isinstance(body, dict):
+                page_type = body.get('page_type', '-')
+        except ValueError:
+            pass
+    return route, page_type
+
+
+def build_events(participants: int) -> List[Dict[str, Any]]:
+    words = load_words()
+    events = []
+    for participant in range(participants):
+        events.extend(session_events(participant, words))
+    return events
+
+
+def _replay(events: List[Dict[str, Any]], handler: Callable, measure: Callable) -> Dict[GroupKey, List[float]]:
+    samples: Dict[GroupKey, List[float]] = {}
+    # 핸들러의 print 출력은 CloudWatch 대신 버림 (포맷팅 비용은 그대로 측정됨)
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        for event in events:
+            value, result = measure(handler, event)
+            if result['statusCode'] >= 500:
+                raise RuntimeError(f"handler failed during benchmark: {result['body']}")
+            samples.setdefault(group_key(event), []).append(value)
+    return samples
+
+
+def _timed(handler: Callable, event: Dict[str, Any]):
+    start = time.perf_counter_ns()
+    result = handler(event, None)
+    return (time.perf_counter_ns() - start) / 1e6, result
+
+
+def _allocated(handler: Callable, event: Dict[str, Any]):
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    result = handler(event, None)
+    return (tracemalloc.get_traced_memory()[1] - before) / 1024.0, result
+
+
+def run(participants: int = 20, handler: Optional[Callable] = None,
+        allocations: bool = True, setup: Optional[Callable[[], Any]] = None) -> Dict[str, Any]:
+    """Replay ``participants`` sessions and return the per-group report.
+
+    ``setup`` is called before each pass (defaults to fresh local tables).
+    """
+    handler = handler or lambda_function.lambda_handler
+    setup = setup or (lambda: patch_handler_tables(lambda_function, LocalDynamoDB()))
+    events = build_events(participants)
+
+    setup()
+    wall_start = time.perf_counter()
+    latencies = _replay(events, handler, _timed)
+    wall = time.perf_counter() - wall_start
+
+    allocs: Dict[GroupKey, List[float]] = {}
+    if allocations:
+        setup()
+        tracemalloc.start()
+        try:
+            allocs = _replay(events, handler, _allocated)
+        finally:
+            tracemalloc.stop()
+
+    groups = []
+    for key in sorted(latencies):
+        values = sorted(latencies[key])
+        groups.append({
+            'route': key[0],
+            'page_type': key[1],
+            'requests': len(values),
+            'p50_ms': percentile(values, 50),
+            'p95_ms': percentile(values, 95),
+            'p99_ms': percentile(values, 99),
+            'throughput_rps': len(values) / (sum(values) / 1000.0) if sum(values) else 0.0,
+            'peak_alloc_kib': statistics.mean(allocs[key]) if key in allocs else None,
+        })
+    return {
+        'participants': participants,
+        'requests': len(events),
+        'wall_seconds': wall,
+        'throughput_rps': len(events) / wall if wall else 0.0,
+        'groups': groups,
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    out = io.StringIO()
+    out.write(f"{report['requests']} requests from {report['participants']} sessions "
+              f"in {report['wall_seconds']:.2f}s ({report['throughput_rps']:.0f} req/s)\n")
+    header = f"{'route':<22} {'page_type':<14} {'n':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'req/s':>9} {'KiB/req':>8}"
+    out.write(header + '\n' + '-' * len(header) + '\n')
+    for g in report['groups']:
+        alloc = f"{g['peak_alloc_kib']:.1f}" if g['peak_alloc_kib'] is not None else '-'
+        out.write(f"{g['route']:<22} {g['page_type']:<14} {g['requests']:>6} {g['p50_ms']:>8.3f} "
+                  f"{g['p95_ms']:>8.3f} {g['p99_ms']:>8.3f} {g['throughput_rps']:>9.0f} {alloc:>8}\n")
+    return out.getvalue()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--participants', type=int, default=20)
+    parser.add_argument('--no-alloc', action='store_true', help='skip the tracemalloc pass')
+    parser.add_argument('--json', help='also write the raw report to this file')
+    args = parser.parse_args(argv)
+
+    report = run(args.participants, allocations=not args.no_alloc)
+    print(format_report(report))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
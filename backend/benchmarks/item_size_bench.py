@@ -0,0 +1,86 @@
+"""Item size and write capacity of response items: standard vs compact format.
+
+Replays synthetic sessions through lambda_handler once per format and sums
+the ConsumedCapacity DynamoDB reports for each response write::
+
+    python -m benchmarks.item_size_bench --participants 20
+"""
+import argparse
+import contextlib
+import os
+import statistics
+import sys
+from typing import Any, Dict, List, Optional
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-2')
+
+import lambda_function  # noqa: E402
+from local_dynamodb import LocalDynamoDB, item_size, patch_handler_tables  # noqa: E402
+from benchmarks.sessions import load_words, session_events  # noqa: E402
+
+
+class CapacityRecorder:
+    """Adds ReturnConsumedCapacity to every write and keeps the totals."""
+
+    def __init__(self, table: Any):
+        self.table = table
+        self.writes = 0
+        self.capacity_units = 0.0
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.table, name)
+
+    def update_item(self, **kwargs: Any) -> Dict[str, Any]:
+        kwargs.setdefault('ReturnConsumedCapacity', 'TOTAL')
+        result = self.table.update_item(**kwargs)
+        self.writes += 1
+        self.capacity_units += result['ConsumedCapacity']['CapacityUnits']
+        return result
+
+
+def measure(item_format: str, participants: int) -> Dict[str, float]:
+    words = load_words()
+    db = LocalDynamoDB()
+    original = (lambda_function.table_responses, lambda_function.table_consent)
+    try:
+        patch_handler_tables(lambda_function, db)
+        recorder = lambda_function.table_responses = CapacityRecorder(lambda_function.table_responses)
+        with mock.patch.dict(os.environ, {'RESPONSE_ITEM_FORMAT': item_format}), \
+                open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            for participant in range(participants):
+                for event in session_events(participant, words):
+                    lambda_function.lambda_handler(event, None)
+    finally:
+        lambda_function.table_responses, lambda_function.table_consent = original
+
+    sizes = [item_size(item) for item in db.Table('phonitale-user-responses').items.values()]
+    return {
+        'items': len(sizes),
+        'mean_item_bytes': statistics.mean(sizes),
+        'max_item_bytes': max(sizes),
+        'storage_bytes': sum(sizes),
+        'writes': recorder.writes,
+        'write_capacity_units': recorder.capacity_units,
+        'wcu_per_write': recorder.capacity_units / recorder.writes,
+    }
+
+
+def run(participants: int = 10) -> Dict[str, Dict[str, float]]:
+    return {fmt: measure(fmt, participants) for fmt in ('standard', 'compact')}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--participants', type=int, default=10)
+    args = parser.parse_args(argv)
+    report = run(args.participants)
+    print(f"{'format':<10} {'items':>6} {'mean B':>8} {'max B':>7} {'writes':>7} {'WCU':>8} {'WCU/write':>10}")
+    for fmt, stats in report.items():
+        print(f"{fmt:<10} {stats['items']:>6} {stats['mean_item_bytes']:>8.0f} {stats['max_item_bytes']:>7} "
+              f"{stats['writes']:>7} {stats['write_capacity_units']:>8.0f} {stats['wcu_per_write']:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
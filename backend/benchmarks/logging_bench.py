@@ -0,0 +1,92 @@
+"""Per-request cost of handler logging: the old print() pattern vs request_log.
+
+Only the logging work is timed (same synthetic events for both), and the
+bytes each variant would send to CloudWatch are counted::
+
+    python -m benchmarks.logging_bench --participants 50
+"""
+import argparse
+import io
+import json
+import os
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from request_log import Logger  # noqa: E402
+from benchmarks.sessions import load_words, session_events  # noqa: E402
+
+
+def legacy_logging(event: Dict[str, Any], out: io.StringIO) -> None:
+    """What every request printed before request_log (POST /responses path)."""
+    def emit(*args):
+        print(*args, file=out)
+    emit("START: Received Event Object:")
+    emit(json.dumps(event))
+    emit("END: Received Event Object")
+    emit(f"Extracted httpMethod: {event['httpMethod']}")
+    emit(f"Extracted path: {event['path']}")
+    emit(f"Processing {event['httpMethod']} request for path: {event['path']}")
+    emit(f"Handling POST for path: {event['path']}")
+    emit("Received raw event:", json.dumps(event))
+    body = json.loads(event['body'])
+    emit("Parsed body:", json.dumps(body))
+    emit(f"Experiment response saved/updated for user: {body.get('user')}, "
+         f"word: {body.get('english_word')}, page: {body.get('page_type')}")
+
+
+def structured_logging(logger: Logger) -> Callable[[Dict[str, Any], io.StringIO], None]:
+    def run(event: Dict[str, Any], out: io.StringIO) -> None:
+        logger.stream = out
+        logger.begin_request(event, cold_start=False)
+        logger.debug_payload("Received event", event)
+        body = json.loads(event['body'])
+        logger.debug_payload("Parsed body", body)
+        logger.annotate(page_type=body.get('page_type'))
+        logger.debug("Experiment response saved", english_word=body.get('english_word'))
+        logger.end_request(200)
+    return run
+
+
+def measure(events: List[Dict[str, Any]], fn: Callable) -> Dict[str, float]:
+    out = io.StringIO()
+    start = time.perf_counter()
+    for event in events:
+        fn(event, out)
+    elapsed = time.perf_counter() - start
+    return {
+        'us_per_request': elapsed / len(events) * 1e6,
+        'bytes_per_request': len(out.getvalue().encode('utf-8')) / len(events),
+    }
+
+
+def run(participants: int = 20, sample_rate: float = 0.01) -> Dict[str, Dict[str, float]]:
+    words = load_words()
+    events = [e for p in range(participants) for e in session_events(p, words)
+              if e['path'].endswith('/responses')]
+    return {
+        'legacy_print': measure(events, legacy_logging),
+        'structured_info': measure(events, structured_logging(Logger(level='INFO', sample_rate=0))),
+        f'structured_sampled_{sample_rate:g}': measure(
+            events, structured_logging(Logger(level='INFO', sample_rate=sample_rate))),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--participants', type=int, default=20)
+    parser.add_argument('--sample-rate', type=float, default=0.01)
+    args = parser.parse_args(argv)
+
+    report = run(args.participants, args.sample_rate)
+    baseline = report['legacy_print']
+    print(f"{'variant':<28} {'us/req':>8} {'bytes/req':>10} {'saving':>8}")
+    for name, stats in report.items():
+        saving = 1 - stats['us_per_request'] / baseline['us_per_request']
+        print(f"{name:<28} {stats['us_per_request']:>8.1f} {stats['bytes_per_request']:>10.0f} {saving:>7.0%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""Per-request overhead of metrics instrumentation in lambda_handler.
+
+Replays the same synthetic sessions with metrics disabled and enabled (in
+that order per round, best of ``--repeat``) and fails when the overhead
+exceeds the budget. DynamoDB computes consumed capacity server-side, so the
+in-memory tables here return a canned ConsumedCapacity instead of sizing
+every item (which would bill the fake's own work to the instrumentation)::
+
+    python -m benchmarks.metrics_bench --participants 10 --budget-us 100
+
+The default budget (100 us) is ~2% of a single-digit-millisecond DynamoDB
+round trip, i.e. invisible next to the call being measured.
+"""
+import argparse
+import contextlib
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-2')
+
+import lambda_function  # noqa: E402
+from local_dynamodb import LocalDynamoDB, patch_handler_tables  # noqa: E402
+from metrics import InstrumentedTable, metrics  # noqa: E402
+from benchmarks.sessions import load_words, session_events  # noqa: E402
+
+DEFAULT_BUDGET_US = 100.0
+
+
+class CannedCapacityTable:
+    """LocalTable proxy that answers ReturnConsumedCapacity without sizing items."""
+
+    def __init__(self, table: Any):
+        self.table = table
+
+    def __getattr__(self, name: str) -> Any:
+        method = getattr(self.table, name)
+
+        def call(**kwargs: Any) -> Dict[str, Any]:
+            requested = kwargs.pop('ReturnConsumedCapacity', 'NONE') != 'NONE'
+            response = method(**kwargs)
+            if requested:
+                response['ConsumedCapacity'] = {'TableName': self.table.name, 'CapacityUnits': 1.0}
+            return response
+        return call
+
+
+def _replay(events: List[Dict[str, Any]]) -> float:
+    db = LocalDynamoDB()
+    patch_handler_tables(lambda_function, db)
+    lambda_function.table_responses = InstrumentedTable(CannedCapacityTable(db.Table('phonitale-user-responses')))
+    lambda_function.table_consent = InstrumentedTable(CannedCapacityTable(db.Table('phonitale-user-consent')))
+    start = time.perf_counter()
+    for event in events:
+        lambda_function.lambda_handler(event, None)
+    return (time.perf_counter() - start) / len(events) * 1e6
+
+
+def run(participants: int = 10, repeat: int = 5) -> Dict[str, float]:
+    words = load_words()
+    events = [e for p in range(participants) for e in session_events(p, words)]
+    original = (lambda_function.table_responses, lambda_function.table_consent, metrics.enabled)
+    best = {'disabled_us': float('inf'), 'enabled_us': float('inf')}
+    try:
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            for _ in range(repeat):
+                for name, enabled in (('disabled_us', False), ('enabled_us', True)):
+                    metrics.enabled = enabled
+                    best[name] = min(best[name], _replay(events))
+    finally:
+        lambda_function.table_responses, lambda_function.table_consent, metrics.enabled = original
+    best['overhead_us'] = best['enabled_us'] - best['disabled_us']
+    best['requests'] = len(events)
+    return best
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--participants', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--budget-us', type=float, default=DEFAULT_BUDGET_US)
+    args = parser.parse_args(argv)
+
+    report = run(args.participants, args.repeat)
+    print(f"requests: {report['requests']}")
+    print(f"metrics disabled: {report['disabled_us']:.1f} us/req")
+    print(f"metrics enabled:  {report['enabled_us']:.1f} us/req")
+    print(f"overhead:         {report['overhead_us']:.1f} us/req (budget {args.budget_us:g})")
+    if report['overhead_us'] > args.budget_us:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
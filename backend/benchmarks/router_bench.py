@@ -0,0 +1,177 @@
+"""Per-request CPU of routing + update-expression building: if/elif vs tables.
+
+The legacy functions below are the pre-dispatch-table code (path.endswith
+chain, per-page_type branches, expression strings rebuilt every call). Both
+variants turn the same session events into update_item arguments; no table
+is touched. Work added to build_response_update later (timing verification,
+inline grading) is done identically by both, so the difference stays the
+routing/rendering cost::
+
+    python -m benchmarks.router_bench --participants 20 --repeat 7
+"""
+import argparse
+import io
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import grading  # noqa: E402
+import item_codec  # noqa: E402
+import lambda_function  # noqa: E402
+from request_log import log  # noqa: E402
+from benchmarks.sessions import load_words, session_events  # noqa: E402
+
+
+def legacy_route(http_method: str, path: str) -> Optional[str]:
+    if path.endswith('/consent') and http_method == 'POST':
+        return 'consent'
+    elif path.endswith('/responses') and http_method == 'POST':
+        return 'responses'
+    elif path.endswith('/responses/batch') and http_method == 'POST':
+        return 'batch'
+    elif path.endswith('/responses') and http_method == 'GET':
+        return 'query'
+    elif path.endswith('/words') and http_method == 'GET':
+        return 'words'
+    return None
+
+
+def legacy_build(body: Dict[str, Any]) -> Dict[str, Any]:
+    user = body.get('user')
+    english_word = body.get('english_word')
+    page_type = body.get('page_type', 'unknown')
+    if not user:
+        raise ValueError("Missing required field: user")
+    if not english_word:
+        raise ValueError("Missing required field: english_word")
+    timestamp_in = body.get('timestamp_in')
+    timestamp_out = body.get('timestamp_out')
+    round_number = body.get('round_number', 1)
+    duration = body.get('duration')
+    response_data = body.get('response', 'N/A')
+    init_attrs = {
+        'round_number': round_number, 'user': user, 'english_word': english_word,
+        'GSI1SK': f"{lambda_function.round_prefix(round_number)}WORD#{english_word}",
+    }
+    set_attrs = {}
+    if page_type in ['learning', 'recognition', 'generation']:
+        if timestamp_in:
+            set_attrs[f"timestamp_{page_type}_in"] = timestamp_in
+        else:
+            log.warn(f"{page_type}_timestamp_in_missing", english_word=english_word)
+        if timestamp_out:
+            set_attrs[f"timestamp_{page_type}_out"] = timestamp_out
+        else:
+            log.warn(f"{page_type}_timestamp_out_missing", english_word=english_word)
+        if duration is not None:
+            set_attrs[f"duration_{page_type}"] = duration
+        else:
+            log.warn(f"{page_type}_duration_missing", english_word=english_word)
+        if page_type in ['recognition', 'generation']:
+            set_attrs[f"response_{page_type}"] = response_data
+    elif page_type == 'survey':
+        set_attrs[f"timestamp_{page_type}"] = datetime.now(timezone.utc).isoformat()
+        usefulness = body.get('usefulness')
+        coherence = body.get('coherence')
+        if usefulness is not None:
+            set_attrs['usefulness'] = usefulness
+        else:
+            log.warn("survey_usefulness_missing", english_word=english_word)
+        if coherence is not None:
+            set_attrs['coherence'] = coherence
+        else:
+            log.warn("survey_coherence_missing", english_word=english_word)
+    else:
+        log.warn("unknown_page_type", page_type=page_type, english_word=english_word)
+    # 이후 추가된 공통 처리 - table_driven 과 같은 일을 하도록 동일하게 수행
+    if page_type in ['learning', 'recognition', 'generation']:
+        lambda_function.verify_timing(page_type, set_attrs, english_word)
+    if page_type in ['recognition', 'generation']:
+        correct = grading.grade(page_type, english_word, set_attrs.get(f"response_{page_type}"))
+        if correct is not None:
+            set_attrs[grading.correct_attr(page_type)] = correct
+    return {'user': user, 'english_word': english_word, 'page_types': [page_type],
+            'init': init_attrs, 'set': set_attrs}
+
+
+def legacy_render(update: Dict[str, Any]) -> Dict[str, Any]:
+    clauses = []
+    names = {}
+    values = {}
+    init_attrs, set_attrs = update['init'], update['set']
+    if item_codec.compact_enabled():
+        init_attrs = item_codec.encode_attrs(init_attrs)
+        set_attrs = item_codec.encode_attrs(set_attrs)
+        set_attrs[item_codec.SCHEMA_ATTR] = item_codec.COMPACT_VERSION
+    for attr, value in init_attrs.items():
+        clauses.append(f"#{attr} = if_not_exists(#{attr}, :{attr})")
+        names[f"#{attr}"] = attr
+        values[f":{attr}"] = value
+    for attr, value in set_attrs.items():
+        clauses.append(f"#{attr} = :{attr}")
+        names[f"#{attr}"] = attr
+        values[f":{attr}"] = value
+    return {'Key': lambda_function.response_key(update['user'], update['english_word']),
+            'UpdateExpression': "SET " + ", ".join(clauses),
+            'ExpressionAttributeNames': names, 'ExpressionAttributeValues': values}
+
+
+def legacy(event: Dict[str, Any], body: Dict[str, Any]) -> Any:
+    legacy_route(event['httpMethod'], event['path'])
+    return legacy_render(legacy_build(body))
+
+
+def table_driven(event: Dict[str, Any], body: Dict[str, Any]) -> Any:
+    lambda_function.find_route(event['httpMethod'], event['path'])
+    return lambda_function.render_update_expression(lambda_function.build_response_update(body))
+
+
+def measure(pairs: List[Any], fn: Callable, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.process_time()
+        for event, body in pairs:
+            fn(event, body)
+        best = min(best, time.process_time() - start)
+    return best / len(pairs) * 1e6
+
+
+def run(participants: int = 20, repeat: int = 7) -> Dict[str, float]:
+    log.stream = io.StringIO()
+    words = load_words()
+    pairs = []
+    for p in range(participants):
+        for event in session_events(p, words):
+            body = json.loads(event['body'])
+            if event['path'].endswith('/responses') and body.get('page_type') != 'final_summary':
+                pairs.append((event, body))
+    # survey 는 서버 시각이 들어가므로 비교에서 제외
+    for pair in pairs:
+        if pair[1].get('page_type') != 'survey':
+            assert legacy(*pair) == table_driven(*pair), pair[1]
+    return {'requests': len(pairs),
+            'legacy_us': measure(pairs, legacy, repeat),
+            'table_driven_us': measure(pairs, table_driven, repeat)}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--participants', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=7)
+    args = parser.parse_args(argv)
+
+    report = run(args.participants, args.repeat)
+    print(f"requests: {report['requests']}")
+    print(f"{'variant':<14} {'cpu us/req':>10}")
+    print(f"{'legacy':<14} {report['legacy_us']:>10.2f}")
+    print(f"{'table_driven':<14} {report['table_driven_us']:>10.2f}")
+    print(f"saving: {1 - report['table_driven_us'] / report['legacy_us']:.0%}")
+
+
+if __name__ == '__main__':
+    main()
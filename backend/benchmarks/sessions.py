@@ -0,0 +1,125 @@
+"""Synthetic participant sessions built from the real word list.
+
+Each session replays the request sequence the React app sends: consent,
+learning/recognition/generation pages for every word of rounds 1-3, the
+survey pages and the final_summary call. With ``idempotency_keys=True``
+each POST carries the Idempotency-Key that src/utils/api.js sends.
+"""
+import csv
+import json
+import os
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Optional
+from urllib.parse import quote
+
+WORDS_CSV = os.path.join(os.path.dirname(__file__), '..', '..', 'phonitale-react',
+                         'public', 'words', 'words_data_test_full.csv')
+
+API_STAGE = '/dev'
+
+
+def load_words(path: str = WORDS_CSV) -> List[Dict[str, str]]:
+    with open(path, newline='', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+
+def _iso(ts: datetime) -> str:
+    # 프론트엔드 new Date().toISOString() 과 같은 형식 (밀리초 + Z)
+    return ts.strftime('%Y-%m-%dT%H:%M:%S.') + f"{ts.microsecond // 1000:03d}Z"
+
+
+def api_event(method: str, path: str, body: Optional[Any] = None,
+              idempotency_key: Optional[str] = None) -> Dict[str, Any]:
+    """API Gateway (REST, Lambda proxy) event as lambda_handler receives it."""
+    headers = {'Content-Type': 'application/json', 'Origin': 'http://localhost:5173'}
+    if idempotency_key:
+        headers['Idempotency-Key'] = idempotency_key
+    return {
+        'resource': path,
+        'path': API_STAGE + path,
+        'httpMethod': method,
+        'headers': headers,
+        'queryStringParameters': None,
+        'requestContext': {'stage': API_STAGE.strip('/'), 'httpMethod': method, 'path': API_STAGE + path},
+        'body': json.dumps(body, ensure_ascii=False) if body is not None else None,
+        'isBase64Encoded': False,
+    }
+
+
+def session_requests(participant: int, words: List[Dict[str, str]],
+                     rng: Optional[random.Random] = None,
+                     start: Optional[datetime] = None) -> Iterator[Dict[str, Any]]:
+    """Yield the request bodies of one participant's full session, in order."""
+    rng = rng or random.Random(participant)
+    clock = start or datetime(2025, 4, 20, 9, 0, tzinfo=timezone.utc)
+    name = f"참가자{participant:04d}"
+    phone = f"010{participant:08d}"
+    email = f"p{participant:04d}@example.com"
+    user = f"{name}#{phone}"
+
+    yield {'path': '/consent',
+           'body': {'name': name, 'phone': phone, 'email': email, 'consent_agreed': True}}
+
+    def page(word: Dict[str, str], page_type: str, round_number: int, seconds: int, **extra):
+        nonlocal clock
+        ts_in = clock
+        clock = clock + timedelta(seconds=seconds, milliseconds=rng.randint(0, 999))
+        body = {
+            'user': user,
+            'english_word': word['word'],
+            'round_number': round_number,
+            'page_type': page_type,
+            'timestamp_in': _iso(ts_in),
+            'timestamp_out': _iso(clock),
+            'duration': round((clock - ts_in).total_seconds()),
+        }
+        body.update(extra)
+        clock = clock + timedelta(seconds=1)  # 페이지 전환 대기
+        return {'path': '/responses', 'body': body}
+
+    for round_number in (1, 2, 3):
+        round_words = [w for w in words if w['round'] == str(round_number)]
+        for phase in ('learning', 'recognition', 'generation'):
+            order = round_words[:]
+            rng.shuffle(order)
+            for word in order:
+                if phase == 'learning':
+                    yield page(word, phase, round_number, rng.randint(15, 30))
+                elif phase == 'recognition':
+                    answer = word['meaning'].split(',')[0].strip() if rng.random() < 0.6 else rng.choice(['', '모름', '참견'])
+                    yield page(word, phase, round_number, rng.randint(3, 30), response=answer)
+                else:
+                    answer = word['word'] if rng.random() < 0.4 else word['word'][:rng.randint(1, len(word['word']))]
+                    yield page(word, phase, round_number, rng.randint(5, 30), response=answer)
+
+    # 설문은 라운드 1-3 단어만 (SurveyPage 와 동일)
+    for word in (w for w in words if w['round'] in ('1', '2', '3')):
+        yield page(word, 'survey', 0, rng.randint(4, 20),
+                   usefulness=rng.randint(1, 7), coherence=rng.randint(1, 7))
+
+    yield {'path': '/responses',
+           'body': {'email': email, 'name': name, 'page_type': 'final_summary',
+                    'test_end_timestamp': _iso(clock)}}
+
+
+def idempotency_key(body: Dict[str, Any], session_id: str) -> Optional[str]:
+    """The key api.js submitResponse / submitTotalDuration send with ``body`` (none for consent).
+
+    ``session_id`` stands in for the id api.js startSession() generates once per session.
+    """
+    if body.get('page_type') == 'final_summary':
+        parts = [session_id, body['email'], body['name'], body['page_type']]
+    elif 'english_word' in body:
+        parts = [session_id, body['user'], body['round_number'], body['english_word'], body['page_type']]
+    else:
+        return None
+    return quote('|'.join(str(part) for part in parts), safe="-_.!~*'()")
+
+
+def session_events(participant: int, words: List[Dict[str, str]], idempotency_keys: bool = False,
+                   **kwargs: Any) -> Iterator[Dict[str, Any]]:
+    session_id = f'session-{participant}'
+    for request in session_requests(participant, words, **kwargs):
+        key = idempotency_key(request['body'], session_id) if idempotency_keys else None
+        yield api_event('POST', request['path'], request['body'], key)
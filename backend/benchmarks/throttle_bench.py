@@ -0,0 +1,114 @@
+"""Tail latency and lost writes under simulated DynamoDB throttling.
+
+Replays synthetic sessions (with the Idempotency-Key headers the app
+sends) against in-memory tables that throttle a share of calls, once
+without retries (every throttle is a failed request, as before
+RetryingTable), once with deadline-bounded retries and once with
+responses queued (RESPONSE_WRITE_MODE=queue, see ingest_queue.py; the
+queue is not drained), and reports outcome counts and latency percentiles
+per throttle rate::
+
+    python -m benchmarks.throttle_bench --participants 2 --rates 0 0.1 0.3 0.6
+
+Backoff sleeps are real, so latencies include the waiting.
+"""
+import argparse
+import contextlib
+import os
+import random
+import sys
+import time
+from typing import Any, Dict, List, Optional
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-2')
+
+import idempotency  # noqa: E402
+import ingest_queue  # noqa: E402
+import lambda_function  # noqa: E402
+import retry  # noqa: E402
+from local_dynamodb import LocalDynamoDB, patch_handler_tables  # noqa: E402
+from metrics import InstrumentedTable  # noqa: E402
+from benchmarks.handler_bench import percentile  # noqa: E402
+from benchmarks.sessions import load_words, session_events  # noqa: E402
+
+
+class LambdaContext:
+    """Fresh 6s budget per invocation (the function's configured timeout)."""
+
+    def __init__(self, timeout_ms: int = 6000):
+        self.deadline = time.monotonic() + timeout_ms / 1000.0
+
+    def get_remaining_time_in_millis(self) -> int:
+        return int((self.deadline - time.monotonic()) * 1000)
+
+
+def replay(events: List[Dict[str, Any]], rate: float, retries: bool, seed: int = 7,
+           queued: bool = False) -> Dict[str, Any]:
+    db = LocalDynamoDB()
+    patch_handler_tables(lambda_function, db)
+    rng = random.Random(seed)
+    for name, attr in (('phonitale-user-responses', 'table_responses'), ('phonitale-user-consent', 'table_consent')):
+        table = db.Table(name)
+        if rate:
+            table.inject_faults(rate=rate, rng=rng.random)
+        wrapped = retry.RetryingTable(table, max_attempts=retry.MAX_ATTEMPTS if retries else 1,
+                                      rng=random.Random(seed + 1).random)
+        setattr(lambda_function, attr, InstrumentedTable(wrapped))
+
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    # 변형마다 새 테이블이므로 컨테이너 LRU 의 완료 결과도 비움
+    idempotency.clear_cache()
+    mode = {'RESPONSE_WRITE_MODE': 'queue' if queued else 'sync'}
+    ingest_queue.set_queue(ingest_queue.MemoryQueue() if queued else None)
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull), mock.patch.dict(os.environ, mode):
+        for event in events:
+            start = time.perf_counter()
+            result = lambda_function.lambda_handler(event, LambdaContext())
+            latencies.append((time.perf_counter() - start) * 1000.0)
+            statuses[result['statusCode']] = statuses.get(result['statusCode'], 0) + 1
+    latencies.sort()
+    return {
+        'ok': statuses.get(200, 0),
+        'queued_202': statuses.get(202, 0),
+        'unavailable_503': statuses.get(503, 0),
+        'failed_500': statuses.get(500, 0),
+        'p50_ms': percentile(latencies, 50),
+        'p99_ms': percentile(latencies, 99),
+        'max_ms': latencies[-1],
+    }
+
+
+def run(participants: int = 2, rates: Optional[List[float]] = None) -> Dict[str, Dict[str, Any]]:
+    words = load_words()
+    events = [e for p in range(participants) for e in session_events(p, words, idempotency_keys=True)]
+    original = (lambda_function.table_responses, lambda_function.table_consent)
+    report = {}
+    try:
+        for rate in rates if rates is not None else [0.0, 0.1, 0.3]:
+            for retries in (False, True):
+                report[f"{'retry' if retries else 'no_retry'}@{rate:g}"] = replay(events, rate, retries)
+            report[f"queue@{rate:g}"] = replay(events, rate, True, queued=True)
+    finally:
+        lambda_function.table_responses, lambda_function.table_consent = original
+        ingest_queue.set_queue(None)
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--participants', type=int, default=2)
+    parser.add_argument('--rates', type=float, nargs='+', default=[0.0, 0.1, 0.3])
+    args = parser.parse_args(argv)
+
+    report = run(args.participants, args.rates)
+    print(f"{'variant':<16} {'200':>6} {'202':>6} {'503':>6} {'500':>6} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for name, row in report.items():
+        print(f"{name:<16} {row['ok']:>6} {row['queued_202']:>6} {row['unavailable_503']:>6} {row['failed_500']:>6} "
+              f"{row['p50_ms']:>8.2f} {row['p99_ms']:>8.2f} {row['max_ms']:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,218 @@
+"""Content-hashed audio/word assets and per-round prefetch bundles.
+
+Build step for the React app, run from a source checkout before
+``vite build`` (``npm run assets``)::
+
+    python backend/build_assets.py              # -> phonitale-react/public/bundles/
+    python backend/build_assets.py --check      # validate only
+
+It reads the word CSV, checks that every ``audio_path`` exists under the
+public directory and writes, under ``bundles/``:
+
+* ``audio/<dir>/<name>.<hash>.mp3``  each clip, named by its content hash
+* ``round-<n>.<hash>.json``          the round's words (``audio_path`` pointing
+                                     at the hashed clips) and an index into
+* ``round-<n>.<hash>.bin``           the round's clips, concatenated
+* ``manifest.json``                  versions, clip mapping and bundle names
+
+so a round's words and audio load in two requests before it starts, and
+everything except ``manifest.json`` can be served as immutable. The
+manifest ``version`` hashes the word file and every asset; GET /words
+reports it and reloads when it changes. words.py reads the manifest from
+backend/data/ (the backend deploy job runs this build and copies it there
+with the word file) or from this build's output in a source checkout;
+react-ci runs it before ``vite build`` so the bundles ship with the app.
+The build is deterministic, so both jobs produce the same version.
+
+Configuration (environment):
+    WORDS_CSV_PATH      word CSV (see words.py)
+    ASSETS_PUBLIC_DIR   directory ``audio_path`` is relative to
+                        (default: the React app's public/)
+"""
+import argparse
+import csv
+import hashlib
+import json
+import os
+import posixpath
+import sys
+from typing import Any, Dict, List, Optional
+
+import words
+
+HASH_LEN = 12
+BUNDLE_DIR = 'bundles'
+MANIFEST_NAME = 'manifest.json'
+DEFAULT_PUBLIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'phonitale-react', 'public')
+
+
+class AssetError(ValueError):
+    """The word file references audio that cannot be bundled."""
+
+    def __init__(self, problems: List[str]):
+        super().__init__(f"{len(problems)} asset problem(s):\n  " + '\n  '.join(problems))
+        self.problems = problems
+
+
+def public_dir() -> str:
+    return os.environ.get('ASSETS_PUBLIC_DIR') or DEFAULT_PUBLIC_DIR
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:HASH_LEN]
+
+
+def hashed_name(path: str, digest: str) -> str:
+    """``audio/me/x_1.mp3`` -> ``audio/me/x_1.<digest>.mp3``"""
+    stem, ext = posixpath.splitext(path)
+    return f"{stem}.{digest}{ext}"
+
+
+def _json(data: Any) -> bytes:
+    return json.dumps(data, ensure_ascii=False, sort_keys=True, separators=(',', ':')).encode('utf-8')
+
+
+def _public_file(root: str, audio_path: str) -> Optional[str]:
+    # audio_path 는 public 기준 상대 경로 (프론트엔드가 `/${audio_path}` 로 요청)
+    normalized = posixpath.normpath(audio_path)
+    if not audio_path or posixpath.isabs(audio_path) or normalized == '.' or normalized.startswith('..'):
+        return None
+    return os.path.join(root, *normalized.split('/'))
+
+
+def collect_audio(raw: bytes, root: str) -> Dict[str, bytes]:
+    """audio_path -> clip bytes for every word row; AssetError lists all problems."""
+    clips: Dict[str, bytes] = {}
+    problems = []
+    reader = csv.DictReader(raw.decode('utf-8-sig').splitlines())
+    for line, row in enumerate(reader, start=2):
+        word = (row.get('word') or '').strip()
+        audio_path = (row.get('audio_path') or '').strip()
+        if not word or audio_path in clips:
+            continue
+        path = _public_file(root, audio_path)
+        if path is None:
+            problems.append(f"line {line} ({word}): invalid audio_path {audio_path!r}")
+            continue
+        try:
+            with open(path, 'rb') as f:
+                clips[audio_path] = f.read()
+        except OSError:
+            problems.append(f"line {line} ({word}): {audio_path} not found under {root}")
+    if problems:
+        raise AssetError(problems)
+    return clips
+
+
+def build_files(raw: bytes, clips: Dict[str, bytes], prefix: str, words_file: str) -> Dict[str, bytes]:
+    """Output files (path relative to the bundle directory -> bytes), manifest included.
+
+    ``prefix`` is the bundle directory relative to the public directory;
+    every path in the manifest and bundles is public-relative like ``audio_path``.
+    """
+    files: Dict[str, bytes] = {}
+    audio: Dict[str, str] = {}
+    for src, data in sorted(clips.items()):
+        name = hashed_name(src, content_hash(data))
+        files[name] = data
+        audio[src] = f"{prefix}/{name}"
+
+    rounds = {}
+    for round_number, rows in words.parse_words(raw).items():
+        pack = bytearray()
+        index: Dict[str, List[int]] = {}
+        bundle_words = []
+        for row in rows:
+            hashed = audio.get(row['audio_path'], row['audio_path'])
+            bundle_words.append(dict(row, audio_path=hashed))
+            if hashed not in index and row['audio_path'] in clips:
+                data = clips[row['audio_path']]
+                index[hashed] = [len(pack), len(data)]
+                pack += data
+        pack_name = f"round-{round_number}.{content_hash(bytes(pack))}.bin"
+        body = _json({'round': round_number, 'words': bundle_words,
+                      'pack': f"{prefix}/{pack_name}", 'audio': index})
+        bundle_name = f"round-{round_number}.{content_hash(body)}.json"
+        files[pack_name] = bytes(pack)
+        files[bundle_name] = body
+        rounds[round_number] = {'bundle': f"{prefix}/{bundle_name}", 'pack': f"{prefix}/{pack_name}",
+                                'words': len(rows), 'bytes': len(body) + len(pack)}
+
+    manifest: Dict[str, Any] = {'words_file': words_file, 'words_version': words.content_version(raw),
+                                'audio': audio, 'rounds': rounds}
+    # 버전 = 단어 파일 + 모든 자산의 해시 (어느 하나가 바뀌면 달라짐)
+    manifest['version'] = content_hash(_json(manifest))
+    files[MANIFEST_NAME] = json.dumps(manifest, ensure_ascii=False, sort_keys=True, indent=2).encode('utf-8')
+    return files
+
+
+def _existing_files(out_dir: str) -> List[str]:
+    found = []
+    for dirpath, _, filenames in os.walk(out_dir):
+        for filename in filenames:
+            found.append(os.path.relpath(os.path.join(dirpath, filename), out_dir).replace(os.sep, '/'))
+    return found
+
+
+def write_output(out_dir: str, files: Dict[str, bytes]) -> None:
+    """Write new files, drop stale ones, and replace the manifest last."""
+    existing = _existing_files(out_dir) if os.path.isdir(out_dir) else []
+    if existing and MANIFEST_NAME not in existing:
+        raise ValueError(f"{out_dir} is not empty and was not written by build_assets.py")
+    for name, data in files.items():
+        if name == MANIFEST_NAME:
+            continue
+        path = os.path.join(out_dir, *name.split('/'))
+        # 이름이 내용의 해시이므로 이미 있으면 같은 파일
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path + '.tmp', 'wb') as f:
+                f.write(data)
+            os.replace(path + '.tmp', path)
+    manifest_path = os.path.join(out_dir, MANIFEST_NAME)
+    with open(manifest_path + '.tmp', 'wb') as f:
+        f.write(files[MANIFEST_NAME])
+    os.replace(manifest_path + '.tmp', manifest_path)
+    for name in set(existing) - set(files):
+        os.remove(os.path.join(out_dir, *name.split('/')))
+    for dirpath, _, _ in sorted(os.walk(out_dir), reverse=True):
+        if dirpath != out_dir and not os.listdir(dirpath):
+            os.rmdir(dirpath)
+
+
+def build(csv_path: Optional[str] = None, root: Optional[str] = None, out_dir: Optional[str] = None,
+          write: bool = True) -> Dict[str, Any]:
+    """Validate and (unless ``write=False``) write the bundles; returns the manifest."""
+    csv_path = csv_path or words.words_csv_path()
+    root = root or public_dir()
+    out_dir = out_dir or os.path.join(root, BUNDLE_DIR)
+    prefix = os.path.relpath(out_dir, root).replace(os.sep, '/')
+    if prefix.startswith('..'):
+        raise ValueError(f"Output directory {out_dir} must be inside the public directory {root}")
+    with open(csv_path, 'rb') as f:
+        raw = f.read()
+    files = build_files(raw, collect_audio(raw, root), prefix, os.path.basename(csv_path))
+    if write:
+        write_output(out_dir, files)
+    return json.loads(files[MANIFEST_NAME])
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Build content-hashed audio/word bundles for the React app.')
+    parser.add_argument('--words', help='word CSV (default: WORDS_CSV_PATH / words.py defaults)')
+    parser.add_argument('--public', help='public directory audio_path is relative to')
+    parser.add_argument('--out', help='output directory inside --public (default: <public>/bundles)')
+    parser.add_argument('--check', action='store_true', help='validate only, write nothing')
+    args = parser.parse_args(argv)
+    try:
+        manifest = build(args.words, args.public, args.out, write=not args.check)
+    except AssetError as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
+    print(f"version {manifest['version']} (words {manifest['words_version']}, {len(manifest['audio'])} clips)")
+    for round_number, entry in sorted(manifest['rounds'].items()):
+        print(f"round {round_number}\t{entry['words']} words\t{entry['bytes']} bytes\t{entry['bundle']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,290 @@
+"""Stream phonitale-user-responses (+ consent) into analysis files.
+
+Pages come from a parallel segmented Scan (or, with ``--user``, a Query on
+UserRoundIndex) and flow through a chain of generators. Memory stays
+bounded: a small queue of pages sits between the scan workers and the
+writer, and rows are flushed in fixed-size chunks. Each response item
+becomes one row per (user, english_word, round_number), joined to the
+participant's consent record, with timestamps as epoch-millisecond
+integers and durations as floats.
+
+Output is Parquet when pyarrow is installed (``--format parquet``) and
+chunked CSV otherwise::
+
+    python export_responses.py --out exports/2025-05-01 --segments 8
+"""
+import argparse
+import csv
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+import item_codec
+from table_schema import PHASES, to_float, user_round_query
+
+RESPONSES_TABLE = 'phonitale-user-responses'
+CONSENT_TABLE = 'phonitale-user-consent'
+
+# 출력 컬럼과 타입 (Parquet 스키마 및 CSV 헤더 공용)
+COLUMNS = [
+    ('user', 'string'),
+    ('english_word', 'string'),
+    ('round_number', 'int64'),
+]
+for _phase in PHASES:
+    COLUMNS += [
+        (f'{_phase}_in_ms', 'int64'),
+        (f'{_phase}_out_ms', 'int64'),
+        (f'{_phase}_duration_s', 'float64'),
+    ]
+COLUMNS += [
+    ('response_recognition', 'string'),
+    ('response_generation', 'string'),
+    ('correct_recognition', 'bool'),
+    ('correct_generation', 'bool'),
+    ('survey_ms', 'int64'),
+    ('usefulness', 'int64'),
+    ('coherence', 'int64'),
+    ('email', 'string'),
+    ('consent_agreed', 'bool'),
+    ('consent_ms', 'int64'),
+    ('test_end_ms', 'int64'),
+    ('total_duration_s', 'float64'),
+]
+COLUMN_NAMES = [name for name, _ in COLUMNS]
+
+_DONE = object()
+
+
+# ----------------------------------------------------------------------
+# 1. 읽기: 병렬 세그먼트 Scan / Query 페이지 스트림
+# ----------------------------------------------------------------------
+def scan_segment(table: Any, segment: int, total_segments: int,
+                 page_size: Optional[int] = None) -> Iterator[List[Dict[str, Any]]]:
+    """Pages of one Scan segment."""
+    kwargs: Dict[str, Any] = {'Segment': segment, 'TotalSegments': total_segments}
+    if page_size:
+        kwargs['Limit'] = page_size
+    while True:
+        page = table.scan(**kwargs)
+        yield page.get('Items', [])
+        if 'LastEvaluatedKey' not in page:
+            return
+        kwargs['ExclusiveStartKey'] = page['LastEvaluatedKey']
+
+
+def query_user(table: Any, user: str, page_size: Optional[int] = None) -> Iterator[List[Dict[str, Any]]]:
+    """Pages of one participant's items from UserRoundIndex."""
+    kwargs = user_round_query(user)
+    if page_size:
+        kwargs['Limit'] = page_size
+    while True:
+        page = table.query(**kwargs)
+        yield page.get('Items', [])
+        if 'LastEvaluatedKey' not in page:
+            return
+        kwargs['ExclusiveStartKey'] = page['LastEvaluatedKey']
+
+
+def parallel_scan(table: Any, total_segments: int = 4, page_size: Optional[int] = None,
+                  max_buffered_pages: int = 8) -> Iterator[List[Dict[str, Any]]]:
+    """Pages from all segments, scanned concurrently.
+
+    Workers block once ``max_buffered_pages`` pages are waiting, so a slow
+    consumer never makes the whole table pile up in memory.
+    """
+    pages: 'queue.Queue[Any]' = queue.Queue(maxsize=max_buffered_pages)
+    stop = threading.Event()
+
+    def worker(segment: int) -> None:
+        try:
+            for page in scan_segment(table, segment, total_segments, page_size):
+                while not stop.is_set():
+                    try:
+                        pages.put(page, timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+                if stop.is_set():
+                    return
+        except BaseException as e:  # 소비자 쪽에서 다시 발생시킴
+            pages.put(e)
+        finally:
+            pages.put(_DONE)
+
+    with ThreadPoolExecutor(max_workers=total_segments, thread_name_prefix='scan') as pool:
+        for segment in range(total_segments):
+            pool.submit(worker, segment)
+        remaining = total_segments
+        try:
+            while remaining:
+                page = pages.get()
+                if page is _DONE:
+                    remaining -= 1
+                elif isinstance(page, BaseException):
+                    raise page
+                else:
+                    yield page
+        finally:
+            stop.set()
+            # 대기 중인 워커가 종료할 수 있도록 큐 비우기
+            while remaining:
+                if pages.get() is _DONE:
+                    remaining -= 1
+
+
+# ----------------------------------------------------------------------
+# 2. 변환: 아이템 -> 타입이 지정된 행
+# ----------------------------------------------------------------------
+def _int(value: Any) -> Optional[int]:
+    if value is None or value == '':
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError, ArithmeticError):
+        return None
+
+
+def _epoch_ms(value: Any) -> Optional[int]:
+    if isinstance(value, (int, Decimal)):
+        return int(value)
+    return item_codec.iso_to_epoch_ms(value)
+
+
+def consent_index(pages: Iterable[List[Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+    """user id (``name#phone``, as the frontend builds it) -> consent columns."""
+    index = {}
+    for page in pages:
+        for item in page:
+            if not item.get('name') or not item.get('phone'):
+                continue
+            index[f"{item['name']}#{item['phone']}"] = {
+                'email': item.get('email'),
+                'consent_agreed': bool(item.get('consent_agreed')) if 'consent_agreed' in item else None,
+                'consent_ms': _epoch_ms(item.get('consent_agreed_date')),
+                'test_end_ms': _epoch_ms(item.get('test_end')),
+                'total_duration_s': to_float(item.get('total_duration')),
+            }
+    return index
+
+
+def item_to_row(item: Dict[str, Any], consent: Optional[Dict[str, Dict[str, Any]]] = None) -> Optional[Dict[str, Any]]:
+    """One typed output row, or None for items that are not word responses."""
+    data = item_codec.decode_item(item)
+    if 'english_word' not in data or 'user' not in data:
+        return None
+    row: Dict[str, Any] = {
+        'user': data['user'],
+        'english_word': data['english_word'],
+        'round_number': _int(data.get('round_number')),
+    }
+    for phase in PHASES:
+        row[f'{phase}_in_ms'] = _epoch_ms(data.get(f'timestamp_{phase}_in'))
+        row[f'{phase}_out_ms'] = _epoch_ms(data.get(f'timestamp_{phase}_out'))
+        row[f'{phase}_duration_s'] = to_float(data.get(f'duration_{phase}'))
+    for phase in ('recognition', 'generation'):
+        value = data.get(f'response_{phase}')
+        row[f'response_{phase}'] = None if value is None else str(value)
+        correct = data.get(f'correct_{phase}')
+        row[f'correct_{phase}'] = None if correct is None else bool(correct)
+    row['survey_ms'] = _epoch_ms(data.get('timestamp_survey'))
+    row['usefulness'] = _int(data.get('usefulness'))
+    row['coherence'] = _int(data.get('coherence'))
+    joined = (consent or {}).get(data['user'], {})
+    for name in ('email', 'consent_agreed', 'consent_ms', 'test_end_ms', 'total_duration_s'):
+        row[name] = joined.get(name)
+    return row
+
+
+def rows_from_pages(pages: Iterable[List[Dict[str, Any]]],
+                    consent: Optional[Dict[str, Dict[str, Any]]] = None) -> Iterator[Dict[str, Any]]:
+    for page in pages:
+        for item in page:
+            row = item_to_row(item, consent)
+            if row is not None:
+                yield row
+
+
+def chunked(rows: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    chunk: List[Dict[str, Any]] = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# ----------------------------------------------------------------------
+# 3. 쓰기: 청크 단위 CSV / Parquet
+# ----------------------------------------------------------------------
+def write_csv_chunks(chunks: Iterable[List[Dict[str, Any]]], out_dir: str,
+                     prefix: str = 'responses') -> List[str]:
+    """One CSV file per chunk (``responses-00000.csv``, ...)."""
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for number, chunk in enumerate(chunks):
+        path = os.path.join(out_dir, f'{prefix}-{number:05d}.csv')
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=COLUMN_NAMES)
+            writer.writeheader()
+            writer.writerows(chunk)
+        paths.append(path)
+    return paths
+
+
+def write_parquet(chunks: Iterable[List[Dict[str, Any]]], out_dir: str,
+                  prefix: str = 'responses') -> List[str]:
+    """Single Parquet file, one row group per chunk (requires pyarrow)."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    types = {'string': pa.string(), 'int64': pa.int64(), 'float64': pa.float64(), 'bool': pa.bool_()}
+    schema = pa.schema([(name, types[kind]) for name, kind in COLUMNS])
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, f'{prefix}.parquet')
+    with pq.ParquetWriter(path, schema) as writer:
+        for chunk in chunks:
+            writer.write_batch(pa.RecordBatch.from_pylist(chunk, schema=schema))
+    return [path]
+
+
+WRITERS: Dict[str, Callable[..., List[str]]] = {'csv': write_csv_chunks, 'parquet': write_parquet}
+
+
+def export(responses_table: Any, consent_table: Any, out_dir: str, fmt: str = 'csv',
+           total_segments: int = 4, page_size: Optional[int] = None,
+           chunk_rows: int = 50000, user: Optional[str] = None) -> List[str]:
+    """Run the whole pipeline and return the written file paths."""
+    consent = consent_index(parallel_scan(consent_table, total_segments=1, page_size=page_size))
+    if user:
+        pages: Iterable[List[Dict[str, Any]]] = query_user(responses_table, user, page_size)
+    else:
+        pages = parallel_scan(responses_table, total_segments=total_segments, page_size=page_size)
+    return WRITERS[fmt](chunked(rows_from_pages(pages, consent), chunk_rows), out_dir)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Export phonitale responses to CSV/Parquet.')
+    parser.add_argument('--out', required=True, help='output directory')
+    parser.add_argument('--format', choices=sorted(WRITERS), default='csv')
+    parser.add_argument('--segments', type=int, default=4, help='parallel Scan segments')
+    parser.add_argument('--page-size', type=int, default=None)
+    parser.add_argument('--chunk-rows', type=int, default=50000)
+    parser.add_argument('--user', help='export one participant via UserRoundIndex instead of scanning')
+    args = parser.parse_args(argv)
+
+    import aws_clients
+    paths = export(aws_clients.cli_table(RESPONSES_TABLE), aws_clients.cli_table(CONSENT_TABLE), args.out,
+                   fmt=args.format, total_segments=args.segments, page_size=args.page_size,
+                   chunk_rows=args.chunk_rows, user=args.user)
+    for path in paths:
+        print(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,250 @@
+"""Grading of recognition and generation responses against the word list.
+
+On the recognition page participants type the Korean meaning of an English
+word; on the generation page they type the English word. ``AnswerIndex``
+turns the ``meaning``/``word`` columns of the word CSV into normalized
+accepted answers once per word-file version:
+
+* a meaning such as ``"약삭빠른, 영리한"`` accepts each comma/semicolon/slash
+  separated variant (separators inside parentheses do not split), with and
+  without its parenthesized part: ``"(~라고) 생각하다"`` accepts
+  ``"생각하다"`` and ``"~라고 생각하다"``;
+* responses and answers are compared after NFKC normalization and case
+  folding, with whitespace, punctuation and symbols removed.
+
+Scores are written inline with each response (``correct_recognition`` /
+``correct_generation``, see lambda_function.build_response_update) and can
+be recomputed over an export after the answer rules change::
+
+    python grading.py exports/2025-05-01
+
+Normalization is memoized and lookups are hash-set membership, so bulk
+grading costs roughly one dict lookup per response (participants give the
+same few answers per word).
+"""
+import argparse
+import csv
+import functools
+import glob
+import os
+import re
+import threading
+import unicodedata
+from typing import Any, Dict, FrozenSet, Iterable, Iterator, List, Optional, Sequence
+
+import words
+
+GRADED_PAGE_TYPES = ('recognition', 'generation')
+# 응답이 없을 때 저장되는 기본값 (lambda_function.phase_fields) - 채점하지 않음
+NOT_ANSWERED = frozenset({None, 'N/A'})
+
+MEANING_SEPARATORS = frozenset(',;/')
+PARENTHESIZED = re.compile(r'\([^)]*\)|\[[^\]]*\]')
+
+_index: Optional['AnswerIndex'] = None
+_index_lock = threading.Lock()
+
+
+def correct_attr(page_type: str) -> str:
+    return f"correct_{page_type}"
+
+
+@functools.lru_cache(maxsize=65536)
+def normalize(text: str) -> str:
+    """NFKC + casefold, keeping letters and digits only (Hangul included)."""
+    text = unicodedata.normalize('NFKC', text).casefold()
+    # 공백(Z), 문장부호(P), 기호(S), 제어문자(C) 제거
+    return ''.join(ch for ch in text if unicodedata.category(ch)[0] not in 'ZPSC')
+
+
+def split_meaning(meaning: str) -> List[str]:
+    """Split on separators outside parentheses/brackets."""
+    parts, current, depth = [], [], 0
+    for ch in meaning:
+        if ch in '([':
+            depth += 1
+        elif ch in ')]':
+            depth = max(0, depth - 1)
+        elif ch in MEANING_SEPARATORS and depth == 0:
+            parts.append(''.join(current))
+            current = []
+            continue
+        current.append(ch)
+    parts.append(''.join(current))
+    return parts
+
+
+def meaning_variants(meaning: str) -> FrozenSet[str]:
+    """Normalized accepted answers for one ``meaning`` cell."""
+    variants = set()
+    for part in split_meaning(meaning or ''):
+        for candidate in (part, PARENTHESIZED.sub('', part)):
+            normalized = normalize(candidate)
+            if normalized:
+                variants.add(normalized)
+    return frozenset(variants)
+
+
+class AnswerIndex:
+    """Accepted answers per english_word for each graded page type."""
+
+    def __init__(self, rows: Iterable[Dict[str, str]], version: str = ''):
+        self.version = version
+        self.accepted: Dict[str, Dict[str, FrozenSet[str]]] = {page_type: {} for page_type in GRADED_PAGE_TYPES}
+        for row in rows:
+            word = (row.get('word') or '').strip()
+            if not word:
+                continue
+            self.accepted['recognition'][word] = (
+                self.accepted['recognition'].get(word, frozenset()) | meaning_variants(row.get('meaning', '')))
+            self.accepted['generation'][word] = frozenset({normalize(word)})
+
+    @classmethod
+    def from_csv(cls, path: str, version: str = '') -> 'AnswerIndex':
+        # GET /words 는 1-3 라운드만 싣지만 채점은 파일의 모든 단어 대상
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            return cls(csv.DictReader(f), version)
+
+    def grade(self, page_type: str, english_word: str, response: Any) -> Optional[bool]:
+        """True/False, or None when the word is unknown or there is no answer."""
+        accepted = self.accepted.get(page_type, {}).get(english_word)
+        if accepted is None or response in NOT_ANSWERED:
+            return None
+        return normalize(str(response)) in accepted
+
+    def grade_batch(self, page_type: str, english_words: Sequence[str],
+                    responses: Sequence[Any]) -> List[Optional[bool]]:
+        """``grade`` over two parallel columns."""
+        accepted_by_word = self.accepted.get(page_type, {})
+        results: List[Optional[bool]] = []
+        append = results.append
+        for english_word, response in zip(english_words, responses):
+            accepted = accepted_by_word.get(english_word)
+            if accepted is None or response in NOT_ANSWERED:
+                append(None)
+            else:
+                append(normalize(response if isinstance(response, str) else str(response)) in accepted)
+        return results
+
+
+def answer_index() -> Optional[AnswerIndex]:
+    """Index of the current word file (rebuilt when its version changes).
+
+    None when the word file is not available, so writes never fail on it.
+    """
+    global _index
+    try:
+        cache = words.get_words()
+        index = _index
+        if index is None or index.version != cache['version']:
+            with _index_lock:
+                if _index is None or _index.version != cache['version']:
+                    _index = AnswerIndex.from_csv(cache['path'], cache['version'])
+                index = _index
+    except OSError:
+        return None
+    return index
+
+
+def grade(page_type: str, english_word: str, response: Any) -> Optional[bool]:
+    """Grade one response with the current word file (inline, at write time)."""
+    index = answer_index()
+    return index.grade(page_type, english_word, response) if index is not None else None
+
+
+# ----------------------------------------------------------------------
+# export 재채점 (export_responses.py 의 CSV / Parquet 출력)
+# ----------------------------------------------------------------------
+def regrade_rows(rows: Iterable[Dict[str, Any]], index: AnswerIndex,
+                 chunk_rows: int = 50000) -> Iterator[Dict[str, Any]]:
+    """Rows with ``correct_*`` recomputed from their ``response_*`` columns."""
+    chunk: List[Dict[str, Any]] = []
+
+    def flush() -> Iterator[Dict[str, Any]]:
+        english_words = [row['english_word'] for row in chunk]
+        for page_type in GRADED_PAGE_TYPES:
+            column = f"response_{page_type}"
+            grades = index.grade_batch(page_type, english_words,
+                                       [row.get(column) for row in chunk])
+            for row, correct in zip(chunk, grades):
+                row[correct_attr(page_type)] = correct
+        yield from chunk
+
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_rows:
+            yield from flush()
+            chunk = []
+    if chunk:
+        yield from flush()
+
+
+def _csv_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    # CSV 에서는 None 이 빈 문자열로 저장됨 - 응답 없음으로 복원
+    for page_type in GRADED_PAGE_TYPES:
+        if row.get(f"response_{page_type}") == '':
+            row[f"response_{page_type}"] = None
+    return row
+
+
+def regrade_csv(path: str, index: AnswerIndex) -> int:
+    """Rewrite one export CSV in place; returns the number of rows."""
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        fieldnames = list(reader.fieldnames or [])
+        rows = list(regrade_rows(map(_csv_row, reader), index))
+    for page_type in GRADED_PAGE_TYPES:
+        if correct_attr(page_type) not in fieldnames:
+            fieldnames.append(correct_attr(page_type))
+    tmp = path + '.tmp'
+    with open(tmp, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
+    os.replace(tmp, path)
+    return len(rows)
+
+
+def regrade_parquet(path: str, index: AnswerIndex) -> int:
+    """Rewrite one export Parquet file in place, column-wise (requires pyarrow)."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    table = pq.read_table(path)
+    english_words = table.column('english_word').to_pylist()
+    for page_type in GRADED_PAGE_TYPES:
+        grades = pa.array(index.grade_batch(page_type, english_words,
+                                            table.column(f"response_{page_type}").to_pylist()), pa.bool_())
+        name = correct_attr(page_type)
+        if name in table.column_names:
+            table = table.set_column(table.column_names.index(name), name, grades)
+        else:
+            table = table.append_column(name, grades)
+    pq.write_table(table, path + '.tmp')
+    os.replace(path + '.tmp', path)
+    return table.num_rows
+
+
+def regrade_export(out_dir: str, index: Optional[AnswerIndex] = None) -> Dict[str, int]:
+    """Re-grade every responses file of an export directory (path -> rows)."""
+    index = index or answer_index()
+    if index is None:
+        raise FileNotFoundError(f"Word file not found: {words.words_csv_path()}")
+    counts = {}
+    for path in sorted(glob.glob(os.path.join(out_dir, 'responses-*.csv'))):
+        counts[path] = regrade_csv(path, index)
+    for path in sorted(glob.glob(os.path.join(out_dir, 'responses.parquet'))):
+        counts[path] = regrade_parquet(path, index)
+    return counts
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Re-grade recognition/generation responses of an export.')
+    parser.add_argument('export_dir', help='directory written by export_responses.py')
+    args = parser.parse_args(argv)
+    for path, rows in regrade_export(args.export_dir).items():
+        print(f"{path}\t{rows}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,158 @@
+"""Idempotency keys for POST requests (client retries and double submits).
+
+A client sends ``Idempotency-Key: <key>`` with a POST. The first request
+with a given key claims a marker item in phonitale-user-responses
+(``PK=IDEMP#<hash>``) with a conditional put, runs normally, and then
+stores its status and body on the marker. Any later request with the same
+key gets that stored response back without touching the response items
+again, so a retry can never overwrite the timestamps of the first write.
+
+Completed results are also kept in a per-container LRU, so a retry that
+lands on the same warm container costs no DynamoDB call at all. Markers
+expire through DynamoDB TTL (``expires_at``); the TTL attribute is also
+checked in the claim condition because TTL deletion lags by hours.
+
+In write-behind mode (ingest_queue.py) requests that only enqueue skip the
+marker: the key becomes the FIFO MessageDeduplicationId of their messages,
+so DynamoDB stays off the request path.
+
+Only 2xx results are stored. Failed requests release their marker so the
+client can retry with the same key. A marker stuck in ``pending`` (e.g.
+the invocation timed out) can be re-claimed once its lease runs out.
+
+Configuration (environment):
+    IDEMPOTENCY_TTL_SECONDS     marker lifetime (default 86400)
+    IDEMPOTENCY_LEASE_SECONDS   how long a pending claim blocks retries (default 30)
+    IDEMPOTENCY_CACHE_SIZE      completed results kept per container (default 2048)
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import aws_clients
+
+HEADER = 'idempotency-key'
+MAX_KEY_LENGTH = 256
+PENDING = 'pending'
+COMPLETE = 'complete'
+
+TTL_SECONDS = int(os.environ.get('IDEMPOTENCY_TTL_SECONDS', '86400'))
+LEASE_SECONDS = int(os.environ.get('IDEMPOTENCY_LEASE_SECONDS', '30'))
+CACHE_SIZE = int(os.environ.get('IDEMPOTENCY_CACHE_SIZE', '2048'))
+
+# 완료된 결과만 보관 (key -> record). 컨테이너 단위, 웜 호출 간 유지
+_cache: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def request_key(event: Dict[str, Any]) -> Optional[str]:
+    """The Idempotency-Key of a POST event (None when absent)."""
+    if event.get('httpMethod') != 'POST':
+        return None
+    for name, value in (event.get('headers') or {}).items():
+        if name.lower() == HEADER:
+            key = (value or '').strip()
+            if not key:
+                return None
+            if len(key) > MAX_KEY_LENGTH:
+                raise ValueError(f"Idempotency-Key must be at most {MAX_KEY_LENGTH} characters")
+            return key
+    return None
+
+
+def fingerprint(event: Dict[str, Any]) -> str:
+    body = event.get('body') or ''
+    return hashlib.sha256(f"{event.get('path', '')}\n{body}".encode('utf-8')).hexdigest()[:32]
+
+
+def marker_key(key: str) -> Dict[str, str]:
+    # 클라이언트 키에는 참가자 정보가 들어갈 수 있으므로 해시만 저장
+    return {'PK': 'IDEMP#' + hashlib.sha256(key.encode('utf-8')).hexdigest()[:40], 'SK': 'IDEMP'}
+
+
+def cached(key: str, now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    now = time.time() if now is None else now
+    with _cache_lock:
+        record = _cache.get(key)
+        if record is None:
+            return None
+        if record['expires_at'] <= now:
+            del _cache[key]
+            return None
+        _cache.move_to_end(key)
+        return record
+
+
+def _remember(key: str, record: Dict[str, Any]) -> None:
+    with _cache_lock:
+        _cache[key] = record
+        _cache.move_to_end(key)
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+def clear_cache() -> None:
+    with _cache_lock:
+        _cache.clear()
+
+
+def claim(table: Any, key: str, request_fingerprint: str, now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """Claim ``key`` for this request.
+
+    Returns None when the claim succeeded (the caller should process the
+    request), otherwise the existing record: ``status`` is ``complete``
+    (replay ``status_code``/``body``) or ``pending`` (another attempt is
+    still running).
+    """
+    now = time.time() if now is None else now
+    record = cached(key, now)
+    if record is not None:
+        return record
+    epoch = int(now)
+    try:
+        table.put_item(
+            Item={**marker_key(key), 'status': PENDING, 'fingerprint': request_fingerprint,
+                  'lease_until': epoch + LEASE_SECONDS, 'expires_at': epoch + TTL_SECONDS},
+            ConditionExpression=('attribute_not_exists(#pk) OR #exp < :now'
+                                 ' OR (#st = :pending AND #lease < :now)'),
+            ExpressionAttributeNames={'#pk': 'PK', '#exp': 'expires_at', '#st': 'status',
+                                      '#lease': 'lease_until'},
+            ExpressionAttributeValues={':now': epoch, ':pending': PENDING},
+        )
+        return None
+    except Exception as e:
+        if aws_clients.error_code(e) != 'ConditionalCheckFailedException':
+            raise
+    item = table.get_item(Key=marker_key(key), ConsistentRead=True).get('Item')
+    if item is None:
+        # 조회 사이에 해제된 경우 - 진행 중으로 간주하고 클라이언트가 재시도
+        return {'status': PENDING}
+    record = {'status': item.get('status'), 'fingerprint': item.get('fingerprint'),
+              'expires_at': int(item.get('expires_at', epoch)), 'status_code': int(item.get('status_code', 200)),
+              'body': item.get('response_body', '')}
+    if record['status'] == COMPLETE:
+        _remember(key, record)
+    return record
+
+
+def complete(table: Any, key: str, request_fingerprint: str, status_code: int, body: str,
+             now: Optional[float] = None) -> None:
+    """Store the result of a claimed request so retries replay it."""
+    now = time.time() if now is None else now
+    epoch = int(now)
+    record = {'status': COMPLETE, 'fingerprint': request_fingerprint, 'expires_at': epoch + TTL_SECONDS,
+              'status_code': status_code, 'body': body}
+    _remember(key, record)
+    table.put_item(Item={**marker_key(key), 'status': COMPLETE, 'fingerprint': request_fingerprint,
+                         'expires_at': record['expires_at'], 'status_code': status_code,
+                         'response_body': body})
+
+
+def release(table: Any, key: str) -> None:
+    """Drop a pending claim after a failed request (the key can be retried)."""
+    table.delete_item(Key=marker_key(key), ConditionExpression='#st = :pending',
+                      ExpressionAttributeNames={'#st': 'status'},
+                      ExpressionAttributeValues={':pending': PENDING})
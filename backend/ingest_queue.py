@@ -0,0 +1,248 @@
+"""Write-behind ingest: queue validated response updates, write them later.
+
+With ``RESPONSE_WRITE_MODE=queue`` the POST /responses(/batch) routes
+validate each record, turn it into its update (``build_response_update``,
+so server-side values such as the survey timestamp are fixed at receive
+time) and enqueue it, answering 202 without waiting on DynamoDB.
+``lambda_function.queue_consumer_handler`` drains the queue in batches,
+merges updates per (user, english_word) and writes them with the usual
+UpdateExpression semantics (``if_not_exists`` for init attributes).
+
+Queues:
+    SqsQueue      production (``RESPONSE_QUEUE_URL``); a ``.fifo`` queue gets
+                  MessageGroupId=group_id(user) so each participant's writes
+                  stay ordered
+    MemoryQueue   in-process, for tests and local runs
+    FileQueue     JSON lines on disk, for local runs across processes
+
+A request's ``Idempotency-Key`` becomes the FIFO MessageDeduplicationId
+of its updates (``dedup_id``) instead of a marker item (idempotency.py),
+so a retry within the SQS deduplication window (5 minutes) is dropped by
+the queue and the request path makes no DynamoDB call at all.
+
+SQS delivers at least once; replaying an update is harmless because every
+write sets the same values again. Use a FIFO queue: the consumer redelivers
+from a participant's first failed message onwards, and only FIFO
+redelivery keeps those ahead of the participant's later pages.
+
+Configuration (environment):
+    RESPONSE_WRITE_MODE   "sync" (default) or "queue"
+    RESPONSE_QUEUE_URL    SQS queue URL
+    RESPONSE_QUEUE        "memory" or "file:<path>" when there is no SQS URL
+"""
+import hashlib
+import json
+import os
+import threading
+import uuid
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+import aws_clients
+
+# SQS SendMessageBatch / ReceiveMessage 한 번에 최대 10개
+SQS_BATCH_SIZE = 10
+
+Message = Tuple[str, str]  # (message id / receipt handle, body)
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def write_behind_enabled() -> bool:
+    return os.environ.get('RESPONSE_WRITE_MODE', 'sync').lower() == 'queue'
+
+
+def encode(update: Dict[str, Any]) -> str:
+    return json.dumps(update, ensure_ascii=False, separators=(',', ':'), default=str)
+
+
+def decode(body: str) -> Dict[str, Any]:
+    # DynamoDB 는 float 를 받지 않으므로 소수는 Decimal 로 복원
+    return json.loads(body, parse_float=Decimal)
+
+
+def group_id(user: str) -> str:
+    """FIFO MessageGroupId of a participant.
+
+    The user id is ``name#phone`` with a Korean name, and SQS only accepts
+    ASCII alphanumerics and punctuation here, so use a stable hex digest.
+    """
+    return hashlib.sha256(user.encode('utf-8')).hexdigest()[:64]
+
+
+def dedup_id(key: str, position: int) -> str:
+    """FIFO MessageDeduplicationId of the ``position``-th update of a request with Idempotency-Key ``key``."""
+    # 키에는 참가자 정보가 들어갈 수 있으므로 해시만 전송
+    return hashlib.sha256(f"{key}\n{position}".encode('utf-8')).hexdigest()
+
+
+class QueueUnavailable(Exception):
+    """The queue rejected some messages; the request should be retried."""
+
+
+class MemoryQueue:
+    """In-process FIFO queue with SQS-like receive/delete and deduplication."""
+
+    def __init__(self) -> None:
+        self._messages: List[Message] = []
+        self._lock = threading.Lock()
+        # FIFO 중복 제거 (SQS 와 달리 5분 창 없이 프로세스가 끝날 때까지)
+        self._dedup_ids: Set[str] = set()
+
+    def _fresh(self, bodies: List[str], dedup_ids: Optional[List[str]]) -> List[str]:
+        if not dedup_ids:
+            return list(bodies)
+        fresh = []
+        for body, message_dedup_id in zip(bodies, dedup_ids):
+            if message_dedup_id not in self._dedup_ids:
+                self._dedup_ids.add(message_dedup_id)
+                fresh.append(body)
+        return fresh
+
+    def send(self, bodies: List[str], group_ids: Optional[List[str]] = None,
+             dedup_ids: Optional[List[str]] = None) -> None:
+        with self._lock:
+            self._messages.extend((uuid.uuid4().hex, body) for body in self._fresh(bodies, dedup_ids))
+
+    def receive(self, max_messages: int = SQS_BATCH_SIZE) -> List[Message]:
+        with self._lock:
+            batch, self._messages = self._messages[:max_messages], self._messages[max_messages:]
+            return batch
+
+    def release(self, messages: List[Message]) -> None:
+        """Put unprocessed messages back at the head, as FIFO redelivery would."""
+        with self._lock:
+            self._messages[:0] = messages
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+
+class FileQueue(MemoryQueue):
+    """MemoryQueue persisted as JSON lines, so a separate process can drain it."""
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+
+    def _load(self) -> List[Message]:
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, encoding='utf-8') as f:
+            return [tuple(json.loads(line)) for line in f if line.strip()]
+
+    def _store(self, messages: List[Message]) -> None:
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            for message in messages:
+                f.write(json.dumps(list(message), ensure_ascii=False) + '\n')
+        os.replace(tmp, self.path)
+
+    def send(self, bodies: List[str], group_ids: Optional[List[str]] = None,
+             dedup_ids: Optional[List[str]] = None) -> None:
+        with self._lock, open(self.path, 'a', encoding='utf-8') as f:
+            for body in self._fresh(bodies, dedup_ids):
+                f.write(json.dumps([uuid.uuid4().hex, body], ensure_ascii=False) + '\n')
+
+    def receive(self, max_messages: int = SQS_BATCH_SIZE) -> List[Message]:
+        with self._lock:
+            messages = self._load()
+            self._store(messages[max_messages:])
+            return messages[:max_messages]
+
+    def release(self, messages: List[Message]) -> None:
+        with self._lock:
+            self._store(list(messages) + self._load())
+
+    def __len__(self) -> int:
+        return len(self._load())
+
+
+class SqsQueue:
+    """Producer side of an SQS queue (consumption is the Lambda event source)."""
+
+    def __init__(self, url: str, client: Any = None):
+        self.url = url
+        self.fifo = url.endswith('.fifo')
+        self._client = client
+
+    @property
+    def client(self) -> Any:
+        return self._client or aws_clients.sqs_client()
+
+    def send(self, bodies: List[str], group_ids: Optional[List[str]] = None,
+             dedup_ids: Optional[List[str]] = None) -> None:
+        for start in range(0, len(bodies), SQS_BATCH_SIZE):
+            entries = []
+            for offset, body in enumerate(bodies[start:start + SQS_BATCH_SIZE]):
+                entry = {'Id': str(offset), 'MessageBody': body}
+                if self.fifo:
+                    entry['MessageGroupId'] = group_ids[start + offset] if group_ids else 'responses'
+                    entry['MessageDeduplicationId'] = (dedup_ids[start + offset] if dedup_ids
+                                                       else uuid.uuid4().hex)
+                entries.append(entry)
+            from botocore.exceptions import BotoCoreError, ClientError
+            try:
+                response = self.client.send_message_batch(QueueUrl=self.url, Entries=entries)
+            except (BotoCoreError, ClientError) as e:
+                # botocore 재시도(SQS_MAX_ATTEMPTS) 후에도 실패 - 클라이언트가 다시 보내도록 503
+                code = aws_clients.error_code(e) or type(e).__name__
+                raise QueueUnavailable(f"SendMessageBatch failed: {code}") from e
+            failed = response.get('Failed') or []
+            if failed:
+                raise QueueUnavailable(f"{len(failed)} of {len(entries)} messages were not queued: "
+                                       f"{failed[0].get('Code')}")
+
+
+def get_queue() -> Any:
+    """The configured queue (created once per container)."""
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                url = os.environ.get('RESPONSE_QUEUE_URL')
+                local = os.environ.get('RESPONSE_QUEUE', 'memory')
+                if url:
+                    _queue = SqsQueue(url)
+                elif local.startswith('file:'):
+                    _queue = FileQueue(local[len('file:'):])
+                else:
+                    _queue = MemoryQueue()
+    return _queue
+
+
+def set_queue(queue: Any) -> None:
+    """Replace the container's queue (tests and local runs)."""
+    global _queue
+    _queue = queue
+
+
+def enqueue(updates: List[Dict[str, Any]], idempotency_key: Optional[str] = None) -> None:
+    """Queue ``updates``; with the request's Idempotency-Key a retried request is deduplicated."""
+    dedup_ids = [dedup_id(idempotency_key, i) for i in range(len(updates))] if idempotency_key else None
+    get_queue().send([encode(update) for update in updates], [group_id(update['user']) for update in updates],
+                     dedup_ids)
+
+
+def sqs_event(messages: List[Message]) -> Dict[str, Any]:
+    """SQS-triggered Lambda event for ``messages``."""
+    return {'Records': [{'messageId': message_id, 'body': body, 'eventSource': 'aws:sqs'}
+                        for message_id, body in messages]}
+
+
+def drain_local(queue: MemoryQueue, consumer: Callable[[Dict[str, Any], Any], Dict[str, Any]],
+                batch_size: int = SQS_BATCH_SIZE, max_batches: Optional[int] = None) -> int:
+    """Feed a local queue to ``consumer`` the way the SQS event source would.
+
+    Messages the consumer reports in ``batchItemFailures`` go back to the
+    head of the queue. Returns the number of batches delivered.
+    """
+    batches = 0
+    while len(queue) and (max_batches is None or batches < max_batches):
+        messages = queue.receive(batch_size)
+        result = consumer(sqs_event(messages), None) or {}
+        failed = {failure['itemIdentifier'] for failure in result.get('batchItemFailures', [])}
+        queue.release([message for message in messages if message[0] in failed])
+        batches += 1
+    return batches
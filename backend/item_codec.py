@@ -0,0 +1,95 @@
+"""Compact storage format for phonitale-user-responses items.
+
+DynamoDB bills writes by item size (attribute names included), so the
+compact format (schema version 2) stores each response attribute under a
+short code and every timestamp as integer epoch milliseconds. ``user`` and
+``english_word`` are not stored at all; they are recovered from PK/SK.
+
+Writers opt in with ``RESPONSE_ITEM_FORMAT=compact``. Readers always go
+through ``decode_item``, which accepts both formats (and items that mix
+them after a format switch) and returns the logical field names, so GET
+/responses, exports and analysis do not care how an item was written.
+"""
+import os
+from decimal import Decimal
+from typing import Any, Dict, Optional
+
+import timestamps
+
+SCHEMA_ATTR = 'v'
+COMPACT_VERSION = 2
+
+# 논리 필드명 -> 저장용 짧은 코드 (한 번 배포된 코드는 변경/재사용 금지)
+FIELD_CODES = {
+    'round_number': 'r',
+    'timestamp_learning_in': 'li',
+    'timestamp_learning_out': 'lo',
+    'duration_learning': 'ld',
+    'timing_flags_learning': 'lf',
+    'timestamp_recognition_in': 'ri',
+    'timestamp_recognition_out': 'ro',
+    'duration_recognition': 'rd',
+    'timing_flags_recognition': 'rf',
+    'response_recognition': 'rr',
+    'correct_recognition': 'rc',
+    'timestamp_generation_in': 'gi',
+    'timestamp_generation_out': 'go',
+    'duration_generation': 'gd',
+    'timing_flags_generation': 'gf',
+    'response_generation': 'gr',
+    'correct_generation': 'gc',
+    'timestamp_survey': 'st',
+    'usefulness': 'su',
+    'coherence': 'sc',
+}
+FIELD_NAMES = {code: name for name, code in FIELD_CODES.items()}
+TIMESTAMP_FIELDS = frozenset(name for name in FIELD_CODES if name.startswith('timestamp_'))
+
+# PK/SK 에서 복원 가능한 속성 (compact 포맷에서는 저장하지 않음)
+DERIVED_FIELDS = frozenset({'user', 'english_word'})
+KEY_FIELDS = frozenset({'PK', 'SK', 'GSI1SK'})
+
+
+def compact_enabled() -> bool:
+    return os.environ.get('RESPONSE_ITEM_FORMAT', 'standard').lower() == 'compact'
+
+
+def iso_to_epoch_ms(value: Any) -> Optional[int]:
+    """Epoch milliseconds of an ISO-8601 string (None if it does not parse)."""
+    return timestamps.parse_epoch_ms(value)
+
+
+epoch_ms_to_iso = timestamps.epoch_ms_to_iso
+
+
+def encode_attrs(attrs: Dict[str, Any]) -> Dict[str, Any]:
+    """Logical attributes -> compact attributes (unknown names pass through)."""
+    encoded = {}
+    for name, value in attrs.items():
+        if name in DERIVED_FIELDS:
+            continue
+        if name in TIMESTAMP_FIELDS:
+            epoch_ms = iso_to_epoch_ms(value)
+            # 파싱할 수 없는 값은 원문 문자열 그대로 보존
+            value = epoch_ms if epoch_ms is not None else value
+        encoded[FIELD_CODES.get(name, name)] = value
+    return encoded
+
+
+def decode_item(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Stored item (either format) -> logical field names and ISO timestamps."""
+    if SCHEMA_ATTR not in item:
+        return dict(item)
+    decoded: Dict[str, Any] = {}
+    for attr, value in item.items():
+        if attr == SCHEMA_ATTR:
+            continue
+        name = FIELD_NAMES.get(attr, attr)
+        if name in TIMESTAMP_FIELDS and isinstance(value, (int, Decimal)):
+            value = epoch_ms_to_iso(value)
+        decoded[name] = value
+    if 'user' not in decoded and str(item.get('PK', '')).startswith('USER#'):
+        decoded['user'] = item['PK'][len('USER#'):]
+    if 'english_word' not in decoded and str(item.get('SK', '')).startswith('WORD#'):
+        decoded['english_word'] = item['SK'][len('WORD#'):]
+    return decoded
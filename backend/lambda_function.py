@@ -1,322 +1,838 @@
+import base64
+import functools
 import json
-import boto3
 from datetime import datetime, timezone
-from typing import Dict, Any, Union
-import traceback # 에러 로깅 강화
-
-dynamodb = boto3.resource('dynamodb')
-table_responses = dynamodb.Table('phonitale-user-responses')
-table_consent = dynamodb.Table('phonitale-user-consent')
-
-# ISO 8601 문자열을 datetime 객체로 파싱하는 헬퍼 함수
-def parse_isoformat(timestamp_str: str) -> Union[datetime, None]:
-    if not timestamp_str:
-        return None
-    try:
-        # ISO 8601 형식에 Z가 포함될 수 있으므로 처리
-        if timestamp_str.endswith('Z'):
-            timestamp_str = timestamp_str[:-1] + '+00:00'
-        return datetime.fromisoformat(timestamp_str)
-    except (ValueError, TypeError):
-        print(f"Error parsing timestamp: {timestamp_str}")
-        return None
+from decimal import Decimal
+from typing import Dict, Any, List, NamedTuple, Optional, Tuple
+import aws_clients
+import grading
+import idempotency
+import ingest_queue
+import item_codec
+import retry
+import session_summary
+import timestamps
+import words
+from metrics import InstrumentedTable, metrics
+from request_log import log
+from table_schema import response_key, round_prefix, user_partition_key, user_round_query
+
+# 테이블은 첫 사용 시점에 생성 (boto3 resource 대신 풀링된 low-level client 사용)
+# 모든 호출의 지연 시간과 consumed capacity 는 metrics 로 기록 (재시도 포함 시간)
+# 스로틀링은 남은 실행 시간 안에서만 재시도하고, 계속 실패하면 503 으로 빠르게 응답
+table_responses = InstrumentedTable(retry.RetryingTable(aws_clients.LazyTable('phonitale-user-responses')))
+table_consent = InstrumentedTable(retry.RetryingTable(aws_clients.LazyTable('phonitale-user-consent')))
+
+# phonitale-user-responses 단일 테이블 키 구성은 table_schema.py
+RESPONSES_PAGE_LIMIT = 100
+RESPONSES_MAX_PAGE_LIMIT = 500
+
+CORS_HEADERS = {
+    'Access-Control-Allow-Origin': '*', # 중요: 실제 배포 시에는 React 앱 도메인으로 제한!
+    'Access-Control-Allow-Headers': 'Content-Type,Idempotency-Key', # 필요한 헤더 명시
+    'Access-Control-Allow-Methods': 'OPTIONS,POST,GET', # 허용할 메소드 명시
+    'Access-Control-Expose-Headers': 'ETag,X-Words-Version,Idempotency-Replayed'
+}
+
+# 컨테이너의 첫 호출(콜드 스타트) 여부 - 요청 로그에 함께 기록
+_cold_start = True
+_init_reported = False
+
+# ISO 8601 문자열 -> epoch ms (timestamps.py), 파싱 실패 시 ValueError
+def parse_epoch_ms(timestamp_str: str) -> int:
+    epoch_ms = timestamps.parse_epoch_ms(timestamp_str)
+    if epoch_ms is None:
+        log.warn("timestamp_unparseable", timestamp=timestamp_str)
+        raise ValueError("Could not parse consent_agreed_date or test_end_timestamp")
+    if not timestamps.has_timezone(timestamp_str):
+        log.warn("naive_timestamp")  # UTC 로 간주
+    return epoch_ms
 
 def parse_event_body(event: Dict[str, Any]) -> Dict[str, Any]:
     """Helper function to parse request body from API Gateway event"""
-    print("Received raw event:", json.dumps(event)) # Raw event 로깅
     body_str = event.get('body', '{}') # 기본값으로 빈 JSON 문자열
     if not isinstance(body_str, str):
         # Body가 이미 파싱된 경우 (테스트 등)
-        print("Body is already parsed:", json.dumps(body_str))
         return body_str if isinstance(body_str, dict) else {}
 
     if not body_str:
         body_str = '{}'
 
     try:
-        body = json.loads(body_str)
-        print("Parsed body:", json.dumps(body))
+        with metrics.timer('parse_ms'):
+            body = json.loads(body_str)
+        log.debug_payload("Parsed body", body)
         return body
     except json.JSONDecodeError as e:
-        print(f"Error decoding JSON body: {e}")
-        print(f"Body content was: {body_str}")
+        log.debug("Error decoding JSON body", error=str(e), body_length=len(body_str))
         raise ValueError("Invalid JSON format in request body")
 
-def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
-    # === DEBUGGING: Print the entire event object ===
-    print("START: Received Event Object:")
-    print(json.dumps(event))
-    print("END: Received Event Object")
-    # === END DEBUGGING ===
-    try:
-        http_method = event.get('httpMethod', 'UNKNOWN')
-        path = event.get('path', '/') # API Gateway 경로
-
-        # === DEBUGGING: Print extracted path and method ===
-        print(f"Extracted httpMethod: {http_method}")
-        print(f"Extracted path: {path}")
-        # === END DEBUGGING ===
-
-        print(f"Processing {http_method} request for path: {path}")
-
-        # Default response setup
-        status_code = 200
-        response_body = {}
-
-        # =========================================
-        # API 라우팅: 경로와 메소드 기반 분기
-        # =========================================
-
-        # 1. Consent 정보 처리 (POST /consent)
-        if path.endswith('/consent') and http_method == 'POST':
-            body = parse_event_body(event)
-            name = body.get('name')
-            phone = body.get('phone')
-            email = body.get('email')
-            consent_agreed = body.get('consent_agreed', False)
-
-            if not all([name, phone, email]):
-                raise ValueError("Missing required fields: name, phone, email")
-
-            user_id_for_responses = f"{name}#{phone}"
-            consent_timestamp = datetime.now(timezone.utc).isoformat() # ISO 8601 형식 (UTC 기준)
-
-            table_consent.put_item(
-                Item={
-                    'email': email,
-                    'name': name,
-                    'phone': phone,
-                    'consent_agreed': consent_agreed,
-                    'consent_agreed_date': consent_timestamp
-                }
-            )
-            print(f"Consent data saved for email: {email}, name: {name}")
-
-            response_body = {
-                'message': 'Consent recorded successfully',
-                'userId': user_id_for_responses,
-                'userEmail': email,
-                'userName': name,
-                'consentTimestamp': consent_timestamp
-            }
-
-        # 2. 실험 응답 저장 (POST /responses)
-        elif path.endswith('/responses') and http_method == 'POST':
-            print(f"Handling POST for path: {path}") # 경로 명시
-            body = parse_event_body(event)
-            user = body.get('user') # 프론트에서 받은 userId (name#phone) or email/name?
-            english_word = body.get('english_word')
-            timestamp_in = body.get('timestamp_in')
-            timestamp_out = body.get('timestamp_out')
-
-            # 1. page_type 먼저 확인
-            page_type = body.get('page_type', 'unknown')
-
-            # =======================================
-            # == final_summary 페이지 타입 특별 처리 ==
-            # =======================================
-            if page_type == 'final_summary':
-                email = body.get('email')
-                name = body.get('name')
-                test_end_timestamp_str = body.get('test_end_timestamp') # 프론트에서 받은 종료 시각
-
-                if not email or not name:
-                    raise ValueError("Missing required fields: email, name for final_summary")
-                if not test_end_timestamp_str:
-                    raise ValueError("Missing required field: test_end_timestamp for final_summary")
-
-                print(f"Processing final_summary for email: {email}, name: {name}")
-
-                try:
-                    # 1. Consent 정보 조회 (consent_agreed_date 얻기)
-                    response = table_consent.get_item(
-                        Key={'email': email, 'name': name}
-                    )
-                    consent_item = response.get('Item')
-
-                    if not consent_item:
-                        raise ValueError(f"Consent record not found for email: {email}, name: {name}")
-
-                    consent_agreed_date_str = consent_item.get('consent_agreed_date')
-                    if not consent_agreed_date_str:
-                         raise ValueError(f"consent_agreed_date not found in consent record for email: {email}, name: {name}")
-
-                    # 2. 시간 파싱 및 total_duration 계산
-                    consent_dt = parse_isoformat(consent_agreed_date_str)
-                    test_end_dt = parse_isoformat(test_end_timestamp_str)
-
-                    if not consent_dt or not test_end_dt:
-                        raise ValueError("Could not parse consent_agreed_date or test_end_timestamp")
-
-                    # 시간대 인식 datetime 객체인지 확인 (isoformat()은 기본적으로 시간대 포함)
-                    if consent_dt.tzinfo is None or test_end_dt.tzinfo is None:
-                         print("Warning: Timestamps might be naive. Assuming UTC for calculation.")
-                         # 필요시 시간대 강제 지정: consent_dt = consent_dt.replace(tzinfo=timezone.utc)
-
-                    total_duration_seconds = round((test_end_dt - consent_dt).total_seconds())
-                    print(f"Calculated total_duration: {total_duration_seconds} seconds")
-
-                    # 3. Consent 테이블 업데이트 (test_end, total_duration 추가)
-                    table_consent.update_item(
-                        Key={'email': email, 'name': name},
-                        UpdateExpression="SET #te = :test_end, #td = :total_duration",
-                        ExpressionAttributeNames={
-                            '#te': 'test_end',
-                            '#td': 'total_duration'
-                        },
-                        ExpressionAttributeValues={
-                            ':test_end': test_end_timestamp_str, # ISO 문자열로 저장
-                            ':total_duration': total_duration_seconds
-                        }
-                    )
-                    print(f"Final summary (test_end, total_duration) saved for email: {email}, name: {name}")
-
-                    response_body = {'message': 'Final summary recorded successfully'}
-                    # final_summary 처리는 여기서 종료
-
-                except Exception as e:
-                    print(f"Error processing final_summary for {email}, {name}: {e}")
-                    traceback.print_exc()
-                    # status_code = 500 # 또는 400 (잘못된 데이터)
-                    raise e # 에러를 다시 발생시켜 공통 에러 처리 로직에서 처리하도록 함
-
-            # =======================================
-            # == 다른 페이지 타입 처리 (기존 로직) ==
-            # =======================================
+# 배치 요청 한 번에 받을 수 있는 최대 레코드 수 (API Gateway 10MB 제한보다 한참 작게 유지)
+MAX_BATCH_ITEMS = 500
+
+class Field(NamedTuple):
+    """One body field a page type stores on the response item."""
+    source: str                  # 요청 body 의 키
+    attr: str                    # 저장할 속성 이름
+    default: Any = None          # 누락 시 저장할 값 (None 이면 저장하지 않고 경고)
+    server_time: bool = False    # body 대신 서버 수신 시각(ISO)을 저장
+
+def phase_fields(page_type: str, response: bool = False) -> Tuple[Field, ...]:
+    fields = (
+        Field('timestamp_in', f"timestamp_{page_type}_in"),
+        Field('timestamp_out', f"timestamp_{page_type}_out"),
+        Field('duration', f"duration_{page_type}"),
+    )
+    if response:
+        fields += (Field('response', f"response_{page_type}", default='N/A'),)
+    return fields
+
+# page_type 별 저장 필드 (새 페이지 타입은 여기에 한 줄 추가)
+PAGE_TYPE_FIELDS: Dict[str, Tuple[Field, ...]] = {
+    'learning': phase_fields('learning'),
+    'recognition': phase_fields('recognition', response=True),
+    'generation': phase_fields('generation', response=True),
+    'survey': (Field('received_at', 'timestamp_survey', server_time=True),
+               Field('usefulness', 'usefulness'),
+               Field('coherence', 'coherence')),
+}
+
+# timestamp_in/out 과 duration 을 저장하는 페이지 타입 (서버에서 소요 시간 검증)
+TIMED_PAGE_TYPES = frozenset(page_type for page_type, fields in PAGE_TYPE_FIELDS.items()
+                             if any(f.source == 'duration' for f in fields))
+
+# 공통 속성: 라운드 번호와 조회용 속성 (최초 기록만 유지)
+INIT_ATTRS = ('round_number', 'user', 'english_word', 'GSI1SK')
+
+def compile_page_type(page_type: str, fields: Tuple[Field, ...]) -> Tuple[Tuple[str, str, Any, bool, str], ...]:
+    """Flatten a field spec into the tuples build_response_update loops over."""
+    return tuple((f.source, f.attr, f.default, f.server_time, f"{page_type}_{f.source}_missing")
+                 for f in fields)
+
+COMPILED_PAGE_TYPES = {page_type: compile_page_type(page_type, fields)
+                       for page_type, fields in PAGE_TYPE_FIELDS.items()}
+
+def build_response_update(body: Dict[str, Any]) -> Dict[str, Any]:
+    """Translate one response record into the attributes it sets on its item.
+
+    Returns a dict with the item key (``user``, ``english_word``), the
+    attributes written only when absent (``init``) and the attributes
+    overwritten on every write (``set``).
+    """
+    user = body.get('user')
+    english_word = body.get('english_word')
+    page_type = body.get('page_type', 'unknown')
+
+    # user 필드는 항상 필수 (final_summary 외)
+    if not user:
+        raise ValueError("Missing required field: user")
+
+    # final_summary가 아닐 경우에만 english_word 필드 확인
+    if not english_word:
+        raise ValueError("Missing required field: english_word")
+
+    round_number = body.get('round_number', 1)
+    init_attrs = {
+        'round_number': round_number,
+        'user': user,
+        'english_word': english_word,
+        'GSI1SK': f"{round_prefix(round_number)}WORD#{english_word}",
+    }
+    set_attrs = {}
+
+    compiled = COMPILED_PAGE_TYPES.get(page_type)
+    if compiled is None:
+        log.warn("unknown_page_type", page_type=page_type, english_word=english_word)
+        compiled = ()
+    for source, attr, default, server_time, warning in compiled:
+        if server_time:
+            set_attrs[attr] = datetime.now(timezone.utc).isoformat() # ISO 형식 사용
+            continue
+        value = body.get(source)
+        if value is None or (value == '' and source.startswith('timestamp_')):
+            if default is not None:
+                value = default
             else:
-                # user 필드는 항상 필수 (final_summary 외)
-                if not user:
-                    raise ValueError("Missing required field: user")
-
-                # final_summary가 아닐 경우에만 english_word 필드 확인
-                if not english_word:
-                     raise ValueError("Missing required field: english_word")
-
-                round_number = body.get('round_number', 1)
-                duration = body.get('duration')
-                response_data = body.get('response', 'N/A')
-
-                update_expression = []
-                expression_attribute_values = {}
-                expression_attribute_names = {}
-
-                # 공통 속성: 라운드 번호
-                update_expression.append("#rn = if_not_exists(#rn, :round_number)")
-                expression_attribute_names["#rn"] = "round_number"
-                expression_attribute_values[":round_number"] = round_number
-
-                # 페이지 타입별 timestamp_in, timestamp_out, duration, response 처리
-                if page_type in ['learning', 'recognition', 'generation']:
-                    timestamp_in_attr = f"timestamp_{page_type}_in"
-                    timestamp_out_attr = f"timestamp_{page_type}_out"
-                    duration_attr = f"duration_{page_type}"
-
-                    if timestamp_in:
-                        update_expression.append(f"#{timestamp_in_attr} = :ts_in")
-                        expression_attribute_names[f"#{timestamp_in_attr}"] = timestamp_in_attr
-                        expression_attribute_values[":ts_in"] = timestamp_in
-                    else:
-                        print(f"Warning: timestamp_in not provided for {user} - {english_word} - page: {page_type}")
-
-                    if timestamp_out:
-                        update_expression.append(f"#{timestamp_out_attr} = :ts_out")
-                        expression_attribute_names[f"#{timestamp_out_attr}"] = timestamp_out_attr
-                        expression_attribute_values[":ts_out"] = timestamp_out
-                    else:
-                        print(f"Warning: timestamp_out not provided for {user} - {english_word} - page: {page_type}")
-
-                    if duration is not None:
-                        update_expression.append(f"#{duration_attr} = :duration")
-                        expression_attribute_names[f"#{duration_attr}"] = duration_attr
-                        expression_attribute_values[":duration"] = duration
-                    else:
-                        print(f"Warning: duration not provided for {user} - {english_word} - page: {page_type}")
-
-                    if page_type in ['recognition', 'generation']:
-                        response_attr = f"response_{page_type}"
-                        update_expression.append(f"#{response_attr} = :response_data")
-                        expression_attribute_names[f"#{response_attr}"] = response_attr
-                        expression_attribute_values[":response_data"] = response_data
-
-                elif page_type == 'survey':
-                    survey_submit_timestamp = datetime.now(timezone.utc).isoformat() # ISO 형식 사용
-                    timestamp_attr = f"timestamp_{page_type}"
-                    update_expression.append(f"#{timestamp_attr} = :survey_ts")
-                    expression_attribute_names[f"#{timestamp_attr}"] = timestamp_attr
-                    expression_attribute_values[":survey_ts"] = survey_submit_timestamp
-
-                    usefulness = body.get('usefulness')
-                    coherence = body.get('coherence')
-
-                    if usefulness is not None:
-                        update_expression.append("#usefulness = :usefulness")
-                        expression_attribute_names["#usefulness"] = "usefulness"
-                        expression_attribute_values[":usefulness"] = usefulness
-                    else:
-                        print(f"Warning: usefulness rating not provided for {user} - {english_word}")
-
-                    if coherence is not None:
-                        update_expression.append("#coherence = :coherence")
-                        expression_attribute_names["#coherence"] = "coherence"
-                        expression_attribute_values[":coherence"] = coherence
-                    else:
-                         print(f"Warning: coherence rating not provided for {user} - {english_word}")
-
-                else:
-                    print(f"Warning: Unknown page_type '{page_type}' encountered for user: {user}, word: {english_word}. No specific data recorded.")
-
-                # DynamoDB 업데이트 실행 (table_responses)
-                if update_expression:
-                    table_responses.update_item(
-                        Key={
-                            'user': user,
-                            'english_word': english_word
-                        },
-                        UpdateExpression="SET " + ", ".join(update_expression),
-                        ExpressionAttributeValues=expression_attribute_values,
-                        ExpressionAttributeNames=expression_attribute_names
-                    )
-                    print(f"Experiment response saved/updated for user: {user}, word: {english_word}, page: {page_type}")
-                else:
-                    print(f"No updates to perform for user: {user}, word: {english_word}, page: {page_type}")
-
-                # final_summary가 아닌 경우에만 이 메시지 사용
-                response_body = {'message': 'Experiment response recorded successfully'}
-
-        # 3. 다른 API 경로 및 메소드 처리 (예: GET /words)
-        # elif path == '/words' and http_method == 'GET':
-        #     # 단어 목록 로드 로직 구현 (예: S3 CSV 파일 읽기)
-        #     pass
-
-        else:
-            # 지원하지 않는 경로 또는 메소드
-            print(f"Unsupported path or method: {http_method} {path}")
-            status_code = 404
-            response_body = {'error': f'Resource not found or method not allowed: {path}'}
+                log.warn(warning, english_word=english_word)
+                continue
+        set_attrs[attr] = value
+
+    if page_type in TIMED_PAGE_TYPES:
+        verify_timing(page_type, set_attrs, english_word)
+
+    # recognition / generation 응답은 기록 시점에 바로 채점 (단어 파일 기준)
+    if page_type in grading.GRADED_PAGE_TYPES:
+        correct = grading.grade(page_type, english_word, set_attrs.get(f"response_{page_type}"))
+        if correct is not None:
+            set_attrs[grading.correct_attr(page_type)] = correct
+
+    return {
+        'user': user,
+        'english_word': english_word,
+        'page_types': [page_type],
+        'init': init_attrs,
+        'set': set_attrs,
+    }
+
+def verify_timing(page_type: str, set_attrs: Dict[str, Any], english_word: str) -> None:
+    """Check a page's duration against its own timestamps and the server clock.
+
+    A missing duration is filled in from the timestamps (as the client would
+    have computed it); implausible timing is kept as sent but flagged in
+    ``timing_flags_<page_type>``.
+    """
+    duration_attr = f"duration_{page_type}"
+    derived, flags = timestamps.check_timing(set_attrs.get(f"timestamp_{page_type}_in"),
+                                             set_attrs.get(f"timestamp_{page_type}_out"),
+                                             set_attrs.get(duration_attr), timestamps.now_ms())
+    if derived is not None and duration_attr not in set_attrs:
+        set_attrs[duration_attr] = derived
+    if flags:
+        set_attrs[f"timing_flags_{page_type}"] = flags
+        log.warn("timing_flagged", page_type=page_type, english_word=english_word, flags=flags)
+        metrics.add('timing_flagged_count', 1)
+
+def merge_response_updates(updates: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Fold several updates for the same item into one, in arrival order.
+
+    ``set`` attributes keep the last value seen (same as sequential writes);
+    ``init`` attributes keep the first, mirroring ``if_not_exists``.
+    """
+    merged = {
+        'user': updates[0]['user'],
+        'english_word': updates[0]['english_word'],
+        'page_types': [],
+        'init': {},
+        'set': {},
+    }
+    for update in updates:
+        merged['page_types'].extend(update['page_types'])
+        for attr, value in update['init'].items():
+            merged['init'].setdefault(attr, value)
+        merged['set'].update(update['set'])
+    return merged
+
+@functools.lru_cache(maxsize=256)
+def update_template(init_attrs: Tuple[str, ...], set_attrs: Tuple[str, ...]) -> Tuple[str, Dict[str, str], Tuple[str, ...]]:
+    """UpdateExpression, attribute names and value placeholders for one attribute combination.
+
+    Page types write the same attribute sets over and over, so the strings
+    are built once per combination (the spec'd ones are warmed at import).
+    The returned names dict is shared: callers must not modify it.
+    """
+    clauses = [f"#{attr} = if_not_exists(#{attr}, :{attr})" for attr in init_attrs]
+    clauses += [f"#{attr} = :{attr}" for attr in set_attrs]
+    names = {f"#{attr}": attr for attr in init_attrs + set_attrs}
+    placeholders = tuple(f":{attr}" for attr in init_attrs + set_attrs)
+    return "SET " + ", ".join(clauses), names, placeholders
+
+def render_update_expression(update: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the update_item keyword arguments for a (possibly merged) update."""
+    init_attrs, set_attrs = update['init'], update['set']
+    if item_codec.compact_enabled():
+        # 짧은 속성 코드 + epoch ms 타임스탬프 (읽을 때는 item_codec.decode_item)
+        init_attrs = item_codec.encode_attrs(init_attrs)
+        set_attrs = item_codec.encode_attrs(set_attrs)
+        set_attrs[item_codec.SCHEMA_ATTR] = item_codec.COMPACT_VERSION
+    expression, names, placeholders = update_template(tuple(init_attrs), tuple(set_attrs))
+    return {
+        'Key': response_key(update['user'], update['english_word']),
+        'UpdateExpression': expression,
+        'ExpressionAttributeNames': names,
+        'ExpressionAttributeValues': dict(zip(placeholders, (*init_attrs.values(), *set_attrs.values()))),
+    }
+
+def _warm_update_templates() -> None:
+    for page_type, fields in PAGE_TYPE_FIELDS.items():
+        set_attrs = {f.attr: None for f in fields}
+        if page_type in grading.GRADED_PAGE_TYPES:
+            set_attrs[grading.correct_attr(page_type)] = None
+        update_template(INIT_ATTRS, tuple(set_attrs))
+        encoded_set = item_codec.encode_attrs(set_attrs)
+        encoded_set[item_codec.SCHEMA_ATTR] = None
+        update_template(tuple(item_codec.encode_attrs(dict.fromkeys(INIT_ATTRS))), tuple(encoded_set))
+
+_warm_update_templates()
+
+def write_response_update(update: Dict[str, Any]) -> None:
+    """Apply one (possibly merged) update to table_responses."""
+    # DynamoDB 업데이트 실행 (table_responses)
+    table_responses.update_item(**render_update_expression(update))
+    log.debug("Experiment response saved", english_word=update['english_word'],
+              page_types=update['page_types'])
+
+def handle_response_batch(body: Any, idempotency_key: Optional[str] = None) -> Tuple[int, Dict[str, Any]]:
+    """Store many response records with one update_item per (user, english_word).
+
+    Accepts ``{"items": [...]}`` (or a bare list). Each record gets its own
+    entry in ``results`` so the client can resend only the failed indexes.
+    BatchWriteItem only supports whole-item puts, which would clobber the
+    attributes other pages already wrote, so merged update_item calls are the
+    fewest writes that keep the single-record semantics. In write-behind mode
+    ``idempotency_key`` deduplicates the queued messages (ingest_queue.py).
+    """
+    records = body.get('items') if isinstance(body, dict) else body
+    if not isinstance(records, list) or not records:
+        raise ValueError("Batch body must contain a non-empty 'items' list")
+    if len(records) > MAX_BATCH_ITEMS:
+        raise ValueError(f"Batch too large: {len(records)} items (max {MAX_BATCH_ITEMS})")
+    log.annotate(batch_size=len(records))
+
+    results: List[Dict[str, Any]] = [{} for _ in records]
+    groups: Dict[Tuple[str, str], List[int]] = {}
+    updates: Dict[int, Dict[str, Any]] = {}
+
+    # 1. 레코드별 검증 및 (user, english_word) 기준 그룹화
+    for index, record in enumerate(records):
+        results[index] = {'index': index}
+        try:
+            if not isinstance(record, dict):
+                raise ValueError("Batch item must be a JSON object")
+            if record.get('page_type') == 'final_summary':
+                raise ValueError("final_summary must be sent to /responses, not /responses/batch")
+            update = build_response_update(record)
+        except ValueError as ve:
+            results[index].update({'status': 'error', 'error': str(ve)})
+            continue
+        key = (update['user'], update['english_word'])
+        results[index].update({'user': key[0], 'english_word': key[1]})
+        groups.setdefault(key, []).append(index)
+        updates[index] = update
+
+    if ingest_queue.write_behind_enabled():
+        return queue_response_batch(records, results, updates, idempotency_key)
+
+    # 2. 그룹별로 병합하여 한 번씩만 쓰기
+    for key, indexes in groups.items():
+        try:
+            write_response_update(merge_response_updates([updates[i] for i in indexes]))
+            outcome = {'status': 'ok'}
+        except Exception as e:
+            log.error("Batch write failed", exc_info=True, english_word=key[1], error=str(e))
+            outcome = {'status': 'error', 'error': 'Write failed', 'retryable': True}
+        for index in indexes:
+            results[index].update(outcome)
+
+    failed = sum(1 for result in results if result['status'] != 'ok')
+    response_body = {
+        'message': 'Batch processed',
+        'received': len(records),
+        'written': len(groups),
+        'succeeded': len(records) - failed,
+        'failed': failed,
+        'results': results,
+    }
+    # 일부 실패 시 207 (Multi-Status) 로 알리고, 클라이언트는 results 로 재시도 대상 판단
+    return (207 if failed else 200), response_body
+
+def queue_response_batch(records: List[Any], results: List[Dict[str, Any]], updates: Dict[int, Dict[str, Any]],
+                         idempotency_key: Optional[str] = None) -> Tuple[int, Dict[str, Any]]:
+    """Write-behind variant of step 2: enqueue every valid record, answer 202."""
+    with metrics.timer('enqueue_ms'):
+        ingest_queue.enqueue([updates[index] for index in sorted(updates)], idempotency_key)
+    for index in updates:
+        results[index]['status'] = 'queued'
+    failed = len(records) - len(updates)
+    return (207 if failed else 202), {
+        'message': 'Batch accepted',
+        'received': len(records),
+        'queued': len(updates),
+        'succeeded': len(updates),
+        'failed': failed,
+        'results': results,
+    }
+
+def record_final_summary(email: str, name: str, test_end_timestamp_str: str) -> Dict[str, Any]:
+    """Store test_end and total_duration on the consent record in one write.
+
+    total_duration is computed by DynamoDB itself (``:test_end_epoch -
+    consent_epoch``) under ``attribute_exists(consent_epoch)``, so no
+    read-before-write is needed. Consent records written before
+    consent_epoch existed fall back to the original get_item + update_item.
+    Both end-times are whole epoch seconds, so the result may differ from the
+    exact rounded difference by at most one second.
+
+    Returns the updated consent record (its phone completes the user id).
+    """
+    test_end_ms = parse_epoch_ms(test_end_timestamp_str)
 
-        # 공통 응답 반환 (Lambda 프록시 통합 형식 준수)
-        return {
-            'statusCode': status_code,
-            'headers': {
-                'Access-Control-Allow-Origin': '*', # 중요: 실제 배포 시에는 React 앱 도메인으로 제한!
-                'Access-Control-Allow-Headers': 'Content-Type', # 필요한 헤더 명시
-                'Access-Control-Allow-Methods': 'OPTIONS,POST,GET' # 허용할 메소드 명시
+    try:
+        response = table_consent.update_item(
+            Key={'email': email, 'name': name},
+            UpdateExpression="SET #te = :test_end, #td = :test_end_epoch - #ce",
+            ConditionExpression="attribute_exists(#ce)",
+            ExpressionAttributeNames={
+                '#te': 'test_end',
+                '#td': 'total_duration',
+                '#ce': 'consent_epoch'
             },
-            'body': json.dumps(response_body)
+            ExpressionAttributeValues={
+                ':test_end': test_end_timestamp_str, # ISO 문자열로 저장
+                ':test_end_epoch': round(test_end_ms / 1000)
+            },
+            ReturnValues='ALL_NEW',  # 요약용 user id (name#phone) 를 추가 조회 없이 얻기 위해
+        )
+        return response.get('Attributes') or {}
+    except Exception as e:
+        if aws_clients.error_code(e) != 'ConditionalCheckFailedException':
+            raise
+    return _record_final_summary_legacy(email, name, test_end_timestamp_str, test_end_ms)
+
+def _record_final_summary_legacy(email: str, name: str, test_end_timestamp_str: str,
+                                 test_end_ms: int) -> Dict[str, Any]:
+    """Read-then-write path for missing records and ones without consent_epoch."""
+    log.annotate(final_summary_path='legacy')
+    # 1. Consent 정보 조회 (consent_agreed_date 얻기)
+    response = table_consent.get_item(
+        Key={'email': email, 'name': name}
+    )
+    consent_item = response.get('Item')
+
+    if not consent_item:
+        raise ValueError(f"Consent record not found for email: {email}, name: {name}")
+
+    consent_agreed_date_str = consent_item.get('consent_agreed_date')
+    if not consent_agreed_date_str:
+         raise ValueError(f"consent_agreed_date not found in consent record for email: {email}, name: {name}")
+
+    # 2. 시간 파싱 및 total_duration 계산
+    consent_ms = parse_epoch_ms(consent_agreed_date_str)
+    total_duration_seconds = round((test_end_ms - consent_ms) / 1000)
+    log.debug("Calculated total_duration", seconds=total_duration_seconds)
+
+    # 3. Consent 테이블 업데이트 (test_end, total_duration 추가)
+    table_consent.update_item(
+        Key={'email': email, 'name': name},
+        UpdateExpression="SET #te = :test_end, #td = :total_duration",
+        ExpressionAttributeNames={
+            '#te': 'test_end',
+            '#td': 'total_duration'
+        },
+        ExpressionAttributeValues={
+            ':test_end': test_end_timestamp_str, # ISO 문자열로 저장
+            ':total_duration': total_duration_seconds
         }
+    )
+    return consent_item
 
+def record_session_summary(consent_item: Dict[str, Any]) -> Optional[str]:
+    """Precompute the participant's session summary (session_summary.py).
+
+    Returns its status, or None when it could not be attempted. Failures are
+    logged but never fail final_summary itself.
+    """
+    if not consent_item.get('name') or not consent_item.get('phone'):
+        log.warn("summary_user_unknown")
+        return None
+    user = f"{consent_item['name']}#{consent_item['phone']}"  # 프론트엔드와 같은 user id
+    try:
+        with metrics.timer('summary_ms'):
+            status = session_summary.record(table_responses, user)
+    except Exception as e:
+        log.error("Session summary failed", exc_info=True, error=str(e))
+        try:
+            session_summary.defer(table_responses, user)
+            status = session_summary.DEFERRED
+        except Exception:
+            return None
+    if status == session_summary.DEFERRED:
+        metrics.add('summary_deferred_count', 1)
+    log.annotate(summary=status)
+    return status
+
+def _encode_page_token(last_evaluated_key: Dict[str, Any]) -> str:
+    raw = json.dumps(last_evaluated_key, separators=(',', ':'), default=_json_default)
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+def _decode_page_token(token: str, user: str) -> Dict[str, Any]:
+    try:
+        start_key = json.loads(base64.urlsafe_b64decode(token.encode('ascii')))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid next_token")
+    # 다른 참가자의 파티션을 가리키는 토큰은 거부
+    if not isinstance(start_key, dict) or start_key.get('PK') != user_partition_key(user):
+        raise ValueError("Invalid next_token")
+    return start_key
+
+def _json_default(value: Any) -> Any:
+    # DynamoDB 숫자는 Decimal 로 반환됨
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def query_user_responses(params: Dict[str, Any]) -> Dict[str, Any]:
+    """One page of a participant's response items from UserRoundIndex.
+
+    ``round`` is optional (all rounds when omitted); ``limit`` caps the page
+    size and ``next_token`` continues from the previous page.
+    """
+    user = params.get('user')
+    if not user:
+        raise ValueError("Missing required query parameter: user")
+    round_number = params.get('round')
+    try:
+        limit = int(params.get('limit') or RESPONSES_PAGE_LIMIT)
+    except ValueError:
+        raise ValueError("limit must be an integer")
+    limit = max(1, min(limit, RESPONSES_MAX_PAGE_LIMIT))
+
+    query = {**user_round_query(user, round_number), 'Limit': limit}
+    if params.get('next_token'):
+        query['ExclusiveStartKey'] = _decode_page_token(params['next_token'], user)
+
+    result = table_responses.query(**query)
+    items = []
+    for item in result.get('Items', []):
+        decoded = item_codec.decode_item(item)
+        items.append({k: v for k, v in decoded.items() if k not in item_codec.KEY_FIELDS})
+    last_key = result.get('LastEvaluatedKey')
+    return {
+        'items': items,
+        'count': len(items),
+        'next_token': _encode_page_token(last_key) if last_key else None,
+    }
+
+def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    if event.get('detail-type') == 'Scheduled Event':
+        # EventBridge 스케줄 - 같은 함수에서 연기된 세션 요약 계산
+        return deferred_summary_handler(event, context)
+    global _cold_start
+    log.begin_request(event, cold_start=_cold_start)
+    metrics.begin(cold_start=_cold_start, request_id=getattr(context, 'aws_request_id', None))
+    retry.begin(context)
+    _cold_start = False
+    # 전체 event 덤프는 DEBUG 레벨 또는 샘플링된 요청에서만 (PII 는 마스킹)
+    log.debug_payload("Received event", event)
+    try:
+        key = idempotency.request_key(event)
     except ValueError as ve:
-        print(f"Value error: {ve}")
+        key = None
+        response = error_response(400, str(ve), 'invalid_idempotency_key')
+    else:
+        # write-behind 로 큐에만 넣는 요청은 마커 대신 큐의 중복 제거 사용 (요청 경로에 DynamoDB 호출 없음)
+        use_marker = key and not enqueues_only(event)
+        response = route_idempotent(event, context, key) if use_marker else route_request(event, context)
+    global _init_reported
+    if not _init_reported and aws_clients.init_timings():
+        # 클라이언트가 생성된 첫 요청에 초기화 시간 내역을 함께 기록
+        log.annotate(init_ms=aws_clients.init_timings())
+        _init_reported = True
+    log.end_request(response['statusCode'], metrics=metrics.flush(response['statusCode'], write=False))
+    return response
+
+def error_response(status_code: int, message: str, error_code: str, **headers: str) -> Dict[str, Any]:
+    # 요약 라인에는 코드만 기록 (메시지에 email/name 이 포함될 수 있음)
+    log.annotate(error=error_code)
+    return {
+        'statusCode': status_code,
+        'headers': {**CORS_HEADERS, **headers},
+        'body': json.dumps({'error': message})
+    }
+
+def enqueues_only(event: Dict[str, Any]) -> bool:
+    """Whether the request only enqueues updates (write-behind POST /responses(/batch))."""
+    if not ingest_queue.write_behind_enabled():
+        return False
+    handler = find_route(event.get('httpMethod', 'UNKNOWN'), event.get('path', '/'))
+    if handler is handle_response_batch_request:
+        return True
+    if handler is not handle_response:
+        return False
+    # final_summary 는 queue 모드에서도 동기 처리 (잘못된 본문은 400 - 아무것도 쓰지 않음)
+    body = event.get('body')
+    if isinstance(body, str):
+        try:
+            body = json.loads(body)
+        except json.JSONDecodeError:
+            return True
+    return not (isinstance(body, dict) and body.get('page_type') == 'final_summary')
+
+def route_idempotent(event: Dict[str, Any], context: Any, key: str) -> Dict[str, Any]:
+    """route_request, at most once per Idempotency-Key (see idempotency.py)."""
+    request_fingerprint = idempotency.fingerprint(event)
+    try:
+        record = idempotency.claim(table_responses, key, request_fingerprint)
+    except Exception:
+        # 마커 저장 실패 시 중복 방지 없이 그대로 처리 (가용성 우선)
+        log.error("Idempotency claim failed", exc_info=True)
+        log.warn("idempotency_unavailable")
+        return route_request(event, context)
+
+    if record is not None:
+        if record['status'] != idempotency.COMPLETE:
+            log.annotate(idempotency='in_progress')
+            return error_response(409, 'A request with this Idempotency-Key is still in progress',
+                                  'idempotency_in_progress', **{'Retry-After': '1'})
+        log.annotate(idempotency='replayed')
+        if record.get('fingerprint') != request_fingerprint:
+            # 같은 키로 다른 본문이 온 경우(재제출) 에도 첫 결과를 그대로 반환
+            log.warn("idempotency_payload_mismatch")
         return {
-            'statusCode': 400, # Bad Request
-            'headers': { 'Access-Control-Allow-Origin': '*', 'Access-Control-Allow-Headers': 'Content-Type', 'Access-Control-Allow-Methods': 'OPTIONS,POST,GET' },
-            'body': json.dumps({'error': str(ve)})
+            'statusCode': record['status_code'],
+            'headers': {**CORS_HEADERS, 'Idempotency-Replayed': 'true'},
+            'body': record['body']
+        }
+
+    response = route_request(event, context)
+    try:
+        if 200 <= response['statusCode'] < 300:
+            idempotency.complete(table_responses, key, request_fingerprint,
+                                 response['statusCode'], response['body'])
+        else:
+            # 실패한 요청은 같은 키로 다시 시도할 수 있도록 마커 해제
+            idempotency.release(table_responses, key)
+    except Exception:
+        log.error("Idempotency marker update failed", exc_info=True)
+    return response
+
+def json_response(response_body: Any, status_code: int = 200) -> Dict[str, Any]:
+    # 공통 응답 반환 (Lambda 프록시 통합 형식 준수)
+    return {
+        'statusCode': status_code,
+        'headers': dict(CORS_HEADERS),
+        'body': json.dumps(response_body, default=_json_default)
+    }
+
+# =========================================
+# API 라우트 핸들러: event -> Lambda 프록시 응답
+# =========================================
+
+def handle_consent(event: Dict[str, Any]) -> Dict[str, Any]:
+    """POST /consent"""
+    body = parse_event_body(event)
+    name = body.get('name')
+    phone = body.get('phone')
+    email = body.get('email')
+    consent_agreed = body.get('consent_agreed', False)
+
+    if not all([name, phone, email]):
+        raise ValueError("Missing required fields: name, phone, email")
+
+    user_id_for_responses = f"{name}#{phone}"
+    consent_dt = datetime.now(timezone.utc)
+    consent_timestamp = consent_dt.isoformat() # ISO 8601 형식 (UTC 기준)
+
+    table_consent.put_item(
+        Item={
+            'email': email,
+            'name': name,
+            'phone': phone,
+            'consent_agreed': consent_agreed,
+            'consent_agreed_date': consent_timestamp,
+            # final_summary 에서 조회 없이 total_duration 을 계산하기 위한 epoch 초
+            'consent_epoch': round(consent_dt.timestamp())
         }
+    )
+
+    return json_response({
+        'message': 'Consent recorded successfully',
+        'userId': user_id_for_responses,
+        'userEmail': email,
+        'userName': name,
+        'consentTimestamp': consent_timestamp
+    })
+
+def handle_response(event: Dict[str, Any]) -> Dict[str, Any]:
+    """POST /responses (one page record, or the final_summary of a session)"""
+    body = parse_event_body(event)
+    page_type = body.get('page_type', 'unknown')
+    log.annotate(page_type=page_type)
+    # 클라이언트가 보낸 임의의 값으로 차원 수가 늘지 않도록 알려진 타입만 사용
+    metrics.set_dimension('PageType', page_type if page_type in METRIC_PAGE_TYPES else 'other')
+
+    if page_type == 'final_summary':
+        email = body.get('email')
+        name = body.get('name')
+        test_end_timestamp_str = body.get('test_end_timestamp') # 프론트에서 받은 종료 시각
+
+        if not email or not name:
+            raise ValueError("Missing required fields: email, name for final_summary")
+        if not test_end_timestamp_str:
+            raise ValueError("Missing required field: test_end_timestamp for final_summary")
+
+        consent_item = record_final_summary(email, name, test_end_timestamp_str)
+        summary_status = record_session_summary(consent_item)
+        return json_response({'message': 'Final summary recorded successfully', 'summary': summary_status})
+
+    with metrics.timer('validate_ms'):
+        update = build_response_update(body)
+    if ingest_queue.write_behind_enabled():
+        # write-behind: 검증만 하고 큐에 넣은 뒤 바로 응답 (쓰기는 queue_consumer_handler)
+        with metrics.timer('enqueue_ms'):
+            ingest_queue.enqueue([update], idempotency.request_key(event))
+        return json_response({'message': 'Experiment response accepted', 'queued': True}, 202)
+    write_response_update(update)
+    return json_response({'message': 'Experiment response recorded successfully'})
+
+def handle_response_batch_request(event: Dict[str, Any]) -> Dict[str, Any]:
+    """POST /responses/batch"""
+    status_code, response_body = handle_response_batch(parse_event_body(event), idempotency.request_key(event))
+    return json_response(response_body, status_code)
+
+def handle_query_responses(event: Dict[str, Any]) -> Dict[str, Any]:
+    """GET /responses?user=...&round=..."""
+    response_body = query_user_responses(event.get('queryStringParameters') or {})
+    log.annotate(items=response_body['count'])
+    return json_response(response_body)
+
+def handle_words(event: Dict[str, Any]) -> Dict[str, Any]:
+    """GET /words?round=N - 컨테이너 단위 캐시, ETag 지원 (gzip 은 WORDS_GZIP, words.py 참고)"""
+    status_code, headers, body, is_base64 = words.words_response(
+        event.get('queryStringParameters') or {}, event.get('headers'))
+    return {
+        'statusCode': status_code,
+        'headers': {**CORS_HEADERS, **headers},
+        'body': body,
+        'isBase64Encoded': is_base64
+    }
+
+# (메소드, 경로 끝부분) -> 핸들러. 경로 앞부분(stage 등)은 무시
+ROUTES = {
+    ('POST', 'consent'): handle_consent,
+    ('POST', 'responses'): handle_response,
+    ('POST', 'responses/batch'): handle_response_batch_request,
+    ('GET', 'responses'): handle_query_responses,
+    ('GET', 'words'): handle_words,
+}
+
+ROUTE_NAMES = {handler: f"{method} /{suffix}" for (method, suffix), handler in ROUTES.items()}
+METRIC_PAGE_TYPES = frozenset(PAGE_TYPE_FIELDS) | {'final_summary'}
+
+@functools.lru_cache(maxsize=64)
+def find_route(http_method: str, path: str):
+    segments = path.rstrip('/').rsplit('/', 2)
+    return (ROUTES.get((http_method, '/'.join(segments[-2:])))
+            or ROUTES.get((http_method, segments[-1])))
+
+def route_request(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    http_method = event.get('httpMethod', 'UNKNOWN')
+    path = event.get('path', '/') # API Gateway 경로
+
+    # CORS preflight 는 본문 파싱/테이블 접근 없이 바로 응답
+    if http_method == 'OPTIONS':
+        metrics.set_dimension('Route', 'OPTIONS')
+        return {
+            'statusCode': 204,
+            'headers': {**CORS_HEADERS, 'Access-Control-Max-Age': '600'},
+            'body': ''
+        }
+
+    try:
+        handler = find_route(http_method, path)
+        metrics.set_dimension('Route', ROUTE_NAMES.get(handler, 'unmatched'))
+        if handler is None:
+            # 지원하지 않는 경로 또는 메소드
+            return json_response({'error': f'Resource not found or method not allowed: {path}'}, 404)
+        return handler(event)
+
+    except ValueError as ve:
+        return error_response(400, str(ve), 'invalid_request') # Bad Request
+    except ingest_queue.QueueUnavailable as qu:
+        log.warn("queue_unavailable", error=str(qu))
+        return error_response(503, 'Service temporarily unavailable, please retry.', 'queue_unavailable',
+                              **{'Retry-After': '1'})
+    except retry.ServiceUnavailable as su:
+        # 스로틀링/장애 - 클라이언트가 Retry-After 후 다시 보내도록 503
+        log.warn("ddb_unavailable", error=str(su))
+        return error_response(503, 'Service temporarily unavailable, please retry.', 'ddb_unavailable',
+                              **{'Retry-After': str(su.retry_after)})
     except Exception as e:
-        print(f"Internal server error: {e}")
-        traceback.print_exc() # 상세 에러 스택 로깅
+        log.error("Internal server error", exc_info=True, error=str(e)) # 상세 에러 스택 로깅
         return {
             'statusCode': 500,
-            'headers': { 'Access-Control-Allow-Origin': '*', 'Access-Control-Allow-Headers': 'Content-Type', 'Access-Control-Allow-Methods': 'OPTIONS,POST,GET' },
+            'headers': dict(CORS_HEADERS),
             'body': json.dumps({'error': 'An internal error occurred.'})
-        } 
\ No newline at end of file
+        }
+
+def queue_consumer_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """SQS consumer for write-behind mode (see ingest_queue.py).
+
+    Updates in one delivery batch are merged per (user, english_word) in
+    arrival order and written once per item. When an item's write fails,
+    that message and every later message of the same participant go back
+    in ``batchItemFailures`` (the event source mapping needs
+    ReportBatchItemFailures), so a participant's updates are applied in the
+    order they were sent: the first page to reach an item sets its
+    round_number via ``if_not_exists``. Deferred session summaries
+    (session_summary.py) ride the same queue and are computed here.
+    """
+    records = event.get('Records') or []
+    log.begin_request({'httpMethod': 'SQS', 'path': '/responses/queue'}, batch_size=len(records))
+    metrics.begin(request_id=getattr(context, 'aws_request_id', None))
+    metrics.set_dimension('Route', 'SQS /responses/queue')
+    retry.begin(context)
+
+    groups: Dict[Tuple[str, str], List[Tuple[int, str, Dict[str, Any]]]] = {}
+    jobs: List[Tuple[int, str, str]] = []
+    for position, record in enumerate(records):
+        try:
+            update = ingest_queue.decode(record['body'])
+            if update.get('job') == session_summary.SUMMARY_JOB:
+                jobs.append((position, record['messageId'], update['user']))
+                continue
+            key = (update['user'], update['english_word'])
+        except (ValueError, KeyError, TypeError, AttributeError):
+            # 다시 보내도 성공할 수 없는 메시지는 재시도 대상에서 제외
+            log.warn("queue_message_invalid", message_id=record.get('messageId'))
+            continue
+        groups.setdefault(key, []).append((position, record['messageId'], update))
+
+    # 참가자별 첫 실패 위치 - 그 뒤의 메시지는 모두 다시 받아 순서 유지
+    failed_from: Dict[str, int] = {}
+    for key, entries in groups.items():
+        if key[0] in failed_from:
+            continue
+        try:
+            write_response_update(merge_response_updates([update for _, _, update in entries]))
+        except Exception as e:
+            log.error("Queued write failed", exc_info=True, english_word=key[1], error=str(e))
+            failed_from[key[0]] = entries[0][0]
+
+    failures = [(position, message_id) for (user, _), entries in groups.items()
+                if user in failed_from
+                for position, message_id, _ in entries if position >= failed_from[user]]
+    # 연기된 세션 요약: 같은 배치의 앞선 응답이 모두 기록된 뒤에 계산
+    for position, message_id, user in jobs:
+        if position > failed_from.get(user, position):
+            failures.append((position, message_id))
+            continue
+        try:
+            session_summary.compute(table_responses, user)
+        except Exception as e:
+            log.error("Deferred summary failed", exc_info=True, error=str(e))
+            failures.append((position, message_id))
+    failures.sort()
+    metrics.add('queue_failed_count', len(failures))
+    log.annotate(items=len(groups), failed=len(failures))
+    status = 207 if failures else 200
+    log.end_request(status, metrics=metrics.flush(status, write=False))
+    return {'batchItemFailures': [{'itemIdentifier': message_id} for _, message_id in failures]}
+
+def deferred_summary_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """Scheduled job (EventBridge, infrastructure/schedule): compute summaries left deferred.
+
+    In sync mode nothing else picks up a summary that final_summary deferred
+    (slow or failed reads). The schedule targets the API function and
+    lambda_handler hands scheduled events here. Participants not reached
+    before the invocation's deadline stay deferred for the next run.
+    """
+    log.begin_request({'httpMethod': 'SCHEDULE', 'path': '/summaries/deferred'})
+    metrics.begin(request_id=getattr(context, 'aws_request_id', None))
+    metrics.set_dimension('Route', 'SCHEDULE /summaries/deferred')
+    retry.begin(context)
+
+    computed = failed = 0
+    users = session_summary.deferred_users(table_responses)
+    for user in users:
+        if retry.remaining_ms() <= 0:
+            break
+        try:
+            session_summary.compute(table_responses, user)
+            computed += 1
+        except Exception as e:
+            log.error("Deferred summary failed", exc_info=True, error=str(e))
+            failed += 1
+    log.annotate(items=len(users), computed=computed, failed=failed)
+    status = 207 if computed < len(users) else 200
+    log.end_request(status, metrics=metrics.flush(status, write=False))
+    return {'deferred': len(users), 'computed': computed, 'failed': failed}
@@ -0,0 +1,613 @@
+"""In-memory stand-in for the boto3 DynamoDB ``Table`` resource.
+
+Only the calls lambda_function.py makes are implemented, with the same
+argument names and the same error shapes (``botocore`` ``ClientError``), so
+the handler can be driven locally for tests and benchmarks without AWS.
+"""
+import bisect
+import copy
+import random
+import re
+import threading
+import zlib
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from boto3.dynamodb.types import TypeSerializer
+from botocore.exceptions import ClientError
+
+from metrics import InstrumentedTable
+from retry import RetryingTable
+
+_serializer = TypeSerializer()
+
+# Update/Condition expression 토큰: 이름/값 placeholder, 속성·함수 이름, 연산자
+_TOKEN_RE = re.compile(r"\s*([#:][A-Za-z0-9_]+|[A-Za-z_][A-Za-z0-9_.]*|<>|<=|>=|[(),=<>+-])")
+
+_COMPARATORS = {
+    '=': lambda a, b: a == b,
+    '<>': lambda a, b: a != b,
+    '<': lambda a, b: a < b,
+    '<=': lambda a, b: a <= b,
+    '>': lambda a, b: a > b,
+    '>=': lambda a, b: a >= b,
+}
+
+
+def _client_error(code: str, message: str, operation: str) -> ClientError:
+    return ClientError({'Error': {'Code': code, 'Message': message}}, operation)
+
+
+def _normalize(value: Any) -> Any:
+    """Store numbers the way boto3 hands them back: as Decimal."""
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, int):
+        return Decimal(value)
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_normalize(v) for v in value]
+    if isinstance(value, set):
+        return {_normalize(v) for v in value}
+    return value
+
+
+def attribute_value_size(value: Any) -> int:
+    """Approximate billed size of one attribute value (DynamoDB sizing rules)."""
+    if value is None or isinstance(value, bool):
+        return 1
+    if isinstance(value, str):
+        return len(value.encode('utf-8'))
+    if isinstance(value, (int, Decimal)):
+        digits = Decimal(value).normalize().as_tuple().digits
+        return 1 + (len(digits) + 1) // 2
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, dict):
+        return 3 + sum(len(k.encode('utf-8')) + attribute_value_size(v) + 1 for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return 3 + sum(attribute_value_size(v) + 1 for v in value)
+    if isinstance(value, (set, frozenset)):
+        return sum(attribute_value_size(v) for v in value)
+    raise TypeError(f"Unsupported attribute type: {type(value).__name__}")
+
+
+def item_size(item: Optional[Dict[str, Any]]) -> int:
+    """Billed item size in bytes: attribute names plus values."""
+    if not item:
+        return 0
+    return sum(len(name.encode('utf-8')) + attribute_value_size(value) for name, value in item.items())
+
+
+def _write_units(size: int) -> int:
+    return max(1, -(-size // 1024))
+
+
+def _read_units(size: int) -> float:
+    # eventually consistent read: 4KB 당 0.5 RCU
+    return max(1, -(-size // 4096)) * 0.5
+
+
+def _tokenize(expression: str) -> List[str]:
+    tokens = []
+    pos = 0
+    expression = expression.rstrip()
+    while pos < len(expression):
+        match = _TOKEN_RE.match(expression, pos)
+        if not match:
+            raise ValueError(f"Unsupported expression syntax near: {expression[pos:]!r}")
+        tokens.append(match.group(1))
+        pos = match.end()
+    return tokens
+
+
+class _Expression:
+    """Resolves placeholders of one request against a single item."""
+
+    def __init__(self, names: Optional[Dict[str, str]], values: Optional[Dict[str, Any]], operation: str):
+        self.names = names or {}
+        self.values = values or {}
+        self.operation = operation
+
+    def name(self, token: str) -> str:
+        if token.startswith('#'):
+            if token not in self.names:
+                raise _client_error('ValidationException',
+                                    f"An expression attribute name used in the document path is not defined; attribute name: {token}",
+                                    self.operation)
+            return self.names[token]
+        return token
+
+    def value(self, token: str) -> Any:
+        if token not in self.values:
+            raise _client_error('ValidationException',
+                                f"An expression attribute value used in expression is not defined; attribute value: {token}",
+                                self.operation)
+        return self.values[token]
+
+
+class _ConditionParser:
+    """Recursive-descent parser for Condition/KeyCondition expressions.
+
+    Supports AND/OR/NOT, parentheses, comparisons, ``attribute_exists``,
+    ``attribute_not_exists``, ``begins_with`` and ``contains``.
+    """
+
+    def __init__(self, expression: str, expr: _Expression):
+        self.expression = expression
+        self.tokens = _tokenize(expression)
+        self.pos = 0
+        self.expr = expr
+
+    def parse(self):
+        predicate = self._or()
+        if self.pos != len(self.tokens):
+            self._fail()
+        return predicate
+
+    def _fail(self):
+        raise _client_error('ValidationException', f"Invalid ConditionExpression: {self.expression!r}",
+                            self.expr.operation)
+
+    def _peek(self, offset: int = 0) -> Optional[str]:
+        index = self.pos + offset
+        return self.tokens[index] if index < len(self.tokens) else None
+
+    def _take(self, expected: Optional[str] = None) -> str:
+        token = self._peek()
+        if token is None or (expected is not None and token != expected):
+            self._fail()
+        self.pos += 1
+        return token
+
+    def _or(self):
+        left = self._and()
+        while (self._peek() or '').upper() == 'OR':
+            self._take()
+            right = self._and()
+            left = (lambda item, l=left, r=right: l(item) or r(item))
+        return left
+
+    def _and(self):
+        left = self._not()
+        while (self._peek() or '').upper() == 'AND':
+            self._take()
+            right = self._not()
+            left = (lambda item, l=left, r=right: l(item) and r(item))
+        return left
+
+    def _not(self):
+        if (self._peek() or '').upper() == 'NOT':
+            self._take()
+            inner = self._not()
+            return lambda item: not inner(item)
+        return self._primary()
+
+    def _primary(self):
+        token = self._peek()
+        if token == '(':
+            self._take('(')
+            inner = self._or()
+            self._take(')')
+            return inner
+        if token in ('attribute_exists', 'attribute_not_exists', 'begins_with', 'contains') and self._peek(1) == '(':
+            self._take()
+            self._take('(')
+            path = self.expr.name(self._take())
+            if token == 'attribute_exists':
+                self._take(')')
+                return lambda item: path in item
+            if token == 'attribute_not_exists':
+                self._take(')')
+                return lambda item: path not in item
+            self._take(',')
+            operand = self._operand()
+            self._take(')')
+            if token == 'begins_with':
+                return lambda item: isinstance(item.get(path), str) and item[path].startswith(operand(item))
+            return lambda item: path in item and operand(item) in item[path]
+        left = self._operand()
+        comparator = self._take()
+        if comparator not in _COMPARATORS:
+            self._fail()
+        right = self._operand()
+        compare = _COMPARATORS[comparator]
+
+        def comparison(item):
+            a, b = left(item), right(item)
+            if a is None or b is None:
+                return False
+            try:
+                return compare(a, b)
+            except TypeError:
+                return False
+        return comparison
+
+    def _operand(self):
+        token = self._take()
+        if token.startswith(':'):
+            value = _normalize(self.expr.value(token))
+            return lambda item: value
+        path = self.expr.name(token)
+        return lambda item: item.get(path)
+
+
+def parse_condition(expression: str, names: Optional[Dict[str, str]] = None,
+                    values: Optional[Dict[str, Any]] = None, operation: str = 'Query'):
+    """Compile a condition expression into ``predicate(item) -> bool``."""
+    return _ConditionParser(expression, _Expression(names, values, operation)).parse()
+
+
+class LocalTable:
+    """Dict-backed table keyed by its hash (and optional range) attribute."""
+
+    def __init__(self, name: str, hash_key: str, range_key: Optional[str] = None,
+                 indexes: Optional[Dict[str, Tuple[str, Optional[str]]]] = None):
+        self.name = name
+        self.table_name = name
+        self.hash_key = hash_key
+        self.range_key = range_key
+        self.indexes = dict(indexes or {})
+        self.items: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        # Scan 용 정렬된 키 목록 캐시 (쓰기 시 무효화)
+        self._scan_orders: Dict[Tuple[int, int], List[Tuple[Any, ...]]] = {}
+        self._fault: Optional[Dict[str, Any]] = None
+
+    # ------------------------------------------------------------------
+    # 장애 주입 (재시도/스로틀링 테스트용)
+    # ------------------------------------------------------------------
+    def inject_faults(self, code: str = 'ProvisionedThroughputExceededException', rate: float = 1.0,
+                      operations: Optional[List[str]] = None, count: Optional[int] = None,
+                      rng: Callable[[], float] = random.random) -> None:
+        """Fail calls with ``code`` (a ClientError, as DynamoDB would).
+
+        ``rate`` is the share of calls that fail, ``operations`` limits it to
+        some API names (e.g. ``['UpdateItem']``) and ``count`` stops after that
+        many injected failures.
+        """
+        self._fault = {'code': code, 'rate': rate, 'operations': set(operations) if operations else None,
+                       'remaining': count, 'rng': rng, 'injected': 0}
+
+    def clear_faults(self) -> None:
+        self._fault = None
+
+    @property
+    def injected_faults(self) -> int:
+        return self._fault['injected'] if self._fault else 0
+
+    def _maybe_fail(self, operation: str) -> None:
+        fault = self._fault
+        if fault is None or (fault['operations'] and operation not in fault['operations']):
+            return
+        if fault['remaining'] == 0 or fault['rng']() >= fault['rate']:
+            return
+        if fault['remaining'] is not None:
+            fault['remaining'] -= 1
+        fault['injected'] += 1
+        raise _client_error(fault['code'], 'Injected fault', operation)
+
+    # ------------------------------------------------------------------
+    # 내부 유틸
+    # ------------------------------------------------------------------
+    def _key_of(self, key: Dict[str, Any], operation: str) -> Tuple[Any, ...]:
+        expected = [self.hash_key] + ([self.range_key] if self.range_key else [])
+        if set(key) != set(expected):
+            raise _client_error('ValidationException',
+                                'The provided key element does not match the schema', operation)
+        return tuple(key[attr] for attr in expected)
+
+    @staticmethod
+    def _validate_values(values: Dict[str, Any]) -> None:
+        # boto3 resource 와 동일하게 float 등 지원하지 않는 타입은 TypeError
+        for value in values.values():
+            _serializer.serialize(value)
+
+    # ------------------------------------------------------------------
+    # Table API
+    # ------------------------------------------------------------------
+    def _check_condition(self, condition: Optional[str], expr: _Expression, item: Optional[Dict[str, Any]]) -> None:
+        if condition and not _ConditionParser(condition, expr).parse()(item or {}):
+            raise _client_error('ConditionalCheckFailedException', 'The conditional request failed',
+                                expr.operation)
+
+    def put_item(self, Item: Dict[str, Any], ConditionExpression: Optional[str] = None,
+                 ExpressionAttributeNames: Optional[Dict[str, str]] = None,
+                 ExpressionAttributeValues: Optional[Dict[str, Any]] = None,
+                 **kwargs: Any) -> Dict[str, Any]:
+        self._maybe_fail('PutItem')
+        self._validate_values(Item)
+        key = self._key_of({attr: Item[attr] for attr in self._key_attrs() if attr in Item}, 'PutItem')
+        expr = _Expression(ExpressionAttributeNames, ExpressionAttributeValues, 'PutItem')
+        with self._lock:
+            existing = self.items.get(key)
+            self._check_condition(ConditionExpression, expr, existing)
+            item = self.items[key] = _normalize(copy.deepcopy(Item))
+            if existing is None:
+                self._scan_orders.clear()
+        return self._consumed_write(kwargs, {}, existing, item)
+
+    def delete_item(self, Key: Dict[str, Any], ConditionExpression: Optional[str] = None,
+                    ExpressionAttributeNames: Optional[Dict[str, str]] = None,
+                    ExpressionAttributeValues: Optional[Dict[str, Any]] = None,
+                    **kwargs: Any) -> Dict[str, Any]:
+        self._maybe_fail('DeleteItem')
+        key = self._key_of(Key, 'DeleteItem')
+        expr = _Expression(ExpressionAttributeNames, ExpressionAttributeValues, 'DeleteItem')
+        with self._lock:
+            existing = self.items.get(key)
+            self._check_condition(ConditionExpression, expr, existing)
+            if existing is not None:
+                del self.items[key]
+                self._scan_orders.clear()
+        if kwargs.get('ReturnValues') == 'ALL_OLD' and existing is not None:
+            return {'Attributes': copy.deepcopy(existing)}
+        return {}
+
+    def get_item(self, Key: Dict[str, Any], **kwargs: Any) -> Dict[str, Any]:
+        self._maybe_fail('GetItem')
+        key = self._key_of(Key, 'GetItem')
+        with self._lock:
+            item = self.items.get(key)
+            result = {'Item': copy.deepcopy(item)} if item is not None else {}
+        if kwargs.get('ReturnConsumedCapacity', 'NONE') != 'NONE':
+            result['ConsumedCapacity'] = {'TableName': self.name, 'CapacityUnits': _read_units(item_size(item))}
+        return result
+
+    def update_item(self, Key: Dict[str, Any], UpdateExpression: str,
+                    ExpressionAttributeNames: Optional[Dict[str, str]] = None,
+                    ExpressionAttributeValues: Optional[Dict[str, Any]] = None,
+                    ReturnValues: str = 'NONE', ConditionExpression: Optional[str] = None,
+                    **kwargs: Any) -> Dict[str, Any]:
+        self._maybe_fail('UpdateItem')
+        key = self._key_of(Key, 'UpdateItem')
+        expr = _Expression(ExpressionAttributeNames, ExpressionAttributeValues, 'UpdateItem')
+        self._validate_values(expr.values)
+        actions = self._parse_set(UpdateExpression, expr)
+
+        with self._lock:
+            existing = self.items.get(key)
+            self._check_condition(ConditionExpression, expr, existing)
+            item = copy.deepcopy(existing) if existing is not None else _normalize(dict(Key))
+            # DynamoDB 는 모든 operand 를 갱신 전 아이템 기준으로 평가함
+            snapshot = copy.deepcopy(item)
+            for attr, evaluate in actions:
+                if attr in Key:
+                    raise _client_error('ValidationException',
+                                        'Cannot update attribute; this attribute is part of the key', 'UpdateItem')
+                item[attr] = _normalize(evaluate(snapshot))
+            self.items[key] = item
+            if existing is None:
+                self._scan_orders.clear()
+
+        result = {}
+        if ReturnValues == 'ALL_NEW':
+            result['Attributes'] = copy.deepcopy(item)
+        elif ReturnValues == 'ALL_OLD' and existing is not None:
+            result['Attributes'] = copy.deepcopy(existing)
+        return self._consumed_write(kwargs, result, existing, item)
+
+    def _consumed_write(self, kwargs: Dict[str, Any], result: Dict[str, Any],
+                        old: Optional[Dict[str, Any]], new: Dict[str, Any]) -> Dict[str, Any]:
+        """Attach ConsumedCapacity like DynamoDB (larger of old/new image, plus GSIs)."""
+        mode = kwargs.get('ReturnConsumedCapacity', 'NONE')
+        if mode == 'NONE':
+            return result
+        table_units = _write_units(max(item_size(old), item_size(new)))
+        index_units = {}
+        for index_name, (hash_key, range_key) in self.indexes.items():
+            index_attrs = [hash_key] + ([range_key] if range_key else [])
+            in_old = bool(old) and all(attr in old for attr in index_attrs)
+            in_new = all(attr in new for attr in index_attrs)
+            units = 0
+            if in_new:
+                units += _write_units(item_size(new))
+            if in_old and (not in_new or any(old[a] != new[a] for a in index_attrs)):
+                units += _write_units(item_size(old))  # 인덱스 키 변경 시 기존 항목 삭제 비용
+            if units:
+                index_units[index_name] = {'CapacityUnits': float(units)}
+        total = table_units + sum(u['CapacityUnits'] for u in index_units.values())
+        consumed = {'TableName': self.name, 'CapacityUnits': float(total)}
+        if mode == 'INDEXES':
+            consumed['Table'] = {'CapacityUnits': float(table_units)}
+            if index_units:
+                consumed['GlobalSecondaryIndexes'] = index_units
+        result['ConsumedCapacity'] = consumed
+        return result
+
+    def query(self, KeyConditionExpression: str, IndexName: Optional[str] = None,
+              ExpressionAttributeNames: Optional[Dict[str, str]] = None,
+              ExpressionAttributeValues: Optional[Dict[str, Any]] = None,
+              FilterExpression: Optional[str] = None, Limit: Optional[int] = None,
+              ExclusiveStartKey: Optional[Dict[str, Any]] = None, ScanIndexForward: bool = True,
+              **kwargs: Any) -> Dict[str, Any]:
+        self._maybe_fail('Query')
+        if IndexName is not None and IndexName not in self.indexes:
+            raise _client_error('ValidationException',
+                                f"The table does not have the specified index: {IndexName}", 'Query')
+        hash_key, range_key = self.indexes[IndexName] if IndexName else (self.hash_key, self.range_key)
+        expr = _Expression(ExpressionAttributeNames, ExpressionAttributeValues, 'Query')
+        matches_key = _ConditionParser(KeyConditionExpression, expr).parse()
+        matches_filter = _ConditionParser(FilterExpression, expr).parse() if FilterExpression else None
+
+        # 인덱스 정렬 키 → 테이블 키 순으로 정렬 (GSI 에 키 속성이 없는 아이템은 제외)
+        def order(item):
+            return (item.get(range_key, ''),) + tuple(item[attr] for attr in self._key_attrs())
+        with self._lock:
+            candidates = [item for item in self.items.values()
+                          if hash_key in item and (range_key is None or range_key in item) and matches_key(item)]
+        candidates.sort(key=order, reverse=not ScanIndexForward)
+        result = self._page(candidates, order, matches_filter, Limit, ExclusiveStartKey,
+                            ScanIndexForward, [hash_key] + ([range_key] if range_key else []))
+        if kwargs.get('ReturnConsumedCapacity', 'NONE') != 'NONE':
+            # Query 는 평가한 아이템 크기 합계 기준으로 과금
+            scanned = sum(item_size(item) for item in result.pop('_evaluated'))
+            result['ConsumedCapacity'] = {'TableName': self.name, 'CapacityUnits': _read_units(scanned)}
+        else:
+            result.pop('_evaluated')
+        return result
+
+    # DynamoDB Scan 페이지 최대 크기 (1MB)
+    SCAN_PAGE_BYTES = 1024 * 1024
+
+    def scan(self, Segment: Optional[int] = None, TotalSegments: Optional[int] = None,
+             Limit: Optional[int] = None, ExclusiveStartKey: Optional[Dict[str, Any]] = None,
+             FilterExpression: Optional[str] = None,
+             ExpressionAttributeNames: Optional[Dict[str, str]] = None,
+             ExpressionAttributeValues: Optional[Dict[str, Any]] = None,
+             **kwargs: Any) -> Dict[str, Any]:
+        """Paginated (optionally segmented) scan in key order.
+
+        Items are assigned to segments by a hash of their partition key, and
+        pages stop at ``Limit`` items or 1MB, like DynamoDB.
+        """
+        self._maybe_fail('Scan')
+        if (Segment is None) != (TotalSegments is None):
+            raise _client_error('ValidationException',
+                                'Segment and TotalSegments must be specified together', 'Scan')
+        total, segment = (TotalSegments, Segment) if TotalSegments else (1, 0)
+        expr = _Expression(ExpressionAttributeNames, ExpressionAttributeValues, 'Scan')
+        matches_filter = _ConditionParser(FilterExpression, expr).parse() if FilterExpression else None
+
+        with self._lock:
+            order = self._scan_orders.get((total, segment))
+            if order is None:
+                order = sorted(k for k in self.items if zlib.crc32(str(k[0]).encode('utf-8')) % total == segment)
+                self._scan_orders[(total, segment)] = order
+            start = bisect.bisect_right(order, self._key_of(_normalize(ExclusiveStartKey), 'Scan')) \
+                if ExclusiveStartKey else 0
+            evaluated, size, pos = [], 0, start
+            while pos < len(order) and (not Limit or len(evaluated) < Limit) and size < self.SCAN_PAGE_BYTES:
+                item = self.items.get(order[pos])
+                pos += 1
+                if item is not None:
+                    evaluated.append(item)
+                    size += item_size(item)
+            items = [copy.deepcopy(item) for item in evaluated
+                     if matches_filter is None or matches_filter(item)]
+
+        result = {'Items': items, 'Count': len(items), 'ScannedCount': len(evaluated)}
+        if pos < len(order) and evaluated:
+            last = evaluated[-1]
+            result['LastEvaluatedKey'] = {attr: last[attr] for attr in self._key_attrs()}
+        if kwargs.get('ReturnConsumedCapacity', 'NONE') != 'NONE':
+            result['ConsumedCapacity'] = {'TableName': self.name, 'CapacityUnits': _read_units(size)}
+        return result
+
+    def _page(self, candidates: List[Dict[str, Any]], order, matches_filter, limit: Optional[int],
+              start_key: Optional[Dict[str, Any]], forward: bool, extra_key_attrs: List[str]) -> Dict[str, Any]:
+        if start_key:
+            start = order(_normalize(start_key))
+            candidates = [item for item in candidates if (order(item) > start if forward else order(item) < start)]
+        # Limit 는 필터 적용 전 평가 개수 기준 (DynamoDB 와 동일)
+        evaluated = candidates[:limit] if limit else candidates
+        items = [copy.deepcopy(item) for item in evaluated if matches_filter is None or matches_filter(item)]
+        result = {'Items': items, 'Count': len(items), 'ScannedCount': len(evaluated), '_evaluated': evaluated}
+        if limit and len(candidates) > limit:
+            last = evaluated[-1]
+            key_attrs = dict.fromkeys(self._key_attrs() + extra_key_attrs)
+            result['LastEvaluatedKey'] = {attr: last[attr] for attr in key_attrs if attr in last}
+        return result
+
+    # ------------------------------------------------------------------
+    # UpdateExpression (SET) 파서
+    # ------------------------------------------------------------------
+    def _key_attrs(self) -> List[str]:
+        return [self.hash_key] + ([self.range_key] if self.range_key else [])
+
+    def _parse_set(self, expression: str, expr: _Expression):
+        tokens = _tokenize(expression)
+        if not tokens or tokens[0].upper() != 'SET':
+            raise _client_error('ValidationException',
+                                f"Only SET update expressions are supported: {expression!r}", 'UpdateItem')
+        pos = 1
+        actions = []
+        while pos < len(tokens):
+            attr = expr.name(tokens[pos])
+            if pos + 1 >= len(tokens) or tokens[pos + 1] != '=':
+                raise _client_error('ValidationException', f"Invalid UpdateExpression: {expression!r}", 'UpdateItem')
+            evaluate, pos = self._parse_value(tokens, pos + 2, expr)
+            actions.append((attr, evaluate))
+            if pos < len(tokens):
+                if tokens[pos] != ',':
+                    raise _client_error('ValidationException', f"Invalid UpdateExpression: {expression!r}", 'UpdateItem')
+                pos += 1
+        return actions
+
+    def _parse_value(self, tokens: List[str], pos: int, expr: _Expression):
+        left, pos = self._parse_operand(tokens, pos, expr)
+        if pos < len(tokens) and tokens[pos] in ('+', '-'):
+            op = tokens[pos]
+            right, pos = self._parse_operand(tokens, pos + 1, expr)
+
+            def arithmetic(item, left=left, right=right, op=op):
+                a, b = left(item), right(item)
+                if not isinstance(a, (int, Decimal)) or not isinstance(b, (int, Decimal)):
+                    raise _client_error('ValidationException',
+                                        'An operand in the update expression has an incorrect data type', 'UpdateItem')
+                return a + b if op == '+' else a - b
+            return arithmetic, pos
+        return left, pos
+
+    def _parse_operand(self, tokens: List[str], pos: int, expr: _Expression):
+        token = tokens[pos]
+        if token == 'if_not_exists' and tokens[pos + 1:pos + 2] == ['(']:
+            if tokens[pos + 1] != '(' or tokens[pos + 3] != ',':
+                raise _client_error('ValidationException', 'Invalid if_not_exists syntax', 'UpdateItem')
+            path = expr.name(tokens[pos + 2])
+            fallback, pos = self._parse_operand(tokens, pos + 4, expr)
+            if tokens[pos] != ')':
+                raise _client_error('ValidationException', 'Invalid if_not_exists syntax', 'UpdateItem')
+
+            def if_not_exists(item, path=path, fallback=fallback):
+                return copy.deepcopy(item[path]) if path in item else fallback(item)
+            return if_not_exists, pos + 1
+        if token.startswith(':'):
+            value = expr.value(token)
+            return (lambda item, value=value: copy.deepcopy(value)), pos + 1
+        path = expr.name(token)
+
+        def read_path(item, path=path):
+            if path not in item:
+                raise _client_error('ValidationException',
+                                    'The provided expression refers to an attribute that does not exist in the item',
+                                    'UpdateItem')
+            return copy.deepcopy(item[path])
+        return read_path, pos + 1
+
+
+class LocalDynamoDB:
+    """Minimal ``boto3.resource('dynamodb')`` replacement holding LocalTables."""
+
+    # 배포 테이블의 키 구성 (infrastructure/dynamodb/template.yaml 기준)
+    DEFAULT_SCHEMAS = {
+        'phonitale-user-responses': ('PK', 'SK'),
+        'phonitale-user-consent': ('email', 'name'),
+    }
+    DEFAULT_INDEXES = {
+        'phonitale-user-responses': {'UserRoundIndex': ('PK', 'GSI1SK')},
+    }
+
+    def __init__(self, schemas: Optional[Dict[str, Tuple[str, Optional[str]]]] = None,
+                 indexes: Optional[Dict[str, Dict[str, Tuple[str, Optional[str]]]]] = None):
+        self.schemas = dict(self.DEFAULT_SCHEMAS)
+        self.schemas.update(schemas or {})
+        self.indexes = dict(self.DEFAULT_INDEXES)
+        self.indexes.update(indexes or {})
+        self.tables: Dict[str, LocalTable] = {}
+
+    def Table(self, name: str) -> LocalTable:
+        if name not in self.tables:
+            hash_key, range_key = self.schemas[name]
+            self.tables[name] = LocalTable(name, hash_key, range_key, self.indexes.get(name))
+        return self.tables[name]
+
+
+def patch_handler_tables(module: Any, db: Optional[LocalDynamoDB] = None) -> LocalDynamoDB:
+    """Point lambda_function's tables at ``db`` (a fresh LocalDynamoDB by default)."""
+    db = db or LocalDynamoDB()
+    # 운영 구성과 동일하게 재시도 + metrics 계측 래퍼를 씌움
+    module.table_responses = InstrumentedTable(RetryingTable(db.Table('phonitale-user-responses')))
+    module.table_consent = InstrumentedTable(RetryingTable(db.Table('phonitale-user-consent')))
+    return db
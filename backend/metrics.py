@@ -0,0 +1,263 @@
+"""Per-invocation latency and capacity metrics, flushed as CloudWatch EMF.
+
+Handler code records into the current invocation with ``timer()`` blocks
+and ``add()``. ``InstrumentedTable`` wraps a table so every DynamoDB call is
+timed (``ddb_<operation>_ms``) and its consumed capacity is captured
+(``ddb_read_units``/``ddb_write_units``). ``flush()`` builds one Embedded
+Metric Format record per invocation, with ``Route`` and ``Route, PageType``
+dimensions, which CloudWatch turns into metrics without any API calls. The
+handler hands that record to ``request_log`` so it rides on the request's
+summary line instead of adding a second line.
+
+The same values also go into container-wide histograms (``histogram()``),
+so tests and benchmarks can assert on them locally.
+
+Configuration (environment):
+    METRICS_ENABLED     "0" turns recording and EMF output off (default on)
+    METRICS_NAMESPACE   CloudWatch namespace (default Phonitale/Backend)
+"""
+import bisect
+import functools
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional, TextIO, Tuple
+
+UNITS = {'_ms': 'Milliseconds', '_units': 'Count', '_count': 'Count', '_bytes': 'Bytes'}
+# 호출 단위로 합산해서 보내는 메트릭 (그 외는 개별 값 배열)
+SUMMED_SUFFIXES = ('_units', '_count')
+
+# 지연 시간 히스토그램 버킷 상한 (ms, 약 25% 간격)
+BUCKETS = tuple(round(0.05 * 1.25 ** i, 3) for i in range(60))
+
+# 표준 방식으로 요청한 consumed capacity 필드 (boto3 응답 형식)
+_CAPACITY_FIELDS = (('ReadCapacityUnits', 'ddb_read_units'), ('WriteCapacityUnits', 'ddb_write_units'))
+_READ_OPERATIONS = frozenset({'get_item', 'query', 'scan'})
+
+
+@functools.lru_cache(maxsize=None)
+def _unit(name: str) -> str:
+    for suffix, unit in UNITS.items():
+        if name.endswith(suffix):
+            return unit
+    return 'None'
+
+
+@functools.lru_cache(maxsize=None)
+def _dimension_sets(has_route: bool, has_page_type: bool) -> Tuple[List[List[str]], Tuple[Tuple[str, ...], ...]]:
+    # EMF 의 Dimensions 와 히스토그램 키용 (정렬된) 차원 이름 - 호출마다 다시 만들지 않음
+    if not has_route:
+        return [], ((),)
+    if has_page_type:
+        return [['Route'], ['Route', 'PageType']], (('Route',), ('PageType', 'Route'))
+    return [['Route']], (('Route',),)
+
+
+@functools.lru_cache(maxsize=256)
+def _metric_definitions(names: Tuple[str, ...]) -> List[Dict[str, str]]:
+    return [{'Name': name, 'Unit': _unit(name)} for name in names]
+
+
+class Histogram:
+    """Bucketed counts of one metric (percentiles are bucket upper bounds)."""
+
+    __slots__ = ('counts', 'count', 'total', 'max')
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, value: float) -> None:
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, pct: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = max(1, round(pct / 100.0 * self.count))
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return BUCKETS[index] if index < len(BUCKETS) else self.max
+        return self.max
+
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+
+class _Timer:
+    __slots__ = ('metrics', 'name', 'start')
+
+    def __init__(self, metrics: 'Metrics', name: str):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self) -> '_Timer':
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.metrics.add(self.name, (time.perf_counter() - self.start) * 1000.0)
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self) -> '_NullTimer':
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        return None
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class Metrics:
+    def __init__(self, namespace: Optional[str] = None, enabled: Optional[bool] = None,
+                 stream: Optional[TextIO] = None):
+        self.namespace = namespace or os.environ.get('METRICS_NAMESPACE', 'Phonitale/Backend')
+        self.enabled = enabled if enabled is not None else os.environ.get('METRICS_ENABLED', '1') != '0'
+        self.stream = stream
+        self.dimensions: Dict[str, str] = {}
+        self.values: Dict[str, List[float]] = {}
+        self.properties: Dict[str, Any] = {}
+        self.histograms: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], Histogram] = {}
+        self.last_record: Optional[Dict[str, Any]] = None
+        self.started = 0.0
+
+    # ------------------------------------------------------------------
+    def begin(self, **properties: Any) -> None:
+        """Start a new invocation (drops anything recorded but not flushed)."""
+        self.dimensions = {}
+        self.values = {}
+        self.properties = dict(properties)
+        self.started = time.perf_counter()
+
+    def set_dimension(self, name: str, value: str) -> None:
+        self.dimensions[name] = value
+
+    def add(self, name: str, value: float) -> None:
+        if self.enabled:
+            self.values.setdefault(name, []).append(value)
+
+    def timer(self, name: str) -> Any:
+        """``with metrics.timer('parse_ms'):`` records the block's wall time."""
+        return _Timer(self, name) if self.enabled else _NULL_TIMER
+
+    def record_capacity(self, operation: str, response: Dict[str, Any]) -> None:
+        capacity = response.get('ConsumedCapacity')
+        if not capacity or not self.enabled:
+            return
+        total = capacity.get('CapacityUnits', 0)
+        table = capacity.get('Table') or {}
+        split = False
+        for field, name in _CAPACITY_FIELDS:
+            if field in capacity or field in table:
+                self.add(name, float(capacity.get(field, table.get(field, 0))))
+                split = True
+        if not split:
+            # TOTAL 모드에서는 읽기/쓰기 구분 없이 CapacityUnits 만 반환됨
+            self.add('ddb_read_units' if operation in _READ_OPERATIONS else 'ddb_write_units', float(total))
+
+    # ------------------------------------------------------------------
+    def histogram(self, name: str, **dimensions: str) -> Histogram:
+        """Container-wide histogram of ``name`` for exactly these dimensions."""
+        key = (name, tuple(sorted(dimensions.items())))
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram()
+        return histogram
+
+    def flush(self, status: Optional[int] = None, write: bool = True) -> Optional[Dict[str, Any]]:
+        """Build this invocation's EMF record and fold its values into the histograms.
+
+        The record is written as its own line unless ``write`` is false (the
+        caller then logs it).
+        """
+        if not self.enabled:
+            return None
+        self.add('latency_ms', (time.perf_counter() - self.started) * 1000.0)
+        dimensions = self.dimensions
+        dimension_sets, scopes = _dimension_sets('Route' in dimensions, 'PageType' in dimensions)
+        record: Dict[str, Any] = {
+            '_aws': {
+                'Timestamp': int(time.time() * 1000),
+                'CloudWatchMetrics': [{
+                    'Namespace': self.namespace,
+                    'Dimensions': dimension_sets,
+                    'Metrics': _metric_definitions(tuple(self.values)),
+                }],
+            },
+        }
+        record.update(dimensions)
+        record.update(self.properties)
+        if status is not None:
+            record['status'] = status
+        histograms = self.histograms
+        scoped = [tuple((d, dimensions[d]) for d in scope) for scope in scopes]
+        for name, values in self.values.items():
+            if len(values) == 1:
+                record[name] = round(values[0], 3)
+            elif name.endswith(SUMMED_SUFFIXES):
+                values = [sum(values)]
+                record[name] = round(values[0], 3)
+            else:
+                record[name] = [round(v, 3) for v in values]
+            for scope in scoped:
+                histogram = histograms.get((name, scope))
+                if histogram is None:
+                    histogram = histograms[(name, scope)] = Histogram()
+                for value in values:
+                    histogram.record(value)
+        self.last_record = record
+        if write:
+            stream = self.stream or sys.stdout
+            stream.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n')
+        self.values = {}
+        return record
+
+    def reset(self) -> None:
+        """Forget histograms and the current invocation (tests only)."""
+        self.histograms = {}
+        self.begin()
+        self.last_record = None
+
+
+class InstrumentedTable:
+    """Table proxy that times each call and captures its consumed capacity."""
+
+    _OPERATIONS = frozenset({'put_item', 'get_item', 'update_item', 'delete_item', 'query', 'scan'})
+
+    def __init__(self, table: Any, recorder: Optional[Metrics] = None):
+        self._table = table
+        self._metrics = recorder
+
+    def __getattr__(self, attr: str) -> Any:
+        target = getattr(self._table, attr)
+        if attr not in self._OPERATIONS:
+            return target
+        recorder = self._metrics or metrics
+
+        def call(**kwargs: Any) -> Dict[str, Any]:
+            if not recorder.enabled:
+                return target(**kwargs)
+            kwargs.setdefault('ReturnConsumedCapacity', 'TOTAL')
+            start = time.perf_counter()
+            try:
+                response = target(**kwargs)
+            finally:
+                recorder.add(f'ddb_{attr}_ms', (time.perf_counter() - start) * 1000.0)
+            recorder.record_capacity(attr, response)
+            return response
+        return call
+
+
+metrics = Metrics()
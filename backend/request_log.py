@@ -0,0 +1,190 @@
+"""Leveled, sampled JSON logging for the Lambda handler.
+
+Every invocation produces one compact summary line (route, page_type,
+status, timing, warnings). Everything else is gated by level, and full
+payload dumps only happen for a sampled fraction of requests. Field values
+may be passed as zero-argument callables so they are only computed when the
+line is actually written. Personal data (name, phone, email, user) is
+pseudonymized or redacted before it reaches CloudWatch.
+
+Configuration (environment):
+    LOG_LEVEL               DEBUG / INFO / WARNING / ERROR (default INFO)
+    LOG_DEBUG_SAMPLE_RATE   0.0-1.0, share of requests logged at DEBUG (default 0)
+"""
+import hashlib
+import json
+import os
+import random
+import sys
+import time
+import traceback
+from typing import Any, Callable, Dict, List, Optional, TextIO
+
+LEVELS = {'DEBUG': 10, 'INFO': 20, 'WARNING': 30, 'ERROR': 40}
+
+# 로그에 원문 그대로 남기면 안 되는 필드 (consent 정보 및 name#phone 형태의 user id)
+PSEUDONYMIZED_FIELDS = frozenset({'user', 'userId'})
+REDACTED_FIELDS = frozenset({'name', 'phone', 'email', 'userEmail', 'userName'})
+
+
+def _level_number(level: Any) -> int:
+    if isinstance(level, int):
+        return level
+    return LEVELS.get(str(level).upper(), LEVELS['INFO'])
+
+
+def pseudonymize(value: Any) -> str:
+    """Stable short hash so one participant's lines can still be correlated."""
+    return hashlib.sha256(str(value).encode('utf-8')).hexdigest()[:12]
+
+
+def redact(payload: Any) -> Any:
+    """Copy of ``payload`` with personal fields hashed or masked."""
+    if isinstance(payload, dict):
+        cleaned = {}
+        for key, value in payload.items():
+            if key in PSEUDONYMIZED_FIELDS and value is not None:
+                cleaned[key] = pseudonymize(value)
+            elif key in REDACTED_FIELDS and value is not None:
+                cleaned[key] = '<redacted>'
+            elif key == 'body' and isinstance(value, str):
+                # API Gateway event 의 body 는 JSON 문자열이므로 파싱 후 정리
+                try:
+                    cleaned[key] = redact(json.loads(value))
+                except ValueError:
+                    cleaned[key] = '<unparsed>'
+            else:
+                cleaned[key] = redact(value)
+        return cleaned
+    if isinstance(payload, list):
+        return [redact(value) for value in payload]
+    return payload
+
+
+def _resolve(fields: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: (value() if callable(value) else value) for key, value in fields.items()}
+
+
+class RequestLog:
+    """Per-invocation state; ``finish`` writes the single summary line."""
+
+    __slots__ = ('logger', 'sampled', 'started', 'fields', 'warnings')
+
+    def __init__(self, logger: 'Logger', sampled: bool, fields: Dict[str, Any]):
+        self.logger = logger
+        self.sampled = sampled
+        self.started = time.perf_counter()
+        self.fields = fields
+        self.warnings: List[str] = []
+
+    def set(self, **fields: Any) -> None:
+        self.fields.update(fields)
+
+    def warn(self, code: str) -> None:
+        # 요청당 한 줄 원칙: 경고는 별도 라인 대신 요약 라인에 코드로 모음
+        self.warnings.append(code)
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000.0
+
+    def finish(self, status: int, metrics: Optional[Dict[str, Any]] = None) -> None:
+        level = 'INFO' if status < 400 and not self.warnings else 'WARNING'
+        if status >= 500:
+            level = 'ERROR'
+        if not self.logger.is_enabled(level, self):
+            # 요약 라인이 꺼져 있어도 EMF 메트릭은 항상 기록
+            if metrics:
+                self.logger.write(metrics)
+            return
+        record = {'level': level, 'msg': 'request', 'status': status,
+                  'duration_ms': round(self.elapsed_ms(), 3)}
+        record.update(_resolve(self.fields))
+        if self.warnings:
+            record['warnings'] = self.warnings
+        if metrics:
+            # EMF 메타데이터(_aws)를 요약 라인에 합쳐 요청당 한 줄 유지
+            record.update({key: value for key, value in metrics.items() if key not in record})
+        self.logger.write(record)
+
+
+class Logger:
+    def __init__(self, level: Optional[Any] = None, sample_rate: Optional[float] = None,
+                 stream: Optional[TextIO] = None, rng: Callable[[], float] = random.random):
+        self.level = _level_number(level if level is not None else os.environ.get('LOG_LEVEL', 'INFO'))
+        if sample_rate is None:
+            sample_rate = float(os.environ.get('LOG_DEBUG_SAMPLE_RATE', '0') or 0)
+        self.sample_rate = sample_rate
+        self.stream = stream
+        self.rng = rng
+        self.current: Optional[RequestLog] = None
+
+    # ------------------------------------------------------------------
+    def is_enabled(self, level: Any, request: Optional[RequestLog] = None) -> bool:
+        request = request or self.current
+        threshold = LEVELS['DEBUG'] if request is not None and request.sampled else self.level
+        return _level_number(level) >= threshold
+
+    def write(self, record: Dict[str, Any]) -> None:
+        # stdout 은 Lambda 에서 CloudWatch 로 그대로 전달됨 (호출 시점의 sys.stdout 사용)
+        stream = self.stream or sys.stdout
+        stream.write(json.dumps(record, ensure_ascii=False, separators=(',', ':'), default=str) + '\n')
+
+    def log(self, level: str, msg: str, **fields: Any) -> None:
+        if not self.is_enabled(level):
+            return
+        record = {'level': level, 'msg': msg}
+        record.update(_resolve(fields))
+        self.write(record)
+
+    def debug(self, msg: str, **fields: Any) -> None:
+        self.log('DEBUG', msg, **fields)
+
+    def info(self, msg: str, **fields: Any) -> None:
+        self.log('INFO', msg, **fields)
+
+    def warning(self, msg: str, **fields: Any) -> None:
+        self.log('WARNING', msg, **fields)
+
+    def error(self, msg: str, exc_info: bool = False, **fields: Any) -> None:
+        if exc_info:
+            fields['traceback'] = traceback.format_exc
+        self.log('ERROR', msg, **fields)
+
+    def debug_payload(self, msg: str, payload: Any) -> None:
+        """Dump a (redacted) payload, only for DEBUG level or sampled requests."""
+        if not self.is_enabled('DEBUG'):
+            return
+        self.log('DEBUG', msg, payload=lambda: redact(payload() if callable(payload) else payload))
+
+    # ------------------------------------------------------------------
+    def begin_request(self, event: Dict[str, Any], **fields: Any) -> RequestLog:
+        sampled = self.sample_rate > 0 and self.rng() < self.sample_rate
+        base = {'route': f"{event.get('httpMethod', 'UNKNOWN')} {event.get('path', '/')}"}
+        base.update(fields)
+        self.current = RequestLog(self, sampled, base)
+        return self.current
+
+    def end_request(self, status: int, metrics: Optional[Dict[str, Any]] = None) -> None:
+        """Write the summary line, carrying ``metrics`` (an EMF record) if given."""
+        if self.current is not None:
+            self.current.finish(status, metrics)
+            self.current = None
+        elif metrics:
+            self.write(metrics)
+
+    def annotate(self, **fields: Any) -> None:
+        """Add fields to the current request's summary line."""
+        if self.current is not None:
+            self.current.set(**fields)
+
+    def warn(self, code: str, **fields: Any) -> None:
+        """Record a data-quality warning on the current request (or log it directly)."""
+        if self.current is not None:
+            self.current.warn(code)
+            if fields:
+                self.debug(code, **fields)
+        else:
+            self.warning(code, **fields)
+
+
+log = Logger()
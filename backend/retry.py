@@ -0,0 +1,206 @@
+"""Deadline-bounded retries and a circuit breaker for DynamoDB calls.
+
+``RetryingTable`` wraps a table and retries throttling and transient
+errors with capped exponential backoff and full jitter. It only waits as
+long as the invocation can afford: the budget is the Lambda context's
+``get_remaining_time_in_millis()`` minus a reserve for building the
+response, so a throttled request fails in time to answer instead of being
+killed by the Lambda timeout.
+
+A per-table circuit breaker counts consecutive throttled/failed calls.
+Once it opens, calls fail immediately with ``ServiceUnavailable`` (the
+handler answers 503 + Retry-After) until the cool-down ends; then one trial
+call decides whether to close it again. Exhausted retries raise
+``ServiceUnavailable`` too, so clients always get a retryable status
+rather than a bare 500.
+
+botocore's own retries are turned off by default (``DDB_MAX_ATTEMPTS=1`` in
+aws_clients) so the two layers do not multiply.
+
+Configuration (environment):
+    DDB_RETRY_MAX_ATTEMPTS     attempts per call, incl. the first (default 5)
+    DDB_RETRY_BASE_MS          first backoff cap (default 25)
+    DDB_RETRY_MAX_BACKOFF_MS   backoff cap (default 1000)
+    DDB_RETRY_BUDGET_MS        budget when there is no Lambda context (default 2000)
+    DDB_RETRY_RESERVE_MS       time kept back for the response (default 250)
+    DDB_BREAKER_THRESHOLD      consecutive failures that open the breaker (default 8)
+    DDB_BREAKER_COOLDOWN_MS    how long it stays open (default 2000)
+"""
+import math
+import os
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+import aws_clients
+from metrics import metrics
+
+# 재시도하면 성공할 수 있는 DynamoDB 오류 코드
+RETRYABLE_CODES = frozenset({
+    'ProvisionedThroughputExceededException',
+    'ThrottlingException',
+    'RequestLimitExceeded',
+    'InternalServerError',
+    'ServiceUnavailable',
+    'LimitExceededException',
+})
+# botocore 연결 오류 (ClientError 가 아니므로 클래스 이름으로 판별, botocore import 없이)
+RETRYABLE_EXCEPTIONS = frozenset({
+    'EndpointConnectionError', 'ConnectionClosedError', 'ReadTimeoutError', 'ConnectTimeoutError',
+})
+
+MAX_ATTEMPTS = int(os.environ.get('DDB_RETRY_MAX_ATTEMPTS', '5'))
+BASE_MS = float(os.environ.get('DDB_RETRY_BASE_MS', '25'))
+MAX_BACKOFF_MS = float(os.environ.get('DDB_RETRY_MAX_BACKOFF_MS', '1000'))
+DEFAULT_BUDGET_MS = float(os.environ.get('DDB_RETRY_BUDGET_MS', '2000'))
+RESERVE_MS = float(os.environ.get('DDB_RETRY_RESERVE_MS', '250'))
+BREAKER_THRESHOLD = int(os.environ.get('DDB_BREAKER_THRESHOLD', '8'))
+BREAKER_COOLDOWN_MS = float(os.environ.get('DDB_BREAKER_COOLDOWN_MS', '2000'))
+
+
+class ServiceUnavailable(Exception):
+    """DynamoDB is throttling or unreachable; answer 503 with Retry-After."""
+
+    def __init__(self, message: str, retry_after: int = 1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def is_retryable(exc: BaseException) -> bool:
+    return aws_clients.error_code(exc) in RETRYABLE_CODES or type(exc).__name__ in RETRYABLE_EXCEPTIONS
+
+
+# ----------------------------------------------------------------------
+# 호출 단위 시간 예산 (lambda_handler 에서 호출마다 설정)
+# ----------------------------------------------------------------------
+_deadline: Optional[float] = None
+
+
+def begin(context: Any) -> None:
+    """Set this invocation's retry deadline from the Lambda context."""
+    global _deadline
+    remaining = None
+    get_remaining = getattr(context, 'get_remaining_time_in_millis', None)
+    if callable(get_remaining):
+        remaining = get_remaining() - RESERVE_MS
+    else:
+        remaining = DEFAULT_BUDGET_MS
+    _deadline = time.monotonic() + max(0.0, remaining) / 1000.0
+
+
+def remaining_ms() -> float:
+    if _deadline is None:
+        return DEFAULT_BUDGET_MS
+    return max(0.0, (_deadline - time.monotonic()) * 1000.0)
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker: closed -> open -> half-open (one trial) -> closed."""
+
+    def __init__(self, threshold: int = BREAKER_THRESHOLD, cooldown_ms: float = BREAKER_COOLDOWN_MS,
+                 clock: Callable[[], float] = time.monotonic):
+        self.threshold = threshold
+        self.cooldown_ms = cooldown_ms
+        self.clock = clock
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return 'closed'
+        if (self.clock() - self.opened_at) * 1000.0 < self.cooldown_ms:
+            return 'open'
+        return 'half_open'
+
+    def retry_after(self) -> int:
+        """Seconds until the breaker lets a trial call through (at least 1)."""
+        if self.opened_at is None:
+            return 1
+        left_ms = self.cooldown_ms - (self.clock() - self.opened_at) * 1000.0
+        return max(1, math.ceil(left_ms / 1000.0))
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == 'closed':
+                return True
+            if state == 'half_open' and not self.trial_running:
+                self.trial_running = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_running = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.trial_running or self.failures >= self.threshold:
+                self.opened_at = self.clock()
+            self.trial_running = False
+
+
+class RetryingTable:
+    """Table proxy: retries retryable errors within the invocation's budget."""
+
+    _OPERATIONS = frozenset({'put_item', 'get_item', 'update_item', 'delete_item', 'query', 'scan'})
+
+    def __init__(self, table: Any, breaker: Optional[CircuitBreaker] = None,
+                 max_attempts: int = MAX_ATTEMPTS, base_ms: float = BASE_MS,
+                 max_backoff_ms: float = MAX_BACKOFF_MS,
+                 sleep: Callable[[float], None] = time.sleep, rng: Callable[[], float] = random.random):
+        self._table = table
+        self.breaker = breaker or CircuitBreaker()
+        self.max_attempts = max_attempts
+        self.base_ms = base_ms
+        self.max_backoff_ms = max_backoff_ms
+        self.sleep = sleep
+        self.rng = rng
+
+    def __getattr__(self, attr: str) -> Any:
+        target = getattr(self._table, attr)
+        if attr not in self._OPERATIONS:
+            return target
+
+        def call(**kwargs: Any) -> Dict[str, Any]:
+            return self._call(attr, target, kwargs)
+        return call
+
+    def backoff_ms(self, attempt: int) -> float:
+        """Full jitter: uniform in [0, min(cap, base * 2**attempt)]."""
+        return self.rng() * min(self.max_backoff_ms, self.base_ms * (2 ** attempt))
+
+    def _call(self, operation: str, target: Callable[..., Dict[str, Any]], kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                metrics.add('ddb_shed_count', 1)
+                raise ServiceUnavailable(f"DynamoDB {operation} shed: circuit open",
+                                         self.breaker.retry_after())
+            try:
+                response = target(**kwargs)
+            except Exception as e:
+                if not is_retryable(e):
+                    # 조건 실패/검증 오류 등은 요청 자체의 문제 - breaker 와 무관
+                    self.breaker.record_success()
+                    raise
+                self.breaker.record_failure()
+                metrics.add('ddb_throttle_count', 1)
+                attempt += 1
+                delay_ms = self.backoff_ms(attempt)
+                if attempt >= self.max_attempts or delay_ms >= remaining_ms():
+                    raise ServiceUnavailable(
+                        f"DynamoDB {operation} failed after {attempt} attempts: {aws_clients.error_code(e) or type(e).__name__}",
+                        self.breaker.retry_after()) from e
+                metrics.add('ddb_retry_count', 1)
+                self.sleep(delay_ms / 1000.0)
+                continue
+            self.breaker.record_success()
+            return response
@@ -0,0 +1,237 @@
+"""Per-participant session summary, computed when the session ends.
+
+``final_summary`` reads the participant's response items back from
+UserRoundIndex (one paginated Query per round, run concurrently) and stores
+the aggregates as a single item next to them::
+
+    PK=USER#<user>  SK=SUMMARY
+    status          "complete" or "deferred"
+    rounds          {"1": {"learning": {pages, missing, duration_sum,
+                    duration_median, outliers}, ...}, ...}
+    survey          {pages, missing}
+    correct         {recognition, generation}
+
+so dashboards read one item per participant instead of every response.
+The item has no GSI1SK, so it never shows up in UserRoundIndex queries.
+
+The reads are time-boxed: when they do not finish within the budget
+(``SUMMARY_BUDGET_MS``, capped by what is left of the invocation) or fail,
+the item is stored with ``status=deferred`` and the summary is computed
+later by:
+
+* queue_consumer_handler in write-behind mode, where it is always
+  deferred and queued behind the participant's pending writes;
+* lambda_function.deferred_summary_handler in sync mode. It runs when an
+  EventBridge schedule invokes the API function, and that schedule must be
+  deployed separately (infrastructure/schedule/template.yaml). Without it,
+  deferred participants keep no summary until someone runs::
+
+    python session_summary.py --deferred
+
+Configuration (environment):
+    SUMMARY_BUDGET_MS   time allowed for the reads in final_summary (default 1500)
+    SUMMARY_WORKERS     concurrent round queries (default 4)
+"""
+import argparse
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Set
+
+import ingest_queue
+import item_codec
+import retry
+import words
+from table_schema import PHASES, to_float, user_partition_key, user_round_query
+
+SUMMARY_SK = 'SUMMARY'
+SUMMARY_JOB = 'summary'
+COMPLETE = 'complete'
+DEFERRED = 'deferred'
+
+BUDGET_MS = float(os.environ.get('SUMMARY_BUDGET_MS', '1500'))
+WORKERS = int(os.environ.get('SUMMARY_WORKERS', '4'))
+
+# 웜 컨테이너에서 재사용 (호출마다 스레드를 새로 만들지 않음)
+_executor = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix='summary')
+
+
+class SummaryTimeout(Exception):
+    """The reads did not finish within the budget."""
+
+
+def summary_key(user: str) -> Dict[str, str]:
+    return {'PK': user_partition_key(user), 'SK': SUMMARY_SK}
+
+
+# ----------------------------------------------------------------------
+# 1. 읽기: 라운드별 Query 를 동시에, 페이지 사이마다 시간 확인
+# ----------------------------------------------------------------------
+def round_items(table: Any, user: str, round_number: str, deadline: float) -> List[Dict[str, Any]]:
+    """Decoded response items of one round, all pages."""
+    kwargs = user_round_query(user, round_number)
+    items: List[Dict[str, Any]] = []
+    while True:
+        if time.monotonic() > deadline:
+            raise SummaryTimeout(f"round {round_number} not read in time")
+        page = table.query(**kwargs)
+        items.extend(item_codec.decode_item(item) for item in page.get('Items', []))
+        if 'LastEvaluatedKey' not in page:
+            return items
+        kwargs['ExclusiveStartKey'] = page['LastEvaluatedKey']
+
+
+def fetch_rounds(table: Any, user: str, rounds: List[str], budget_ms: float) -> Dict[str, List[Dict[str, Any]]]:
+    """round -> items, or SummaryTimeout when the budget runs out."""
+    deadline = time.monotonic() + budget_ms / 1000.0
+    futures = {r: _executor.submit(round_items, table, user, r, deadline) for r in rounds}
+    _, pending = wait(futures.values(), timeout=max(0.0, budget_ms / 1000.0))
+    if pending:
+        for future in pending:
+            future.cancel()
+        raise SummaryTimeout(f"{len(pending)} of {len(rounds)} rounds not read in time")
+    return {r: future.result() for r, future in futures.items()}
+
+
+# ----------------------------------------------------------------------
+# 2. 집계
+# ----------------------------------------------------------------------
+def _number(value: float) -> Decimal:
+    # DynamoDB 는 float 를 받지 않음
+    return Decimal(str(round(value, 3)))
+
+
+def outlier_words(durations: Dict[str, float]) -> List[str]:
+    """Words whose duration lies outside Tukey's fences (1.5 IQR)."""
+    if len(durations) < 4:
+        return []
+    q1, _, q3 = statistics.quantiles(durations.values(), n=4)
+    low, high = q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1)
+    return sorted(word for word, value in durations.items() if value < low or value > high)
+
+
+def phase_stats(items: List[Dict[str, Any]], phase: str, expected: Optional[Set[str]]) -> Dict[str, Any]:
+    # 페이지의 속성이 하나라도 있으면 본 것으로 (RecognitionPage 는 timestamp_in 을 보내지 않음)
+    attrs = (f"timestamp_{phase}_in", f"timestamp_{phase}_out", f"duration_{phase}", f"response_{phase}")
+    seen = {item['english_word'] for item in items if any(attr in item for attr in attrs)}
+    durations = {}
+    for item in items:
+        value = to_float(item.get(f"duration_{phase}"))
+        if value is not None:
+            durations[item['english_word']] = value
+    stats: Dict[str, Any] = {
+        'pages': len(seen),
+        'duration_sum': _number(sum(durations.values())),
+        'duration_median': _number(statistics.median(durations.values())) if durations else None,
+        'outliers': outlier_words(durations),
+    }
+    if expected is not None:
+        stats['missing'] = len(expected - seen)
+    return stats
+
+
+def expected_words() -> Optional[Dict[str, Set[str]]]:
+    """round -> words shown in it (None when the word file is unavailable)."""
+    try:
+        rounds = words.get_words()['rounds']
+    except OSError:
+        return None
+    return {r: {row['word'] for row in rows} for r, rows in rounds.items()}
+
+
+def summarize(items_by_round: Dict[str, List[Dict[str, Any]]],
+              expected: Optional[Dict[str, Set[str]]] = None) -> Dict[str, Any]:
+    """Summary attributes of one participant (see the module docstring)."""
+    rounds = {}
+    for round_number, items in items_by_round.items():
+        round_expected = expected.get(round_number, set()) if expected is not None else None
+        rounds[round_number] = {phase: phase_stats(items, phase, round_expected) for phase in PHASES}
+    all_items = [item for items in items_by_round.values() for item in items]
+    surveyed = {item['english_word'] for item in all_items if 'usefulness' in item or 'timestamp_survey' in item}
+    survey: Dict[str, Any] = {'pages': len(surveyed)}
+    if expected is not None:
+        survey['missing'] = len(set().union(*expected.values()) - surveyed)
+    correct = {page_type: sum(1 for item in all_items if item.get(f"correct_{page_type}") is True)
+               for page_type in ('recognition', 'generation')}
+    return {'rounds': rounds, 'survey': survey, 'correct': correct}
+
+
+# ----------------------------------------------------------------------
+# 3. 저장 / 연기
+# ----------------------------------------------------------------------
+def store(table: Any, user: str, status: str, summary: Optional[Dict[str, Any]] = None) -> None:
+    item = {**summary_key(user), 'user': user, 'status': status,
+            'updated_at': datetime.now(timezone.utc).isoformat()}
+    item.update(summary or {})
+    table.put_item(Item=item)
+
+
+def defer(table: Any, user: str) -> None:
+    """Mark the summary as pending; write-behind mode also queues the job."""
+    store(table, user, DEFERRED)
+    if ingest_queue.write_behind_enabled():
+        ingest_queue.get_queue().send([ingest_queue.encode({'job': SUMMARY_JOB, 'user': user})],
+                                        [ingest_queue.group_id(user)])
+
+
+def compute(table: Any, user: str, budget_ms: Optional[float] = None) -> Dict[str, Any]:
+    """Read, aggregate and store one participant's summary (no fallback)."""
+    expected = expected_words()
+    rounds = sorted(expected) if expected is not None else list(words.ROUNDS)
+    budget_ms = retry.remaining_ms() if budget_ms is None else budget_ms
+    summary = summarize(fetch_rounds(table, user, rounds, budget_ms), expected)
+    store(table, user, COMPLETE, summary)
+    return summary
+
+
+def record(table: Any, user: str) -> str:
+    """final_summary hook: compute within the budget, else defer. Returns the status."""
+    if ingest_queue.write_behind_enabled():
+        # 응답이 아직 큐에 남아 있을 수 있음 - 같은 그룹(user) 뒤에 줄 세워 나중에 계산
+        defer(table, user)
+        return DEFERRED
+    budget_ms = min(BUDGET_MS, retry.remaining_ms())
+    try:
+        compute(table, user, budget_ms)
+        return COMPLETE
+    except SummaryTimeout:
+        defer(table, user)
+        return DEFERRED
+
+
+def deferred_users(table: Any) -> List[str]:
+    """Participants whose summary is still deferred (full scan; offline use)."""
+    kwargs: Dict[str, Any] = {
+        'FilterExpression': '#sk = :sk AND #st = :deferred',
+        'ExpressionAttributeNames': {'#sk': 'SK', '#st': 'status'},
+        'ExpressionAttributeValues': {':sk': SUMMARY_SK, ':deferred': DEFERRED},
+    }
+    users = []
+    while True:
+        page = table.scan(**kwargs)
+        users.extend(item['user'] for item in page.get('Items', []))
+        if 'LastEvaluatedKey' not in page:
+            return users
+        kwargs['ExclusiveStartKey'] = page['LastEvaluatedKey']
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Compute per-participant session summaries.')
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument('--user', action='append', help='participant id (name#phone); repeatable')
+    group.add_argument('--deferred', action='store_true', help='every summary left deferred')
+    parser.add_argument('--budget-ms', type=float, default=60000)
+    args = parser.parse_args(argv)
+
+    import aws_clients
+    table = aws_clients.cli_table('phonitale-user-responses')
+    for user in args.user or deferred_users(table):
+        summary = compute(table, user, args.budget_ms)
+        print(f"{user}\t{sum(r['learning']['pages'] for r in summary['rounds'].values())} learning pages")
+
+
+if __name__ == '__main__':
+    main()
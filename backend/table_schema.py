@@ -0,0 +1,56 @@
+"""Key layout of the phonitale-user-responses single table.
+
+(infrastructure/dynamodb/template.yaml)::
+
+    PK     = USER#<user>                               participant partition
+    SK     = WORD#<english_word>                       one response item per word
+             SUMMARY                                   session_summary.py
+    GSI1SK = ROUND#<3-digit round>#WORD#<english_word> UserRoundIndex sort key
+
+The handler, the export and the session summary all build keys and
+UserRoundIndex queries through this module.
+"""
+from typing import Any, Dict, Optional
+
+USER_ROUND_INDEX = 'UserRoundIndex'
+
+# timestamp_<phase>_in/out, duration_<phase> 를 저장하는 페이지 타입
+PHASES = ('learning', 'recognition', 'generation')
+
+
+def user_partition_key(user: str) -> str:
+    return f"USER#{user}"
+
+
+def round_prefix(round_number: Any) -> str:
+    """GSI1SK prefix of one round; zero-padded so rounds sort numerically."""
+    if isinstance(round_number, int) or (isinstance(round_number, str) and round_number.isdigit()):
+        return f"ROUND#{int(round_number):03d}#"
+    return f"ROUND#{round_number}#"
+
+
+def response_key(user: str, english_word: str) -> Dict[str, str]:
+    return {'PK': user_partition_key(user), 'SK': f"WORD#{english_word}"}
+
+
+def user_round_query(user: str, round_number: Any = None) -> Dict[str, Any]:
+    """Query arguments for a participant's items on UserRoundIndex (one round or all)."""
+    return {
+        'IndexName': USER_ROUND_INDEX,
+        'KeyConditionExpression': '#pk = :pk AND begins_with(#gsk, :prefix)',
+        'ExpressionAttributeNames': {'#pk': 'PK', '#gsk': 'GSI1SK'},
+        'ExpressionAttributeValues': {
+            ':pk': user_partition_key(user),
+            ':prefix': round_prefix(round_number) if round_number not in (None, '') else 'ROUND#',
+        },
+    }
+
+
+def to_float(value: Any) -> Optional[float]:
+    """Numeric attribute (Decimal, number or numeric string) as float, None if missing/invalid."""
+    if value is None or value == '' or isinstance(value, bool):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
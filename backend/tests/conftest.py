@@ -0,0 +1,8 @@
+import os
+import sys
+
+# backend/ 모듈(lambda_function 등)을 테스트에서 바로 import 할 수 있도록 경로 추가
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# boto3 는 import 시 리전이 필요함 (로컬 테스트는 실제 AWS 에 접속하지 않음)
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-2')
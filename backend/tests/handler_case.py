@@ -0,0 +1,68 @@
+import contextlib
+import io
+import json
+import unittest
+
+import idempotency
+import lambda_function
+from local_dynamodb import LocalDynamoDB, patch_handler_tables
+
+RESPONSES = 'phonitale-user-responses'
+CONSENT = 'phonitale-user-consent'
+
+
+class CountingTable:
+    """LocalTable 을 감싸서 호출된 메소드 이름을 기록"""
+
+    def __init__(self, table):
+        self.table = table
+        self.calls = []
+
+    def __getattr__(self, name):
+        method = getattr(self.table, name)
+
+        def wrapper(*args, **kwargs):
+            self.calls.append(name)
+            return method(*args, **kwargs)
+        return wrapper
+
+
+class HandlerTestCase(unittest.TestCase):
+    """lambda_handler 를 LocalDynamoDB 테이블로 호출하는 테스트의 공통 fixture
+
+    setUp 이 lambda_function 의 테이블을 메모리 테이블로 바꾸고 (self.db,
+    self.responses, self.consent) 테스트가 끝나면 원래 테이블로 되돌림.
+    이전 테이블의 Idempotency-Key 결과가 남지 않도록 컨테이너 LRU 도 비움.
+    핸들러가 출력한 로그는 self.stdout 에 모임.
+    """
+
+    def setUp(self):
+        original = (lambda_function.table_responses, lambda_function.table_consent)
+        self.addCleanup(self.restore_tables, original)
+        idempotency.clear_cache()
+        self.addCleanup(idempotency.clear_cache)
+        self.stdout = io.StringIO()
+        self.use_local_tables()
+
+    def use_local_tables(self):
+        """새 LocalDynamoDB 로 교체 (테스트 중간에 다시 불러 빈 테이블로 시작 가능)"""
+        self.db = patch_handler_tables(lambda_function, LocalDynamoDB())
+        self.responses = self.db.Table(RESPONSES)
+        self.consent = self.db.Table(CONSENT)
+        return self.db
+
+    @staticmethod
+    def restore_tables(original):
+        lambda_function.table_responses, lambda_function.table_consent = original
+
+    def handle(self, event, context=None):
+        with contextlib.redirect_stdout(self.stdout):
+            return lambda_function.lambda_handler(event, context)
+
+    def call(self, method, path, body=None, headers=None, context=None):
+        event = {'httpMethod': method, 'path': path}
+        if headers is not None:
+            event['headers'] = headers
+        if body is not None:
+            event['body'] = body if isinstance(body, str) else json.dumps(body)
+        return self.handle(event, context)
@@ -0,0 +1,104 @@
+import os
+import subprocess
+import sys
+import unittest
+from unittest import mock
+from decimal import Decimal
+
+import botocore.session
+from botocore.stub import Stubber
+
+import aws_clients
+
+
+class TestTableWrapper(unittest.TestCase):
+
+    def setUp(self):
+        self.client = botocore.session.get_session().create_client(
+            'dynamodb', region_name='us-east-2',
+            aws_access_key_id='test', aws_secret_access_key='test')
+        self.stubber = Stubber(self.client)
+        self.stubber.activate()
+        self.addCleanup(self.stubber.deactivate)
+        self.table = aws_clients.Table('phonitale-user-responses', client=self.client)
+
+    def test_update_item_serializes_python_values(self):
+        self.stubber.add_response('update_item', {'Attributes': {'round_number': {'N': '1'}}}, {
+            'TableName': 'phonitale-user-responses',
+            'Key': {'user': {'S': 'u#1'}, 'english_word': {'S': 'canny'}},
+            'UpdateExpression': 'SET #rn = if_not_exists(#rn, :rn)',
+            'ExpressionAttributeNames': {'#rn': 'round_number'},
+            'ExpressionAttributeValues': {':rn': {'N': '1'}},
+            'ReturnValues': 'ALL_NEW',
+        })
+        result = self.table.update_item(
+            Key={'user': 'u#1', 'english_word': 'canny'},
+            UpdateExpression='SET #rn = if_not_exists(#rn, :rn)',
+            ExpressionAttributeNames={'#rn': 'round_number'},
+            ExpressionAttributeValues={':rn': 1},
+            ReturnValues='ALL_NEW')
+        self.assertEqual(result['Attributes'], {'round_number': Decimal(1)})
+
+    def test_get_item_deserializes_item(self):
+        self.stubber.add_response('get_item', {'Item': {'email': {'S': 'a@b.c'}, 'consent_agreed': {'BOOL': True}}},
+                                  {'TableName': 'phonitale-user-responses', 'Key': {'email': {'S': 'a@b.c'}}})
+        item = self.table.get_item(Key={'email': 'a@b.c'})['Item']
+        self.assertEqual(item, {'email': 'a@b.c', 'consent_agreed': True})
+
+    def test_rejects_floats_like_resource(self):
+        with self.assertRaises(TypeError):
+            self.table.put_item(Item={'user': 'u', 'duration': 1.5})
+
+
+class TestLazySetup(unittest.TestCase):
+
+    @mock.patch.dict(os.environ)
+    def test_sqs_retries_in_botocore_while_dynamodb_does_not(self):
+        os.environ.pop('DDB_MAX_ATTEMPTS', None)
+        os.environ.pop('SQS_MAX_ATTEMPTS', None)
+        aws_clients.reset()
+        self.addCleanup(aws_clients.reset)
+        # total_max_attempts 는 첫 시도 포함 (max_attempts 는 재시도 횟수라 1 이면 2번 시도)
+        self.assertEqual(aws_clients.dynamodb_client().meta.config.retries['total_max_attempts'], 1)
+        self.assertEqual(aws_clients.sqs_client().meta.config.retries, {'mode': 'standard', 'total_max_attempts': 3})
+
+    @mock.patch.dict(os.environ)
+    def test_offline_tools_retry_in_botocore(self):
+        os.environ.pop('DDB_CLI_MAX_ATTEMPTS', None)
+        aws_clients.reset()
+        self.addCleanup(aws_clients.reset)
+        table = aws_clients.cli_table('phonitale-user-responses')
+        self.assertIsNot(table.client, aws_clients.dynamodb_client())
+        self.assertEqual(table.client.meta.config.retries['total_max_attempts'], 10)
+        self.assertEqual(table.client.meta.config.retries['mode'], 'standard')
+
+    def test_lazy_table_defers_client_creation(self):
+        aws_clients.reset()
+        table = aws_clients.LazyTable('phonitale-user-consent')
+        self.assertIsNone(aws_clients._client)
+        self.assertEqual(table.name, 'phonitale-user-consent')
+        self.assertIsNone(aws_clients._client)
+
+        table.client  # 첫 속성 접근 시 생성
+        self.assertIsNotNone(aws_clients._client)
+        self.assertIs(aws_clients.dynamodb_client(), aws_clients._client)
+        self.assertIn('create_client_ms', aws_clients.init_timings())
+
+    def test_client_is_tuned(self):
+        aws_clients.reset()
+        config = aws_clients.dynamodb_client().meta.config
+        self.assertTrue(config.tcp_keepalive)
+        self.assertEqual(config.max_pool_connections, 10)
+        self.assertEqual(config.retries['mode'], 'standard')
+
+    def test_handler_import_does_not_load_botocore(self):
+        # 새 인터프리터에서 확인 (이 프로세스는 이미 botocore 를 불러왔음)
+        backend = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+        out = subprocess.run(
+            [sys.executable, '-c', "import sys, lambda_function; print('botocore' in sys.modules)"],
+            cwd=backend, capture_output=True, text=True, check=True).stdout
+        self.assertEqual(out.strip(), 'False')
+
+
+if __name__ == '__main__':
+    unittest.main()
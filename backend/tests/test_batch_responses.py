@@ -0,0 +1,128 @@
+import json
+import unittest
+from unittest import mock
+
+import lambda_function
+
+
+class RecordingTable:
+    """update_item 호출만 기록하는 간단한 테이블 대역"""
+
+    def __init__(self, fail_words=()):
+        self.calls = []
+        self.fail_words = set(fail_words)
+
+    def update_item(self, **kwargs):
+        if kwargs['Key']['SK'].split('#', 1)[1] in self.fail_words:
+            raise RuntimeError("simulated DynamoDB failure")
+        self.calls.append(kwargs)
+        return {}
+
+
+def batch_event(items):
+    return {
+        'httpMethod': 'POST',
+        'path': '/dev/responses/batch',
+        'body': json.dumps({'items': items}),
+    }
+
+
+def record(word, page_type, **extra):
+    data = {
+        'user': '권수영#0101',
+        'english_word': word,
+        'round_number': 1,
+        'page_type': page_type,
+        'timestamp_in': '2025-04-20T10:00:00.000Z',
+        'timestamp_out': '2025-04-20T10:00:12.000Z',
+        'duration': 12,
+    }
+    data.update(extra)
+    return data
+
+
+class TestResponseBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.table = RecordingTable()
+        patcher = mock.patch.object(lambda_function, 'table_responses', self.table)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def invoke(self, items):
+        result = lambda_function.lambda_handler(batch_event(items), None)
+        return result['statusCode'], json.loads(result['body'])
+
+    def test_merges_records_per_user_and_word(self):
+        status, body = self.invoke([
+            record('canny', 'learning'),
+            record('canny', 'recognition', response='영리한'),
+            record('felon', 'learning'),
+            record('canny', 'generation', response='canny'),
+        ])
+
+        self.assertEqual(status, 200)
+        self.assertEqual(body['succeeded'], 4)
+        self.assertEqual(body['written'], 2)
+        self.assertEqual(len(self.table.calls), 2)
+
+        canny = self.table.calls[0]
+        self.assertEqual(canny['Key'], {'PK': 'USER#권수영#0101', 'SK': 'WORD#canny'})
+        values = canny['ExpressionAttributeValues']
+        self.assertEqual(values[':response_recognition'], '영리한')
+        self.assertEqual(values[':response_generation'], 'canny')
+        self.assertEqual(values[':duration_learning'], 12)
+        self.assertIn('#round_number = if_not_exists(#round_number, :round_number)', canny['UpdateExpression'])
+
+    def test_later_records_win_and_round_keeps_first(self):
+        self.invoke([
+            record('canny', 'recognition', response='first', round_number=1),
+            record('canny', 'recognition', response='second', round_number=2),
+        ])
+        values = self.table.calls[0]['ExpressionAttributeValues']
+        self.assertEqual(values[':response_recognition'], 'second')
+        self.assertEqual(values[':round_number'], 1)
+        self.assertEqual(values[':GSI1SK'], 'ROUND#001#WORD#canny')
+
+    def test_reports_per_item_failures(self):
+        self.table.fail_words = {'felon'}
+        status, body = self.invoke([
+            record('canny', 'learning'),
+            {'english_word': 'mayhem', 'page_type': 'learning'},
+            record('felon', 'learning'),
+            record('felon', 'survey', usefulness=5, coherence=4),
+        ])
+
+        self.assertEqual(status, 207)
+        self.assertEqual(body['failed'], 3)
+        statuses = [result['status'] for result in body['results']]
+        self.assertEqual(statuses, ['ok', 'error', 'error', 'error'])
+        self.assertIn('user', body['results'][1]['error'])
+        self.assertTrue(body['results'][2]['retryable'])
+
+    def test_rejects_final_summary_items(self):
+        status, body = self.invoke([{'page_type': 'final_summary', 'email': 'a@b.c', 'name': 'x'}])
+        self.assertEqual(status, 207)
+        self.assertIn('final_summary', body['results'][0]['error'])
+        self.assertEqual(self.table.calls, [])
+
+    def test_rejects_empty_batch(self):
+        status, body = self.invoke([])
+        self.assertEqual(status, 400)
+        self.assertIn('items', body['error'])
+
+    def test_single_route_still_writes_one_item(self):
+        event = {
+            'httpMethod': 'POST',
+            'path': '/dev/responses',
+            'body': json.dumps(record('canny', 'recognition', response='영리한')),
+        }
+        result = lambda_function.lambda_handler(event, None)
+        self.assertEqual(result['statusCode'], 200)
+        self.assertEqual(len(self.table.calls), 1)
+        self.assertEqual(self.table.calls[0]['ExpressionAttributeNames']['#response_recognition'],
+                         'response_recognition')
+
+
+if __name__ == '__main__':
+    unittest.main()
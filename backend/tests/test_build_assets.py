@@ -0,0 +1,150 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import build_assets
+import lambda_function
+import words
+
+HEADER = 'word,round,meaning,audio_path,kss_keyword_refined,kss_verbal_cue\n'
+CLIPS = {
+    'audio/ca/canny_en_us_1.mp3': b'ID3canny',
+    'audio/me/meddlesome_en_us_1.mp3': b'ID3meddlesome-longer',
+    'audio/ab/abide_en_us_1.mp3': b'ID3abide',
+}
+ROWS = [
+    'canny,1,영리한,audio/ca/canny_en_us_1.mp3,,',
+    'meddlesome,1,참견하기를 좋아하는,audio/me/meddlesome_en_us_1.mp3,,',
+    'abide,2,견디다,audio/ab/abide_en_us_1.mp3,,',
+]
+
+
+def get_words(params=None):
+    return lambda_function.lambda_handler(
+        {'httpMethod': 'GET', 'path': '/dev/words', 'queryStringParameters': params, 'headers': {}}, None)
+
+
+class PublicDirFixture:
+    """임시 public/ (오디오 3개 + 단어 CSV)"""
+
+    def setUp(self):
+        self.public = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.public)
+        for path, data in CLIPS.items():
+            self.write(path, data)
+        self.csv = os.path.join(self.public, 'words', 'words.csv')
+        self.write('words/words.csv', (HEADER + '\n'.join(ROWS) + '\n').encode('utf-8'))
+        self.out = os.path.join(self.public, build_assets.BUNDLE_DIR)
+
+    def write(self, path, data):
+        full = os.path.join(self.public, *path.split('/'))
+        os.makedirs(os.path.dirname(full), exist_ok=True)
+        with open(full, 'wb') as f:
+            f.write(data)
+
+    def read(self, path):
+        with open(os.path.join(self.public, *path.split('/')), 'rb') as f:
+            return f.read()
+
+    def build(self):
+        return build_assets.build(self.csv, self.public)
+
+
+class TestBuildAssets(PublicDirFixture, unittest.TestCase):
+
+    def test_repository_word_file_is_valid(self):
+        manifest = build_assets.build(write=False)
+        self.assertEqual(len(manifest['audio']), 45)
+        self.assertEqual({r: e['words'] for r, e in manifest['rounds'].items()}, {'1': 12, '2': 12, '3': 12})
+
+    def test_every_missing_or_invalid_path_is_reported(self):
+        rows = ROWS + ['gone,2,없음,audio/go/gone.mp3,,', 'escape,3,탈출,../secret.mp3,,', 'blank,3,빈칸,,,']
+        self.write('words/words.csv', (HEADER + '\n'.join(rows) + '\n').encode('utf-8'))
+        with self.assertRaises(build_assets.AssetError) as raised:
+            self.build()
+        self.assertEqual(len(raised.exception.problems), 3)
+        self.assertIn('audio/go/gone.mp3 not found', raised.exception.problems[0])
+        self.assertFalse(os.path.exists(self.out))
+
+    def test_clips_are_hashed_and_bundled_per_round(self):
+        manifest = self.build()
+        hashed = manifest['audio']['audio/ca/canny_en_us_1.mp3']
+        self.assertRegex(hashed, r'^bundles/audio/ca/canny_en_us_1\.[0-9a-f]{12}\.mp3$')
+        self.assertEqual(self.read(hashed), CLIPS['audio/ca/canny_en_us_1.mp3'])
+
+        entry = manifest['rounds']['1']
+        bundle = json.loads(self.read(entry['bundle']))
+        pack = self.read(entry['pack'])
+        self.assertEqual([w['word'] for w in bundle['words']], ['canny', 'meddlesome'])
+        self.assertEqual(bundle['pack'], entry['pack'])
+        for word in bundle['words']:
+            offset, length = bundle['audio'][word['audio_path']]
+            original = next(src for src, dst in manifest['audio'].items() if dst == word['audio_path'])
+            self.assertEqual(pack[offset:offset + length], CLIPS[original])
+        self.assertEqual(manifest['rounds']['3']['words'], 0)
+
+    def test_rebuild_is_stable_and_drops_stale_files(self):
+        first = self.build()
+        self.assertEqual(self.build(), first)
+
+        self.write('audio/ab/abide_en_us_1.mp3', b'ID3abide-rerecorded')
+        second = self.build()
+        self.assertNotEqual(second['version'], first['version'])
+        self.assertEqual(second['words_version'], first['words_version'])
+        self.assertEqual(second['rounds']['1'], first['rounds']['1'])
+        self.assertFalse(os.path.exists(os.path.join(self.public, first['rounds']['2']['pack'])))
+        self.assertFalse(os.path.exists(os.path.join(self.public, first['audio']['audio/ab/abide_en_us_1.mp3'])))
+
+    def test_refuses_to_write_into_a_foreign_directory(self):
+        self.write('bundles/notes.txt', b'keep me')
+        with self.assertRaises(ValueError):
+            self.build()
+        self.assertEqual(self.read('bundles/notes.txt'), b'keep me')
+
+
+class TestManifestDrivesWords(PublicDirFixture, unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        words.invalidate()
+        self.addCleanup(words.invalidate)
+        manifest_path = os.path.join(self.out, build_assets.MANIFEST_NAME)
+        patcher = mock.patch.dict(os.environ, {'WORDS_CSV_PATH': self.csv, 'ASSETS_MANIFEST_PATH': manifest_path})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_words_use_manifest_version_and_hashed_audio(self):
+        plain = json.loads(get_words()['body'])
+        self.assertEqual(plain['rounds']['1'][0]['audio_path'], 'audio/ca/canny_en_us_1.mp3')
+        self.assertNotIn('bundles', plain)
+
+        manifest = self.build()
+        result = get_words({'round': '1'})
+        body = json.loads(result['body'])
+        self.assertEqual(result['headers']['X-Words-Version'], manifest['version'])
+        self.assertEqual(body['rounds']['1'][0]['audio_path'], manifest['audio']['audio/ca/canny_en_us_1.mp3'])
+        self.assertEqual(body['bundles'], {'1': {'bundle': manifest['rounds']['1']['bundle'],
+                                                 'pack': manifest['rounds']['1']['pack']}})
+
+    def test_asset_change_invalidates_the_word_cache(self):
+        self.build()
+        first = get_words()['headers']['ETag']
+        self.write('audio/ca/canny_en_us_1.mp3', b'ID3canny-v2')
+        manifest = self.build()
+        second = get_words()
+        self.assertNotEqual(second['headers']['ETag'], first)
+        self.assertEqual(json.loads(second['body'])['version'], manifest['version'])
+
+    def test_manifest_of_another_word_file_is_ignored(self):
+        self.build()
+        self.write('words/words.csv', (HEADER + '\n'.join(ROWS[:2]) + '\n').encode('utf-8'))
+        body = json.loads(get_words()['body'])
+        self.assertEqual(body['version'], words.content_version(self.read('words/words.csv')))
+        self.assertEqual(body['rounds']['1'][0]['audio_path'], 'audio/ca/canny_en_us_1.mp3')
+
+
+if __name__ == '__main__':
+    unittest.main()
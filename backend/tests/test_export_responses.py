@@ -0,0 +1,124 @@
+import csv
+import glob
+import os
+import tempfile
+import unittest
+
+import export_responses
+import item_codec
+from local_dynamodb import LocalDynamoDB
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow 는 선택 의존성
+    pq = None
+
+USERS = 2500
+WORDS_PER_USER = 40  # 2500 x 40 = 100,000 items
+
+
+def user_id(u):
+    return f'참가자{u:04d}#010{u:08d}'
+
+
+def fill(db, compact_every=0):
+    responses = db.Table('phonitale-user-responses')
+    consent = db.Table('phonitale-user-consent')
+    for u in range(USERS):
+        user = user_id(u)
+        consent.put_item(Item={
+            'email': f'p{u:04d}@example.com', 'name': f'참가자{u:04d}', 'phone': f'010{u:08d}',
+            'consent_agreed': True, 'consent_agreed_date': '2025-05-01T09:00:00.000Z',
+            'test_end': '2025-05-01T10:00:00.000Z', 'total_duration': 3600,
+        })
+        for w in range(WORDS_PER_USER):
+            word = f'word{w:02d}'
+            round_number = w % 3 + 1
+            attrs = {
+                'user': user, 'english_word': word, 'round_number': round_number,
+                'timestamp_recognition_in': '2025-05-01T09:10:00.000Z',
+                'timestamp_recognition_out': '2025-05-01T09:10:05.250Z',
+                'duration_recognition': '5.25',
+                'response_recognition': '뜻',
+            }
+            item = {'PK': f'USER#{user}', 'SK': f'WORD#{word}',
+                    'GSI1SK': f'ROUND#{round_number:03d}#WORD#{word}'}
+            if compact_every and w % compact_every == 0:
+                item.update(item_codec.encode_attrs(attrs))
+                item[item_codec.SCHEMA_ATTR] = item_codec.COMPACT_VERSION
+            else:
+                item.update(attrs)
+            responses.put_item(Item=item)
+    return responses, consent
+
+
+class TestExportResponses(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.db = LocalDynamoDB()
+        cls.responses, cls.consent = fill(cls.db, compact_every=4)
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def read_csv(self, paths):
+        rows = []
+        for path in paths:
+            with open(path, encoding='utf-8', newline='') as f:
+                rows.extend(csv.DictReader(f))
+        return rows
+
+    def test_parallel_scan_covers_every_item_exactly_once(self):
+        keys = [(item['PK'], item['SK'])
+                for page in export_responses.parallel_scan(self.responses, total_segments=8, page_size=1000)
+                for item in page]
+        self.assertEqual(len(keys), USERS * WORDS_PER_USER)
+        self.assertEqual(len(set(keys)), len(keys))
+
+    def test_csv_export_is_chunked_typed_and_joined(self):
+        paths = export_responses.export(self.responses, self.consent, self.tmp.name,
+                                        total_segments=4, page_size=2000, chunk_rows=30000)
+        self.assertEqual(len(paths), 4)
+        self.assertEqual(sorted(paths), sorted(glob.glob(os.path.join(self.tmp.name, '*.csv'))))
+        rows = self.read_csv(paths)
+        self.assertEqual(len(rows), USERS * WORDS_PER_USER)
+
+        row = next(r for r in rows if r['user'] == user_id(7) and r['english_word'] == 'word04')
+        self.assertEqual(row['round_number'], '2')
+        self.assertEqual(row['recognition_in_ms'], '1746090600000')
+        self.assertEqual(row['recognition_out_ms'], '1746090605250')
+        self.assertEqual(row['recognition_duration_s'], '5.25')
+        self.assertEqual(row['response_recognition'], '뜻')
+        self.assertEqual(row['learning_in_ms'], '')
+        self.assertEqual(row['email'], 'p0007@example.com')
+        self.assertEqual(row['total_duration_s'], '3600.0')
+
+    def test_compact_and_standard_items_export_identically(self):
+        standard = export_responses.item_to_row(self.responses.items[(f'USER#{user_id(3)}', 'WORD#word01')])
+        compact = export_responses.item_to_row(self.responses.items[(f'USER#{user_id(3)}', 'WORD#word00')])
+        self.assertNotIn('user', self.responses.items[(f'USER#{user_id(3)}', 'WORD#word00')])
+        for column in ('user', 'recognition_in_ms', 'recognition_out_ms', 'recognition_duration_s'):
+            self.assertEqual(compact[column], standard[column])
+        self.assertEqual(compact['round_number'], 1)
+
+    def test_single_user_export_uses_index_query(self):
+        paths = export_responses.export(self.responses, self.consent, self.tmp.name, user=user_id(11))
+        rows = self.read_csv(paths)
+        self.assertEqual(len(rows), WORDS_PER_USER)
+        self.assertEqual({r['user'] for r in rows}, {user_id(11)})
+
+    @unittest.skipUnless(pq, 'pyarrow not installed')
+    def test_parquet_export(self):
+        paths = export_responses.export(self.responses, self.consent, self.tmp.name, fmt='parquet',
+                                        total_segments=4, page_size=5000, chunk_rows=25000)
+        self.assertEqual(len(paths), 1)
+        parquet = pq.ParquetFile(paths[0])
+        self.assertEqual(parquet.metadata.num_rows, USERS * WORDS_PER_USER)
+        self.assertEqual(parquet.metadata.num_row_groups, 4)
+        self.assertEqual(str(parquet.schema_arrow.field('recognition_in_ms').type), 'int64')
+
+
+if __name__ == '__main__':
+    unittest.main()
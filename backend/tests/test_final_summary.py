@@ -0,0 +1,63 @@
+import json
+import unittest
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import lambda_function
+from handler_case import CountingTable, HandlerTestCase
+
+
+class TestFinalSummary(HandlerTestCase):
+
+    def setUp(self):
+        super().setUp()
+        lambda_function.table_consent = self.counter = CountingTable(self.consent)
+
+    def post(self, path, body):
+        result = self.call('POST', path, body)
+        return result['statusCode'], json.loads(result['body'])
+
+    def summary(self, end):
+        return self.post('/dev/responses', {'email': 'a@b.c', 'name': '권수영', 'page_type': 'final_summary',
+                                            'test_end_timestamp': end})
+
+    def test_single_conditional_write(self):
+        self.post('/dev/consent', {'name': '권수영', 'phone': '010', 'email': 'a@b.c', 'consent_agreed': True})
+        item = self.consent.get_item(Key={'email': 'a@b.c', 'name': '권수영'})['Item']
+        self.assertIn('consent_epoch', item)
+        self.counter.calls.clear()
+
+        end = datetime.fromisoformat(item['consent_agreed_date']) + timedelta(minutes=42, seconds=10)
+        status, body = self.summary(end.isoformat().replace('+00:00', 'Z'))
+
+        self.assertEqual(status, 200, body)
+        self.assertEqual(self.counter.calls, ['update_item'])
+        item = self.consent.get_item(Key={'email': 'a@b.c', 'name': '권수영'})['Item']
+        self.assertLessEqual(abs(item['total_duration'] - 2530), 1)
+        self.assertEqual(item['test_end'], end.isoformat().replace('+00:00', 'Z'))
+
+    def test_legacy_consent_record_falls_back_to_read(self):
+        self.consent.put_item(Item={'email': 'a@b.c', 'name': '권수영', 'phone': '010',
+                                    'consent_agreed': True,
+                                    'consent_agreed_date': '2025-04-20T09:00:00.500000+00:00'})
+        status, _ = self.summary('2025-04-20T09:30:00.000Z')
+
+        self.assertEqual(status, 200)
+        self.assertEqual(self.counter.calls, ['update_item', 'get_item', 'update_item'])
+        item = self.consent.get_item(Key={'email': 'a@b.c', 'name': '권수영'})['Item']
+        self.assertEqual(item['total_duration'], Decimal(1800))
+
+    def test_missing_consent_is_rejected(self):
+        status, body = self.summary('2025-04-20T09:30:00.000Z')
+        self.assertEqual(status, 400)
+        self.assertIn('Consent record not found', body['error'])
+        self.assertEqual(self.consent.items, {})
+
+    def test_unparseable_end_timestamp_is_rejected_without_writing(self):
+        status, _ = self.summary('not-a-date')
+        self.assertEqual(status, 400)
+        self.assertEqual(self.counter.calls, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,139 @@
+import csv
+import os
+import random
+import tempfile
+import unittest
+from unittest import mock
+
+import export_responses
+import grading
+from handler_case import HandlerTestCase
+from benchmarks import grading_bench
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow 는 선택 의존성
+    pq = None
+
+WORDS = [
+    {'word': 'canny', 'meaning': '약삭빠른, 영리한'},
+    {'word': 'renovate', 'meaning': '(방, 건물 등을) 새로 꾸미다, 쇄신하다'},
+    {'word': 'anachronism', 'meaning': '시대착오, 시대착오적인 사람(관습/생각)'},
+]
+
+
+def row(word, recognition=None, generation=None):
+    data = dict.fromkeys(export_responses.COLUMN_NAMES)
+    data.update({'user': '권수영#0101', 'english_word': word, 'round_number': 1,
+                 'response_recognition': recognition, 'response_generation': generation})
+    return data
+
+
+class TestAnswerIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = grading.AnswerIndex(WORDS)
+
+    def test_meaning_variants_split_outside_parentheses(self):
+        self.assertEqual(grading.meaning_variants('(방, 건물 등을) 새로 꾸미다, 쇄신하다'),
+                         {'방건물등을새로꾸미다', '새로꾸미다', '쇄신하다'})
+        self.assertIn('시대착오적인사람', grading.meaning_variants(WORDS[2]['meaning']))
+
+    def test_recognition_ignores_spacing_and_punctuation(self):
+        for answer in ('영리한', ' 영리 한!', '약삭빠른.', '새로 꾸미다'):
+            expected = answer != '새로 꾸미다'
+            self.assertIs(self.index.grade('recognition', 'canny', answer), expected, answer)
+        self.assertTrue(self.index.grade('recognition', 'renovate', '새로  꾸미다'))
+        self.assertFalse(self.index.grade('recognition', 'canny', ''))
+
+    def test_generation_is_case_insensitive(self):
+        self.assertTrue(self.index.grade('generation', 'canny', ' Canny'))
+        self.assertTrue(self.index.grade('generation', 'canny', 'ＣＡＮＮＹ'))
+        self.assertFalse(self.index.grade('generation', 'canny', 'can'))
+
+    def test_unanswered_and_unknown_words_are_not_graded(self):
+        self.assertIsNone(self.index.grade('recognition', 'canny', 'N/A'))
+        self.assertIsNone(self.index.grade('recognition', 'canny', None))
+        self.assertIsNone(self.index.grade('generation', 'unknown', 'unknown'))
+        self.assertIsNone(self.index.grade('learning', 'canny', 'canny'))
+
+    def test_batch_matches_single_grading(self):
+        rng = random.Random(1)
+        answers = ['영리한', '약삭 빠른', '모름', '', 'N/A', None, 'canny', 'CANNY', '쇄신하다']
+        words = [rng.choice(['canny', 'renovate', 'unknown']) for _ in range(500)]
+        responses = [rng.choice(answers) for _ in range(500)]
+        for page_type in grading.GRADED_PAGE_TYPES:
+            self.assertEqual(self.index.grade_batch(page_type, words, responses),
+                             [self.index.grade(page_type, w, r) for w, r in zip(words, responses)])
+
+    def test_bulk_grading_normalizes_each_distinct_response_once(self):
+        # 처리 시간은 benchmarks/grading_bench.py
+        report = grading_bench.run(responses=20000)
+        # 서로 다른 응답은 '모름', '', '답0'-'답50' 의 53개 뿐
+        for variant in ('grade', 'grade_batch'):
+            self.assertEqual(report[variant]['normalize_calls'], 53, variant)
+
+
+class TestInlineGrading(HandlerTestCase):
+
+    def post(self, page_type, response):
+        body = {'user': '권수영#0101', 'english_word': 'canny', 'round_number': 1, 'page_type': page_type,
+                'timestamp_in': '2025-04-20T10:00:00.000Z', 'timestamp_out': '2025-04-20T10:00:12.000Z',
+                'duration': 12, 'response': response}
+        result = self.call('POST', '/dev/responses', body)
+        self.assertEqual(result['statusCode'], 200)
+        return self.responses.items[('USER#권수영#0101', 'WORD#canny')]
+
+    def test_responses_are_graded_when_written(self):
+        self.post('recognition', '영리한')
+        item = self.post('generation', 'cany')
+        self.assertIs(item['correct_recognition'], True)
+        self.assertIs(item['correct_generation'], False)
+
+    def test_missing_response_is_not_graded(self):
+        item = self.post('recognition', None)
+        self.assertEqual(item['response_recognition'], 'N/A')
+        self.assertNotIn('correct_recognition', item)
+
+    def test_compact_items_store_short_codes(self):
+        with mock.patch.dict(os.environ, {'RESPONSE_ITEM_FORMAT': 'compact'}):
+            item = self.post('recognition', '약삭빠른')
+        self.assertIs(item['rc'], True)
+
+    def test_missing_word_file_skips_grading(self):
+        with mock.patch.dict(os.environ, {'WORDS_CSV_PATH': '/nonexistent/words.csv'}):
+            item = self.post('recognition', '영리한')
+        self.assertNotIn('correct_recognition', item)
+
+
+class TestRegradeExport(unittest.TestCase):
+
+    def setUp(self):
+        self.index = grading.AnswerIndex(WORDS)
+        self.rows = [row('canny', '영리한', 'Canny'), row('renovate', '모름', None), row('unknown', 'x', 'y')]
+
+    def test_csv_export_is_regraded_in_place(self):
+        with tempfile.TemporaryDirectory() as out:
+            export_responses.write_csv_chunks([self.rows[:2], self.rows[2:]], out)
+            counts = grading.regrade_export(out, self.index)
+            self.assertEqual(sorted(counts.values()), [1, 2])
+            graded = []
+            for path in sorted(counts):
+                with open(path, newline='', encoding='utf-8') as f:
+                    graded += list(csv.DictReader(f))
+        self.assertEqual([(r['correct_recognition'], r['correct_generation']) for r in graded],
+                         [('True', 'True'), ('False', ''), ('', '')])
+
+    @unittest.skipUnless(pq, 'pyarrow not installed')
+    def test_parquet_export_is_regraded_in_place(self):
+        with tempfile.TemporaryDirectory() as out:
+            export_responses.write_parquet([self.rows], out)
+            grading.regrade_export(out, self.index)
+            table = pq.read_table(os.path.join(out, 'responses.parquet'))
+        self.assertEqual(table.column_names, export_responses.COLUMN_NAMES)
+        self.assertEqual(table.column('correct_recognition').to_pylist(), [True, False, None])
+        self.assertEqual(table.column('correct_generation').to_pylist(), [True, None, None])
+
+
+if __name__ == '__main__':
+    unittest.main()
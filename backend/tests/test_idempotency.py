@@ -0,0 +1,110 @@
+import unittest
+from unittest import mock
+
+import idempotency
+import lambda_function
+from benchmarks import sessions
+from handler_case import CountingTable, HandlerTestCase
+
+USER = '권수영#01012345678'
+RESPONSE = {'user': USER, 'english_word': 'abandon', 'round_number': 1, 'page_type': 'recognition',
+            'timestamp_in': '2025-05-01T09:00:00.000Z', 'timestamp_out': '2025-05-01T09:00:04.000Z',
+            'duration': 4, 'response': '버리다'}
+
+
+class TestIdempotency(HandlerTestCase):
+
+    def setUp(self):
+        super().setUp()
+        lambda_function.table_responses = self.counter = CountingTable(self.responses)
+
+    def post(self, body, key=None, path='/dev/responses'):
+        headers = {'Content-Type': 'application/json'}
+        if key:
+            headers['Idempotency-Key'] = key
+        return self.call('POST', path, body, headers=headers)
+
+    def stored(self):
+        return self.responses.get_item(Key={'PK': f'USER#{USER}', 'SK': 'WORD#abandon'})['Item']
+
+    def test_retry_with_same_key_does_not_write_again(self):
+        first = self.post(RESPONSE, key='k1')
+        self.assertEqual(first['statusCode'], 200)
+        self.assertEqual(self.counter.calls, ['put_item', 'update_item', 'put_item'])
+
+        self.counter.calls.clear()
+        retry = dict(RESPONSE, timestamp_out='2025-05-01T09:00:09.000Z', duration=9)
+        second = self.post(retry, key='k1')
+        self.assertEqual(second['statusCode'], 200)
+        self.assertEqual(second['body'], first['body'])
+        self.assertEqual(second['headers']['Idempotency-Replayed'], 'true')
+        # 웜 컨테이너 LRU 에서 응답 - DynamoDB 호출 없음
+        self.assertEqual(self.counter.calls, [])
+        self.assertEqual(self.stored()['timestamp_recognition_out'], '2025-05-01T09:00:04.000Z')
+
+    def test_same_word_in_a_new_session_is_written(self):
+        # api.js 키: 세션 id | user | round | word | page_type
+        self.assertEqual(self.post(RESPONSE, key=sessions.idempotency_key(RESPONSE, 's1'))['statusCode'], 200)
+
+        redo = dict(RESPONSE, timestamp_out='2025-05-01T10:00:09.000Z', duration=9, response='포기하다')
+        self.counter.calls.clear()
+        second = self.post(redo, key=sessions.idempotency_key(redo, 's2'))
+        self.assertEqual(second['statusCode'], 200)
+        self.assertNotIn('Idempotency-Replayed', second['headers'])
+        self.assertIn('update_item', self.counter.calls)
+        self.assertEqual(self.stored()['response_recognition'], '포기하다')
+
+    def test_cold_container_replays_from_marker(self):
+        first = self.post(RESPONSE, key='k1')
+        idempotency.clear_cache()
+        self.counter.calls.clear()
+
+        second = self.post(dict(RESPONSE, duration=9), key='k1')
+        self.assertEqual(second['body'], first['body'])
+        self.assertEqual(self.counter.calls, ['put_item', 'get_item'])
+        self.assertEqual(self.stored()['duration_recognition'], 4)
+
+    def test_marker_does_not_store_raw_key(self):
+        self.post(RESPONSE, key=f'{USER}|1|abandon|recognition')
+        markers = [k for k in self.responses.items if k[0].startswith('IDEMP#')]
+        self.assertEqual(len(markers), 1)
+        self.assertNotIn(USER, markers[0][0])
+        item = self.responses.items[markers[0]]
+        self.assertEqual(item['status'], idempotency.COMPLETE)
+        self.assertGreater(item['expires_at'], item.get('lease_until', 0))
+
+    def test_failed_request_releases_key(self):
+        result = self.post({'english_word': 'abandon', 'page_type': 'recognition'}, key='k2')
+        self.assertEqual(result['statusCode'], 400)
+        self.assertFalse([k for k in self.responses.items if k[0].startswith('IDEMP#')])
+        self.assertEqual(self.post(RESPONSE, key='k2')['statusCode'], 200)
+
+    def test_pending_claim_returns_conflict_until_lease_expires(self):
+        now = 1_750_000_000
+        self.assertIsNone(idempotency.claim(self.responses, 'k3', 'fp', now=now))
+        with mock.patch('time.time', return_value=now + 1):
+            result = self.post(RESPONSE, key='k3')
+        self.assertEqual(result['statusCode'], 409)
+        self.assertEqual(result['headers']['Retry-After'], '1')
+        with mock.patch('time.time', return_value=now + idempotency.LEASE_SECONDS + 1):
+            self.assertEqual(self.post(RESPONSE, key='k3')['statusCode'], 200)
+
+    def test_expired_marker_can_be_reclaimed(self):
+        now = 1_750_000_000
+        idempotency.claim(self.responses, 'k4', 'fp', now=now)
+        idempotency.complete(self.responses, 'k4', 'fp', 200, '{}', now=now)
+        later = now + idempotency.TTL_SECONDS + 1
+        self.assertIsNone(idempotency.claim(self.responses, 'k4', 'fp', now=later))
+
+    def test_requests_without_key_are_unchanged(self):
+        self.assertEqual(self.post(RESPONSE)['statusCode'], 200)
+        self.assertEqual(self.counter.calls, ['update_item'])
+
+    def test_overlong_key_is_rejected(self):
+        result = self.post(RESPONSE, key='x' * (idempotency.MAX_KEY_LENGTH + 1))
+        self.assertEqual(result['statusCode'], 400)
+        self.assertEqual(self.counter.calls, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
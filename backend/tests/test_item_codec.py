@@ -0,0 +1,94 @@
+import json
+import os
+import unittest
+from decimal import Decimal
+from unittest import mock
+
+import item_codec
+from handler_case import HandlerTestCase
+from local_dynamodb import LocalTable, item_size
+from benchmarks import item_size_bench
+
+
+class TestCodec(unittest.TestCase):
+
+    def test_round_trip(self):
+        logical = {
+            'round_number': 2,
+            'user': '권수영#010',
+            'english_word': 'canny',
+            'timestamp_recognition_in': '2025-04-20T10:00:00.123Z',
+            'timestamp_recognition_out': '2025-04-20T10:00:07.000Z',
+            'duration_recognition': 7,
+            'response_recognition': '영리한',
+        }
+        encoded = item_codec.encode_attrs(logical)
+        self.assertEqual(encoded['ri'], 1745143200123)
+        self.assertNotIn('user', encoded)
+        stored = {'PK': 'USER#권수영#010', 'SK': 'WORD#canny', 'v': 2,
+                  **{k: Decimal(v) if isinstance(v, int) else v for k, v in encoded.items()}}
+
+        decoded = item_codec.decode_item(stored)
+        for name, value in logical.items():
+            self.assertEqual(decoded[name], value)
+        self.assertNotIn('v', decoded)
+
+    def test_unparseable_timestamp_is_kept_verbatim(self):
+        encoded = item_codec.encode_attrs({'timestamp_learning_in': 'yesterday'})
+        self.assertEqual(encoded, {'li': 'yesterday'})
+        self.assertEqual(item_codec.decode_item({'v': 2, 'li': 'yesterday'})['timestamp_learning_in'], 'yesterday')
+
+    def test_standard_items_pass_through(self):
+        item = {'user': 'u', 'timestamp_learning_in': '2025-04-20T10:00:00+00:00', 'r': 'not a code'}
+        self.assertEqual(item_codec.decode_item(item), item)
+
+
+class TestCompactHandler(HandlerTestCase):
+
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.dict(os.environ, {'RESPONSE_ITEM_FORMAT': 'compact'})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_compact_write_and_logical_read(self):
+        body = {'user': 'u#1', 'english_word': 'canny', 'round_number': 1, 'page_type': 'generation',
+                'timestamp_in': '2025-04-20T10:00:00.000Z', 'timestamp_out': '2025-04-20T10:00:09.500Z',
+                'duration': 10, 'response': 'cany'}
+        self.call('POST', '/responses', body)
+
+        stored = self.responses.items[('USER#u#1', 'WORD#canny')]
+        self.assertEqual(stored['v'], 2)
+        self.assertEqual(stored['go'], 1745143209500)
+        self.assertNotIn('timestamp_generation_out', stored)
+
+        result = self.handle({'httpMethod': 'GET', 'path': '/responses', 'queryStringParameters': {'user': 'u#1'}})
+        (item,) = json.loads(result['body'])['items']
+        self.assertEqual(item['timestamp_generation_out'], '2025-04-20T10:00:09.500Z')
+        self.assertEqual(item['response_generation'], 'cany')
+        self.assertEqual(item['user'], 'u#1')
+        self.assertEqual(item['round_number'], 1)
+
+
+class TestCapacity(unittest.TestCase):
+
+    def test_write_units_follow_item_size(self):
+        table = LocalTable('t', 'PK', 'SK', {'UserRoundIndex': ('PK', 'GSI1SK')})
+        small = table.put_item(Item={'PK': 'a', 'SK': 'b'}, ReturnConsumedCapacity='INDEXES')
+        self.assertEqual(small['ConsumedCapacity']['CapacityUnits'], 1.0)
+        big = table.put_item(Item={'PK': 'a', 'SK': 'b', 'GSI1SK': 'g', 'blob': 'x' * 1500},
+                             ReturnConsumedCapacity='INDEXES')
+        self.assertEqual(big['ConsumedCapacity']['Table']['CapacityUnits'], 2.0)
+        self.assertEqual(big['ConsumedCapacity']['GlobalSecondaryIndexes']['UserRoundIndex']['CapacityUnits'], 2.0)
+
+    def test_item_size_counts_names_and_values(self):
+        self.assertEqual(item_size({'ab': 'xyz', 'n': Decimal(12345)}), 2 + 3 + 1 + 4)
+
+    def test_benchmark_shows_smaller_items(self):
+        report = item_size_bench.run(participants=1)
+        self.assertLess(report['compact']['mean_item_bytes'], report['standard']['mean_item_bytes'] / 2)
+        self.assertEqual(report['compact']['writes'], report['standard']['writes'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import json
+import unittest
+from decimal import Decimal
+
+from botocore.exceptions import ClientError
+
+from handler_case import HandlerTestCase
+from local_dynamodb import LocalTable
+from benchmarks import handler_bench
+from benchmarks.sessions import load_words, session_events
+
+
+class TestLocalTable(unittest.TestCase):
+
+    def setUp(self):
+        self.table = LocalTable('responses', 'user', 'english_word')
+        self.key = {'user': 'u#1', 'english_word': 'canny'}
+
+    def update(self, expression, names, values, **kwargs):
+        return self.table.update_item(Key=self.key, UpdateExpression=expression,
+                                      ExpressionAttributeNames=names,
+                                      ExpressionAttributeValues=values, **kwargs)
+
+    def test_put_and_get_round_trip(self):
+        self.table.put_item(Item={**self.key, 'round_number': 2})
+        item = self.table.get_item(Key=self.key)['Item']
+        self.assertEqual(item['round_number'], Decimal(2))
+        self.assertEqual(self.table.get_item(Key={'user': 'x', 'english_word': 'y'}), {})
+
+    def test_update_creates_item_and_if_not_exists_keeps_first_value(self):
+        expression = "SET #rn = if_not_exists(#rn, :rn), #r = :r"
+        self.update(expression, {'#rn': 'round_number', '#r': 'response_recognition'}, {':rn': 1, ':r': 'a'})
+        self.update(expression, {'#rn': 'round_number', '#r': 'response_recognition'}, {':rn': 3, ':r': 'b'})
+
+        item = self.table.get_item(Key=self.key)['Item']
+        self.assertEqual(item['round_number'], 1)
+        self.assertEqual(item['response_recognition'], 'b')
+        self.assertEqual(item['user'], 'u#1')
+
+    def test_arithmetic_uses_pre_update_values(self):
+        self.table.put_item(Item={**self.key, 'start': 100})
+        result = self.update("SET #d = :end - #s, #s = :zero", {'#d': 'duration', '#s': 'start'},
+                             {':end': 130, ':zero': 0}, ReturnValues='ALL_NEW')
+        self.assertEqual(result['Attributes']['duration'], 30)
+        self.assertEqual(result['Attributes']['start'], 0)
+
+    def test_rejects_floats_like_boto3(self):
+        with self.assertRaises(TypeError):
+            self.update("SET #d = :d", {'#d': 'duration'}, {':d': 1.5})
+
+    def test_undefined_placeholder_is_a_validation_error(self):
+        with self.assertRaises(ClientError) as ctx:
+            self.update("SET #d = :missing", {'#d': 'duration'}, {})
+        self.assertEqual(ctx.exception.response['Error']['Code'], 'ValidationException')
+
+    def test_condition_expression_guards_writes(self):
+        with self.assertRaises(ClientError) as ctx:
+            self.update("SET #d = :d", {'#d': 'duration', '#s': 'start'}, {':d': 1},
+                        ConditionExpression="attribute_exists(#s)")
+        self.assertEqual(ctx.exception.response['Error']['Code'], 'ConditionalCheckFailedException')
+        self.assertEqual(self.table.items, {})
+
+        self.table.put_item(Item={**self.key, 'start': 5}, ConditionExpression="attribute_not_exists(#u)",
+                            ExpressionAttributeNames={'#u': 'user'})
+        with self.assertRaises(ClientError):
+            self.table.put_item(Item={**self.key}, ConditionExpression="attribute_not_exists(#u)",
+                                ExpressionAttributeNames={'#u': 'user'})
+        self.update("SET #d = :d", {'#d': 'duration', '#s': 'start'}, {':d': 1, ':min': 3},
+                    ConditionExpression="attribute_exists(#s) AND (#s >= :min OR NOT #s = :min)")
+        self.assertEqual(self.table.get_item(Key=self.key)['Item']['duration'], 1)
+
+    def test_key_attributes_cannot_be_updated(self):
+        with self.assertRaises(ClientError):
+            self.update("SET #u = :u", {'#u': 'user'}, {':u': 'other'})
+
+
+class TestHandlerOnLocalTables(HandlerTestCase):
+
+    def test_full_session_is_recorded(self):
+        words = load_words()
+        for event in session_events(0, words):
+            result = self.handle(event)
+            self.assertEqual(result['statusCode'], 200, result['body'])
+
+        responses = self.responses.items
+        word_items = [key for key in responses if key[1].startswith('WORD#')]
+        self.assertEqual(len(word_items), len([w for w in words if w['round'] in ('1', '2', '3')]))
+        self.assertEqual(responses[('USER#참가자0000#01000000000', 'SUMMARY')]['status'], 'complete')
+        canny = responses[('USER#참가자0000#01000000000', 'WORD#canny')]
+        self.assertEqual(canny['GSI1SK'], 'ROUND#00%d#WORD#canny' % canny['round_number'])
+        for attr in ('timestamp_learning_in', 'duration_recognition', 'response_generation',
+                     'usefulness', 'coherence', 'timestamp_survey'):
+            self.assertIn(attr, canny)
+
+        consent = self.consent.items[('p0000@example.com', '참가자0000')]
+        self.assertIn('total_duration', consent)
+
+    def test_benchmark_reports_every_page_type(self):
+        report = handler_bench.run(participants=1, allocations=True)
+        page_types = {g['page_type'] for g in report['groups']}
+        self.assertTrue({'learning', 'recognition', 'generation', 'survey', 'final_summary'} <= page_types)
+        for group in report['groups']:
+            self.assertLessEqual(group['p50_ms'], group['p99_ms'])
+            self.assertIsNotNone(group['peak_alloc_kib'])
+        json.dumps(report)
+
+
+if __name__ == '__main__':
+    unittest.main()
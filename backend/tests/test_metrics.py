@@ -0,0 +1,109 @@
+import io
+import json
+import unittest
+
+from handler_case import HandlerTestCase
+from local_dynamodb import LocalDynamoDB
+from metrics import Histogram, InstrumentedTable, Metrics, metrics
+from benchmarks import metrics_bench
+from benchmarks.sessions import load_words, session_events
+
+
+class TestMetrics(unittest.TestCase):
+
+    def test_timer_and_capacity_in_emf_record(self):
+        out = io.StringIO()
+        m = Metrics(namespace='Test', enabled=True, stream=out)
+        m.begin(cold_start=True)
+        m.set_dimension('Route', 'POST /responses')
+        m.set_dimension('PageType', 'survey')
+        with m.timer('parse_ms'):
+            pass
+        m.record_capacity('update_item', {'ConsumedCapacity': {'CapacityUnits': 1.0}})
+        m.record_capacity('update_item', {'ConsumedCapacity': {'CapacityUnits': 2.0}})
+        record = json.loads(out.getvalue()) if m.flush(200) else None
+
+        directive = record['_aws']['CloudWatchMetrics'][0]
+        self.assertEqual(directive['Namespace'], 'Test')
+        self.assertEqual(directive['Dimensions'], [['Route'], ['Route', 'PageType']])
+        units = {d['Name']: d['Unit'] for d in directive['Metrics']}
+        self.assertEqual(units, {'parse_ms': 'Milliseconds', 'ddb_write_units': 'Count',
+                                 'latency_ms': 'Milliseconds'})
+        self.assertEqual(record['ddb_write_units'], 3.0)
+        self.assertEqual(record['Route'], 'POST /responses')
+        self.assertTrue(record['cold_start'])
+        self.assertEqual(m.histogram('ddb_write_units', Route='POST /responses').count, 1)
+
+    def test_disabled_metrics_record_nothing(self):
+        m = Metrics(enabled=False, stream=io.StringIO())
+        m.begin()
+        with m.timer('parse_ms'):
+            pass
+        self.assertIsNone(m.flush(200))
+        self.assertEqual(m.stream.getvalue(), '')
+
+    def test_histogram_percentiles(self):
+        histogram = Histogram()
+        for value in range(1, 101):
+            histogram.record(float(value))
+        self.assertEqual(histogram.count, 100)
+        self.assertAlmostEqual(histogram.mean(), 50.5)
+        self.assertGreaterEqual(histogram.percentile(50), 50)
+        self.assertLess(histogram.percentile(50), 50 * 1.25)
+        self.assertGreaterEqual(histogram.percentile(100), 100)
+
+    def test_instrumented_table_keeps_explicit_capacity_mode(self):
+        m = Metrics(enabled=True, stream=io.StringIO())
+        m.begin()
+        table = InstrumentedTable(LocalDynamoDB().Table('phonitale-user-consent'), m)
+        table.put_item(Item={'email': 'a', 'name': 'b'})
+        response = table.get_item(Key={'email': 'a', 'name': 'b'}, ReturnConsumedCapacity='NONE')
+        self.assertNotIn('ConsumedCapacity', response)
+        self.assertEqual(len(m.values['ddb_put_item_ms']), 1)
+        self.assertEqual(m.values['ddb_write_units'], [1.0])
+        self.assertNotIn('ddb_read_units', m.values)
+
+
+class TestHandlerMetrics(HandlerTestCase):
+
+    def setUp(self):
+        super().setUp()
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+
+    def test_session_metrics_per_route_and_page_type(self):
+        for event in session_events(0, load_words()):
+            self.assertEqual(self.handle(event)['statusCode'], 200)
+
+        recognition = metrics.histogram('latency_ms', Route='POST /responses', PageType='recognition')
+        self.assertEqual(recognition.count, 36)
+        route = metrics.histogram('latency_ms', Route='POST /responses')
+        self.assertEqual(route.count, 36 * 3 + 36 + 1)
+        self.assertEqual(metrics.histogram('ddb_write_units', Route='POST /consent').count, 1)
+        self.assertEqual(metrics.histogram('ddb_update_item_ms', Route='POST /responses',
+                                           PageType='survey').count, 36)
+
+        # EMF 는 요청 요약 라인에 합쳐져 요청당 한 줄
+        lines = [json.loads(line) for line in self.stdout.getvalue().splitlines()]
+        self.assertEqual(len(lines), len(list(session_events(0, load_words()))))
+        last = lines[-1]
+        self.assertEqual(last['PageType'], 'final_summary')
+        self.assertIn('_aws', last)
+        self.assertIn('ddb_update_item_ms', last)
+        self.assertEqual(last['status'], 200)
+
+    def test_unknown_page_type_is_bucketed(self):
+        self.call('POST', '/dev/responses', {'user': 'u#1', 'english_word': 'abandon', 'page_type': 'x' * 40})
+        self.assertEqual(metrics.last_record['PageType'], 'other')
+
+
+class TestMetricsBenchmark(unittest.TestCase):
+
+    def test_reports_overhead(self):
+        report = metrics_bench.run(participants=1, repeat=1)
+        self.assertEqual(report['requests'], len(list(session_events(0, load_words()))))
+        self.assertGreater(report['enabled_us'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import io
+import json
+import unittest
+from unittest import mock
+
+import lambda_function
+import request_log
+from handler_case import HandlerTestCase
+from request_log import Logger, pseudonymize, redact
+from benchmarks import logging_bench
+
+
+def lines(stream):
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+class TestLogger(unittest.TestCase):
+
+    def test_level_filters_and_skips_lazy_fields(self):
+        out = io.StringIO()
+        logger = Logger(level='INFO', sample_rate=0, stream=out)
+        expensive = mock.Mock(return_value='x')
+        logger.debug("hidden", payload=expensive)
+        logger.info("shown", value=lambda: 42)
+
+        expensive.assert_not_called()
+        self.assertEqual(lines(out), [{'level': 'INFO', 'msg': 'shown', 'value': 42}])
+
+    def test_sampled_request_logs_debug_payload(self):
+        out = io.StringIO()
+        logger = Logger(level='INFO', sample_rate=0.5, stream=out, rng=lambda: 0.1)
+        logger.begin_request({'httpMethod': 'POST', 'path': '/dev/responses'})
+        logger.debug_payload("body", {'user': 'a#1', 'email': 'a@b.c', 'english_word': 'canny'})
+        logger.end_request(200)
+
+        debug, summary = lines(out)
+        self.assertEqual(debug['payload'], {'user': pseudonymize('a#1'), 'email': '<redacted>',
+                                            'english_word': 'canny'})
+        self.assertEqual(summary['route'], 'POST /dev/responses')
+
+    def test_unsampled_request_writes_one_summary_line(self):
+        out = io.StringIO()
+        logger = Logger(level='INFO', sample_rate=0.5, stream=out, rng=lambda: 0.9)
+        logger.begin_request({'httpMethod': 'POST', 'path': '/dev/responses'})
+        logger.debug_payload("body", {'user': 'a#1'})
+        logger.annotate(page_type='learning')
+        logger.warn('learning_duration_missing', english_word='canny')
+        logger.end_request(200)
+
+        (summary,) = lines(out)
+        self.assertEqual(summary['level'], 'WARNING')
+        self.assertEqual(summary['page_type'], 'learning')
+        self.assertEqual(summary['warnings'], ['learning_duration_missing'])
+        self.assertIn('duration_ms', summary)
+
+    def test_redact_parses_event_body(self):
+        event = {'body': json.dumps({'name': '권수영', 'phone': '010', 'page_type': 'survey'})}
+        self.assertEqual(redact(event)['body'], {'name': '<redacted>', 'phone': '<redacted>',
+                                                 'page_type': 'survey'})
+
+
+class TestHandlerLogging(HandlerTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.logger = Logger(level='INFO', sample_rate=0)
+        patcher = mock.patch.object(lambda_function, 'log', self.logger)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def invoke(self, path, body):
+        start = self.stdout.tell()
+        self.call('POST', path, body)
+        return self.stdout.getvalue()[start:]
+
+    def test_one_line_per_request_without_pii(self):
+        output = self.invoke('/dev/consent', {'name': '권수영', 'phone': '01012345678',
+                                              'email': 'sy@example.com', 'consent_agreed': True})
+        output += self.invoke('/dev/responses', {'user': '권수영#01012345678', 'english_word': 'canny',
+                                                 'page_type': 'learning', 'round_number': 1})
+        records = [json.loads(line) for line in output.splitlines()]
+
+        self.assertEqual(len(records), 2)
+        self.assertEqual(records[1]['page_type'], 'learning')
+        self.assertIn('learning_duration_missing', records[1]['warnings'])
+        for secret in ('권수영', '01012345678', 'sy@example.com'):
+            self.assertNotIn(secret, output)
+
+    def test_consent_miss_summary_has_no_identifiers(self):
+        output = self.invoke('/dev/responses', {'email': 'sy@example.com', 'name': '권수영',
+                                                'page_type': 'final_summary',
+                                                'test_end_timestamp': '2025-04-20T09:30:00.000Z'})
+        record, = [json.loads(line) for line in output.splitlines()]
+        self.assertEqual(record['status'], 400)
+        self.assertEqual(record['error'], 'invalid_request')
+        for secret in ('권수영', 'sy@example.com'):
+            self.assertNotIn(secret, output)
+
+    def test_module_logger_is_shared(self):
+        self.assertIsInstance(request_log.log, Logger)
+
+
+class TestLoggingBenchmark(unittest.TestCase):
+
+    def test_structured_logging_emits_less(self):
+        report = logging_bench.run(participants=1)
+        self.assertLess(report['structured_info']['bytes_per_request'],
+                        report['legacy_print']['bytes_per_request'])
+
+
+if __name__ == '__main__':
+    unittest.main()
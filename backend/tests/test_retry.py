@@ -0,0 +1,132 @@
+import json
+import unittest
+
+import lambda_function
+import retry
+from handler_case import HandlerTestCase
+from metrics import InstrumentedTable, metrics
+from benchmarks import throttle_bench
+
+RESPONSE = {'user': '권수영#01012345678', 'english_word': 'abandon', 'round_number': 1,
+            'page_type': 'learning', 'timestamp_in': '2025-05-01T09:00:00.000Z',
+            'timestamp_out': '2025-05-01T09:00:04.000Z', 'duration': 4}
+
+
+class FakeContext:
+    def __init__(self, remaining_ms):
+        self.remaining_ms = remaining_ms
+
+    def get_remaining_time_in_millis(self):
+        return self.remaining_ms
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestRetryingHandler(HandlerTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.clock = FakeClock()
+        self.sleeps = []
+        self.retrying = retry.RetryingTable(
+            self.responses, breaker=retry.CircuitBreaker(threshold=4, cooldown_ms=2000, clock=self.clock),
+            max_attempts=5, base_ms=25, max_backoff_ms=1000, sleep=self.sleeps.append, rng=lambda: 1.0)
+        lambda_function.table_responses = InstrumentedTable(self.retrying)
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+
+    def post(self, body=RESPONSE, remaining_ms=6000, path='/dev/responses'):
+        return self.call('POST', path, body, context=FakeContext(remaining_ms))
+
+    def test_throttled_write_is_retried_with_backoff(self):
+        self.responses.inject_faults(count=2, operations=['UpdateItem'])
+        result = self.post()
+        self.assertEqual(result['statusCode'], 200)
+        self.assertEqual(self.responses.injected_faults, 2)
+        # 전체 지터에서 rng=1.0 이면 상한값: 25*2, 25*4 ms
+        self.assertEqual(self.sleeps, [0.05, 0.1])
+        self.assertEqual(metrics.last_record['ddb_retry_count'], 2)
+        self.assertEqual(len(self.responses.items), 1)
+
+    def test_retries_stop_at_remaining_time_budget(self):
+        self.responses.inject_faults(operations=['UpdateItem'])
+        # 남은 시간 300ms - 예약 250ms = 50ms: 첫 backoff(50ms) 가 예산을 넘으므로 바로 503
+        result = self.post(remaining_ms=300)
+        self.assertEqual(result['statusCode'], 503)
+        self.assertEqual(result['headers']['Retry-After'], '1')
+        self.assertEqual(self.sleeps, [])
+        self.assertEqual(self.responses.injected_faults, 1)
+
+    def test_breaker_opens_and_sheds_then_recovers(self):
+        self.responses.inject_faults(operations=['UpdateItem'])
+        first = self.post()
+        self.assertEqual(first['statusCode'], 503)
+        self.assertEqual(self.retrying.breaker.state, 'open')
+        calls = self.responses.injected_faults
+
+        shed = self.post()
+        self.assertEqual(shed['statusCode'], 503)
+        self.assertEqual(shed['headers']['Retry-After'], '2')
+        self.assertEqual(self.responses.injected_faults, calls)  # 테이블까지 가지 않음
+
+        self.responses.clear_faults()
+        self.clock.now += 2.5
+        self.assertEqual(self.retrying.breaker.state, 'half_open')
+        self.assertEqual(self.post()['statusCode'], 200)
+        self.assertEqual(self.retrying.breaker.state, 'closed')
+
+    def test_non_retryable_errors_are_not_retried(self):
+        self.responses.inject_faults(code='ValidationException', operations=['UpdateItem'])
+        result = self.post()
+        self.assertEqual(result['statusCode'], 500)
+        self.assertEqual(self.responses.injected_faults, 1)
+        self.assertEqual(self.sleeps, [])
+        self.assertEqual(self.retrying.breaker.state, 'closed')
+
+    def test_batch_marks_shed_groups_retryable(self):
+        self.responses.inject_faults(operations=['UpdateItem'])
+        result = self.post({'items': [RESPONSE]}, path='/dev/responses/batch')
+        self.assertEqual(result['statusCode'], 207)
+        self.assertTrue(json.loads(result['body'])['results'][0]['retryable'])
+
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    def test_half_open_failure_reopens(self):
+        clock = FakeClock()
+        breaker = retry.CircuitBreaker(threshold=2, cooldown_ms=1000, clock=clock)
+        breaker.record_failure()
+        self.assertTrue(breaker.allow())
+        breaker.record_failure()
+        self.assertFalse(breaker.allow())
+        clock.now += 1.5
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())  # 시험 호출은 한 번만
+        breaker.record_failure()
+        self.assertEqual(breaker.state, 'open')
+
+    def test_backoff_is_capped_full_jitter(self):
+        table = retry.RetryingTable(object(), base_ms=25, max_backoff_ms=1000, rng=lambda: 1.0)
+        self.assertEqual([table.backoff_ms(a) for a in (1, 2, 6, 10)], [50, 100, 1000, 1000])
+        table.rng = lambda: 0.0
+        self.assertEqual(table.backoff_ms(3), 0)
+
+
+class TestThrottleBenchmark(unittest.TestCase):
+
+    def test_retries_recover_throttled_requests(self):
+        report = throttle_bench.run(participants=1, rates=[0.2])
+        self.assertGreater(report['retry@0.2']['ok'], report['no_retry@0.2']['ok'])
+        self.assertEqual(report['retry@0.2']['failed_500'], 0)
+        # queue 모드: 학습/인식/생성/설문 응답은 모두 큐로 (consent / final_summary 만 동기)
+        self.assertEqual(report['queue@0.2']['queued_202'], 36 * 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
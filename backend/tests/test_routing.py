@@ -0,0 +1,66 @@
+import unittest
+
+import lambda_function
+from handler_case import HandlerTestCase
+
+
+class TestRouting(HandlerTestCase):
+
+    def test_routes_ignore_stage_prefix(self):
+        self.assertIs(lambda_function.find_route('POST', '/dev/responses'), lambda_function.handle_response)
+        self.assertIs(lambda_function.find_route('POST', '/prod/responses/batch'),
+                      lambda_function.handle_response_batch_request)
+        self.assertIs(lambda_function.find_route('GET', '/words/'), lambda_function.handle_words)
+        self.assertIsNone(lambda_function.find_route('DELETE', '/dev/responses'))
+
+    def test_preflight_is_answered_without_parsing_body(self):
+        result = self.call('OPTIONS', '/dev/responses', body='{not json')
+        self.assertEqual(result['statusCode'], 204)
+        self.assertIn('Idempotency-Key', result['headers']['Access-Control-Allow-Headers'])
+        self.assertEqual(result['headers']['Access-Control-Max-Age'], '600')
+
+    def test_unknown_route_is_404(self):
+        result = self.call('POST', '/dev/unknown', body={})
+        self.assertEqual(result['statusCode'], 404)
+
+    def test_spec_drives_stored_attributes(self):
+        update = lambda_function.build_response_update({
+            'user': 'u#1', 'english_word': 'abandon', 'round_number': 2, 'page_type': 'generation',
+            'timestamp_in': '2025-04-20T10:00:00.000Z', 'timestamp_out': '2025-04-20T10:00:03.000Z',
+            'duration': 3})
+        self.assertEqual(update['set'], {'timestamp_generation_in': '2025-04-20T10:00:00.000Z',
+                                         'timestamp_generation_out': '2025-04-20T10:00:03.000Z',
+                                         'duration_generation': 3, 'response_generation': 'N/A'})
+        self.assertEqual(update['init']['GSI1SK'], 'ROUND#002#WORD#abandon')
+
+    def test_missing_fields_are_warned_not_stored(self):
+        update = lambda_function.build_response_update({
+            'user': 'u#1', 'english_word': 'abandon', 'page_type': 'learning', 'timestamp_in': ''})
+        self.assertEqual(update['set'], {})
+
+    def test_new_page_type_is_one_spec_line(self):
+        compiled = lambda_function.compile_page_type(
+            'review', lambda_function.phase_fields('review', response=True))
+        self.assertEqual([c[1] for c in compiled], ['timestamp_review_in', 'timestamp_review_out',
+                                                    'duration_review', 'response_review'])
+        self.assertEqual(compiled[0][4], 'review_timestamp_in_missing')
+
+    def test_rendered_expression_reuses_template(self):
+        body = {'user': 'u#1', 'english_word': 'abandon', 'page_type': 'recognition',
+                'timestamp_in': 'a', 'timestamp_out': 'b', 'duration': 1, 'response': 'x'}
+        lambda_function.update_template.cache_clear()
+        first = lambda_function.render_update_expression(lambda_function.build_response_update(body))
+        second = lambda_function.render_update_expression(
+            lambda_function.build_response_update(dict(body, english_word='abide')))
+        self.assertIs(first['UpdateExpression'], second['UpdateExpression'])
+        self.assertEqual(lambda_function.update_template.cache_info().hits, 1)
+        self.assertEqual(second['ExpressionAttributeValues'][':response_recognition'], 'x')
+        self.assertEqual(second['Key'], {'PK': 'USER#u#1', 'SK': 'WORD#abide'})
+
+        self.assertEqual(self.call('POST', '/dev/responses', body)['statusCode'], 200)
+        item = self.responses.get_item(Key={'PK': 'USER#u#1', 'SK': 'WORD#abandon'})['Item']
+        self.assertEqual(item['response_recognition'], 'x')
+
+
+if __name__ == '__main__':
+    unittest.main()
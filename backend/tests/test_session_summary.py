@@ -0,0 +1,157 @@
+import json
+import statistics
+import threading
+import unittest
+from decimal import Decimal
+from unittest import mock
+
+import lambda_function
+import session_summary
+from handler_case import HandlerTestCase
+from benchmarks.sessions import load_words, session_events
+
+USER = '참가자0000#01000000000'
+
+
+class GatedQueryTable:
+    """query 가 gate() 를 통과해야 진행되는 테이블 대역 (동시에 진행 중인 query 수 기록)"""
+
+    def __init__(self, table, gate=None, fail=False):
+        self.table = table
+        self.gate = gate
+        self.fail = fail
+        self.in_flight = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def __getattr__(self, name):
+        return getattr(self.table, name)
+
+    def query(self, **kwargs):
+        with self.lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        try:
+            if self.gate is not None:
+                self.gate()
+            if self.fail:
+                raise RuntimeError('simulated query failure')
+            return self.table.query(**kwargs)
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+
+class TestSessionSummary(HandlerTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.words = load_words()
+        self.events = list(session_events(0, self.words))
+
+    def replay(self, events):
+        return [self.handle(event) for event in events]
+
+    def summary_item(self):
+        return self.responses.items[('USER#' + USER, 'SUMMARY')]
+
+    def test_final_summary_stores_aggregates(self):
+        results = self.replay(self.events)
+        self.assertEqual(json.loads(results[-1]['body'])['summary'], 'complete')
+
+        summary = self.summary_item()
+        self.assertEqual(summary['status'], 'complete')
+        items = [item for key, item in self.responses.items.items() if key[1].startswith('WORD#')]
+        for round_number in ('1', '2', '3'):
+            durations = [float(item['duration_learning']) for item in items
+                         if item['round_number'] == int(round_number)]
+            learning = summary['rounds'][round_number]['learning']
+            self.assertEqual(learning['pages'], 12)
+            self.assertEqual(learning['missing'], 0)
+            self.assertEqual(learning['duration_sum'], Decimal(str(sum(durations))))
+            self.assertEqual(learning['duration_median'], Decimal(str(statistics.median(durations))))
+        self.assertEqual(summary['survey'], {'pages': 36, 'missing': 0})
+        self.assertEqual(summary['correct']['recognition'],
+                         sum(1 for item in items if item.get('correct_recognition') is True))
+
+    def test_missing_pages_are_counted(self):
+        dropped = {'canny', 'annihilate'}
+        events = [e for e in self.events
+                  if not (json.loads(e['body']).get('page_type') == 'generation'
+                          and json.loads(e['body']).get('english_word') in dropped)]
+        self.replay(events)
+        rounds = self.summary_item()['rounds']
+        self.assertEqual(sum(r['generation']['missing'] for r in rounds.values()), 2)
+        self.assertEqual(sum(r['learning']['missing'] for r in rounds.values()), 0)
+
+    def test_recognition_pages_without_timestamp_in_are_seen(self):
+        # RecognitionPage.jsx 는 timestamp_in 을 null 로 보냄
+        for word in ('canny', 'abide'):
+            self.call('POST', '/dev/responses', {
+                'user': USER, 'english_word': word, 'round_number': 1, 'page_type': 'recognition',
+                'timestamp_in': None, 'timestamp_out': '2025-04-20T10:00:12.000Z', 'response': '모름'})
+        items = [item for key, item in self.responses.items.items() if key[1].startswith('WORD#')]
+        self.assertFalse([item for item in items if 'timestamp_recognition_in' in item])
+        stats = session_summary.summarize({'1': items}, {'1': {'canny', 'abide'}})['rounds']['1']['recognition']
+        self.assertEqual((stats['pages'], stats['missing']), (2, 0))
+
+    def test_round_queries_run_concurrently(self):
+        self.replay(self.events[:-1])
+        rounds = len(session_summary.expected_words())
+        # 라운드 query 가 모두 동시에 진행 중이어야 barrier 를 통과 (순차 실행이면 BrokenBarrierError)
+        barrier = threading.Barrier(rounds, timeout=10)
+        table = GatedQueryTable(self.responses, barrier.wait)
+        summary = session_summary.compute(table, USER, budget_ms=60000)
+        self.assertEqual(table.peak, rounds)
+        self.assertEqual(len(summary['rounds']), rounds)
+
+    def test_unfinished_reads_are_deferred_at_the_budget(self):
+        self.replay(self.events[:-1])
+        # query 는 테스트가 끝날 때까지 멈춰 있음 - 응답이 왔다면 읽기를 기다리지 않은 것
+        release = threading.Event()
+        self.addCleanup(release.set)
+        table = GatedQueryTable(self.responses, release.wait)
+        lambda_function.table_responses = table
+        with mock.patch.object(session_summary, 'BUDGET_MS', 50):
+            result, = self.replay(self.events[-1:])
+        self.assertEqual(result['statusCode'], 200)
+        self.assertEqual(json.loads(result['body'])['summary'], 'deferred')
+        self.assertGreater(table.in_flight, 0)
+        self.assertEqual(self.summary_item()['status'], 'deferred')
+
+        # 연기된 요약은 나중에 (시간 제한 없이) 계산
+        release.set()
+        self.assertEqual(session_summary.deferred_users(self.responses), [USER])
+        session_summary.compute(self.responses, USER)
+        self.assertEqual(self.summary_item()['status'], 'complete')
+        self.assertEqual(session_summary.deferred_users(self.responses), [])
+
+    def test_scheduled_event_computes_deferred_summaries(self):
+        self.replay(self.events[:-1])
+        lambda_function.table_responses = GatedQueryTable(self.responses, fail=True)
+        self.replay(self.events[-1:])
+        self.assertEqual(self.summary_item()['status'], 'deferred')
+
+        lambda_function.table_responses = self.responses
+        result = self.handle({'source': 'aws.events', 'detail-type': 'Scheduled Event', 'detail': {}})
+        self.assertEqual(result, {'deferred': 1, 'computed': 1, 'failed': 0})
+        self.assertEqual(self.summary_item()['status'], 'complete')
+        self.assertEqual(session_summary.deferred_users(self.responses), [])
+
+    def test_summary_errors_do_not_fail_final_summary(self):
+        self.replay(self.events[:-1])
+        lambda_function.table_responses = GatedQueryTable(self.responses, fail=True)
+        result, = self.replay(self.events[-1:])
+        self.assertEqual(result['statusCode'], 200)
+        self.assertEqual(json.loads(result['body'])['summary'], 'deferred')
+        self.assertIn('total_duration', self.consent.items[('p0000@example.com', '참가자0000')])
+
+    def test_outliers_use_tukey_fences(self):
+        durations = {'a': 10.0, 'b': 11.0, 'c': 12.0, 'd': 12.0, 'g': 12.5, 'h': 13.0, 'i': 14.0,
+                     'e': 95.0, 'f': 0.5}
+        self.assertEqual(session_summary.outlier_words(durations), ['e', 'f'])
+        self.assertEqual(session_summary.outlier_words({'a': 1.0, 'b': 100.0}), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,155 @@
+import csv
+import os
+import random
+import tempfile
+import unittest
+from datetime import datetime, timezone
+from unittest import mock
+
+import export_responses
+import timestamps
+from handler_case import HandlerTestCase
+
+try:
+    import numpy as np
+except ImportError:  # numpy 는 선택 의존성
+    np = None
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow 는 선택 의존성
+    pq = None
+
+
+def reference_ms(value):
+    dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return round(dt.timestamp() * 1000)
+
+
+class TestParse(unittest.TestCase):
+
+    def test_matches_fromisoformat(self):
+        rng = random.Random(3)
+        values = [timestamps.epoch_ms_to_iso(rng.randint(0, 4102444800000)) for _ in range(2000)]
+        values += ['2025-04-20T09:00:12.345+09:00', '2025-04-20T09:00:12Z', '2025-04-20T09:00:12.345678+00:00',
+                   '2025-04-20T09:00:12.345', '2024-02-29T23:59:59.999Z']
+        for value in values:
+            self.assertEqual(timestamps.parse_epoch_ms(value), reference_ms(value), value)
+
+    def test_invalid_values_are_none(self):
+        for value in ('', None, 'a', '2025-02-30T00:00:00.000Z', '2025-04-20T09:00:12.3a5Z', 12, '2025-04-20T25:00:00.000Z'):
+            self.assertIsNone(timestamps.parse_epoch_ms(value), value)
+
+    def test_has_timezone(self):
+        self.assertTrue(timestamps.has_timezone('2025-04-20T09:00:12.345Z'))
+        self.assertTrue(timestamps.has_timezone('2025-04-20T09:00:12+09:00'))
+        self.assertFalse(timestamps.has_timezone('2025-04-20T09:00:12.345'))
+
+
+class TestCheckTiming(unittest.TestCase):
+    IN = '2025-04-20T10:00:00.000Z'
+    OUT = '2025-04-20T10:00:12.600Z'
+    RECEIVED = timestamps.parse_epoch_ms('2025-04-20T10:00:13.000Z')
+
+    def test_duration_is_derived_like_the_client(self):
+        self.assertEqual(timestamps.check_timing(self.IN, self.OUT, 13, self.RECEIVED), (13, []))
+        self.assertEqual(timestamps.check_timing(self.IN, self.OUT, None, self.RECEIVED), (13, []))
+        self.assertEqual(timestamps.check_timing(self.IN, None, None, self.RECEIVED), (None, []))
+
+    def test_implausible_timing_is_flagged(self):
+        self.assertEqual(timestamps.check_timing(self.IN, self.OUT, 30, self.RECEIVED)[1], [timestamps.MISMATCH])
+        self.assertEqual(timestamps.check_timing(self.OUT, self.IN, None, self.RECEIVED)[1], [timestamps.NEGATIVE])
+        self.assertEqual(timestamps.check_timing('a', self.OUT, 1, self.RECEIVED), (None, [timestamps.UNPARSEABLE]))
+        ahead = self.RECEIVED - 3600 * 1000
+        self.assertEqual(timestamps.check_timing(self.IN, self.OUT, 13, ahead)[1], [timestamps.CLOCK_AHEAD])
+
+    def test_lagging_clock_is_only_flagged_when_configured(self):
+        late = self.RECEIVED + 2 * 86400 * 1000
+        self.assertEqual(timestamps.check_timing(self.IN, self.OUT, 13, late)[1], [])
+        with mock.patch.object(timestamps, 'CLOCK_LAG_S', 86400):
+            self.assertEqual(timestamps.check_timing(self.IN, self.OUT, 13, late)[1], [timestamps.CLOCK_BEHIND])
+
+
+class TestHandlerTiming(HandlerTestCase):
+
+    def post(self, **fields):
+        body = {'user': '권수영#0101', 'english_word': 'canny', 'round_number': 1, 'page_type': 'learning',
+                'timestamp_in': '2025-04-20T10:00:00.000Z', 'timestamp_out': '2025-04-20T10:00:12.000Z'}
+        body.update(fields)
+        result = self.call('POST', '/dev/responses', body)
+        self.assertEqual(result['statusCode'], 200)
+        return self.responses.items[('USER#권수영#0101', 'WORD#canny')], self.stdout.getvalue()
+
+    def test_missing_duration_is_derived(self):
+        item, _ = self.post(duration=None)
+        self.assertEqual(item['duration_learning'], 12)
+        self.assertNotIn('timing_flags_learning', item)
+
+    def test_client_duration_is_kept_and_mismatch_flagged(self):
+        item, logged = self.post(duration=40)
+        self.assertEqual(item['duration_learning'], 40)
+        self.assertEqual(item['timing_flags_learning'], [timestamps.MISMATCH])
+        self.assertIn('"timing_flagged"', logged)
+
+    def test_future_timestamps_are_flagged(self):
+        item, _ = self.post(timestamp_in='2099-01-01T00:00:00.000Z', timestamp_out='2099-01-01T00:00:05.000Z',
+                            duration=5)
+        self.assertEqual(item['timing_flags_learning'], [timestamps.CLOCK_AHEAD])
+
+
+@unittest.skipUnless(np, 'numpy not installed')
+class TestColumns(unittest.TestCase):
+
+    def test_to_datetime64_matches_scalar_parse(self):
+        values = ['2025-04-20T10:00:00.123Z', '2025-04-20T19:00:00.123+09:00', None, '', 'x',
+                  1745143200123, float('nan')]
+        parsed = timestamps.to_datetime64(values)
+        expected = [1745143200123, 1745143200123, None, None, None, 1745143200123, None]
+        self.assertEqual([None if np.isnat(v) else int(v.astype('int64')) for v in parsed], expected)
+
+    def test_derive_durations(self):
+        elapsed, mismatch = timestamps.derive_durations(
+            [0, 1000, None], [12500, 500, 3000], [12, 3, 3])
+        self.assertEqual(elapsed[:2].tolist(), [12.5, -0.5])
+        self.assertTrue(np.isnan(elapsed[2]))
+        self.assertEqual(mismatch.tolist(), [False, True, False])
+
+
+def export_row(in_ms, out_ms, duration):
+    row = dict.fromkeys(export_responses.COLUMN_NAMES)
+    row.update({'user': '권수영#0101', 'english_word': 'canny', 'round_number': 1,
+                'learning_in_ms': in_ms, 'learning_out_ms': out_ms, 'learning_duration_s': duration})
+    return row
+
+
+@unittest.skipUnless(np, 'numpy not installed')
+class TestRederiveExport(unittest.TestCase):
+
+    def setUp(self):
+        self.rows = [export_row(0, 12000, 12.0), export_row(0, 12000, 30.0), export_row(None, None, None)]
+
+    def test_csv_export_is_rederived_in_place(self):
+        with tempfile.TemporaryDirectory() as out:
+            export_responses.write_csv_chunks([self.rows], out)
+            counts = timestamps.rederive_export(out)
+            self.assertEqual(list(counts.values()), [3])
+            with open(next(iter(counts)), newline='', encoding='utf-8') as f:
+                rows = list(csv.DictReader(f))
+        self.assertEqual([(r['learning_derived_s'], r['learning_duration_mismatch']) for r in rows],
+                         [('12.0', 'False'), ('12.0', 'True'), ('', '')])
+
+    @unittest.skipUnless(pq, 'pyarrow not installed')
+    def test_parquet_export_is_rederived_in_place(self):
+        with tempfile.TemporaryDirectory() as out:
+            export_responses.write_parquet([self.rows], out)
+            timestamps.rederive_export(out)
+            table = pq.read_table(os.path.join(out, 'responses.parquet'))
+        self.assertEqual(table.column('learning_derived_s').to_pylist(), [12.0, 12.0, None])
+        self.assertEqual(table.column('learning_duration_mismatch').to_pylist(), [False, True, None])
+        self.assertEqual(table.column('generation_derived_s').to_pylist(), [None, None, None])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import base64
+import json
+import unittest
+
+import lambda_function
+from local_dynamodb import LocalDynamoDB, patch_handler_tables
+from benchmarks.sessions import load_words, session_events
+
+USER = '참가자0000#01000000000'
+
+
+class TestUserResponsesQuery(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.original = (lambda_function.table_responses, lambda_function.table_consent)
+        cls.db = patch_handler_tables(lambda_function, LocalDynamoDB())
+        words = load_words()
+        for participant in (0, 1):
+            for event in session_events(participant, words):
+                lambda_function.lambda_handler(event, None)
+
+    @classmethod
+    def tearDownClass(cls):
+        lambda_function.table_responses, lambda_function.table_consent = cls.original
+
+    def get(self, **params):
+        result = lambda_function.lambda_handler(
+            {'httpMethod': 'GET', 'path': '/dev/responses', 'queryStringParameters': params or None}, None)
+        return result['statusCode'], json.loads(result['body'])
+
+    def test_returns_one_round_of_one_user(self):
+        status, body = self.get(user=USER, round='2')
+        self.assertEqual(status, 200)
+        self.assertEqual(body['count'], 12)
+        self.assertIsNone(body['next_token'])
+        for item in body['items']:
+            self.assertEqual(item['user'], USER)
+            self.assertEqual(item['round_number'], 2)
+            self.assertNotIn('PK', item)
+        words = [item['english_word'] for item in body['items']]
+        self.assertEqual(words, sorted(words))
+
+    def test_paginates_with_next_token(self):
+        seen = []
+        token = None
+        pages = 0
+        while True:
+            params = {'user': USER, 'round': '1', 'limit': '5'}
+            if token:
+                params['next_token'] = token
+            status, body = self.get(**params)
+            self.assertEqual(status, 200)
+            seen.extend(item['english_word'] for item in body['items'])
+            pages += 1
+            token = body['next_token']
+            if not token:
+                break
+        self.assertEqual(pages, 3)
+        self.assertEqual(len(seen), 12)
+        self.assertEqual(len(set(seen)), 12)
+
+    def test_without_round_returns_all_rounds(self):
+        status, body = self.get(user=USER, limit='500')
+        self.assertEqual(status, 200)
+        self.assertEqual(body['count'], 36)
+
+    def test_rejects_bad_requests(self):
+        self.assertEqual(self.get()[0], 400)
+        self.assertEqual(self.get(user=USER, next_token='%%%')[0], 400)
+        other = base64.urlsafe_b64encode(json.dumps({'PK': 'USER#someone', 'SK': 'WORD#x'}).encode()).decode()
+        status, body = self.get(user=USER, next_token=other)
+        self.assertEqual(status, 400)
+        self.assertIn('next_token', body['error'])
+
+    def test_query_uses_the_index(self):
+        table = self.db.Table('phonitale-user-responses')
+        result = table.query(IndexName='UserRoundIndex',
+                             KeyConditionExpression='PK = :pk AND begins_with(GSI1SK, :p)',
+                             ExpressionAttributeValues={':pk': 'USER#' + USER, ':p': 'ROUND#003#'},
+                             Limit=4)
+        self.assertEqual(result['Count'], 4)
+        self.assertEqual(set(result['LastEvaluatedKey']), {'PK', 'SK', 'GSI1SK'})
+
+
+if __name__ == '__main__':
+    unittest.main()
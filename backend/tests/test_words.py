@@ -0,0 +1,91 @@
+import base64
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import lambda_function
+import words
+
+
+def get_words(params=None, headers=None):
+    return lambda_function.lambda_handler(
+        {'httpMethod': 'GET', 'path': '/dev/words', 'queryStringParameters': params,
+         'headers': headers or {}}, None)
+
+
+class TestWordsEndpoint(unittest.TestCase):
+
+    def setUp(self):
+        words.invalidate()
+        self.addCleanup(words.invalidate)
+
+    def test_serves_compact_rounds(self):
+        result = get_words()
+        self.assertEqual(result['statusCode'], 200)
+        body = json.loads(result['body'])
+        self.assertEqual(sorted(body['rounds']), ['1', '2', '3'])
+        self.assertEqual([len(body['rounds'][r]) for r in ('1', '2', '3')], [12, 12, 12])
+        first = body['rounds']['1'][0]
+        self.assertEqual(set(first), set(words.WORD_FIELDS))
+        self.assertEqual(first['word'], 'meddlesome')
+        self.assertEqual(first['meaning'], '참견하기를 좋아하는')
+        self.assertEqual(result['headers']['X-Words-Version'], body['version'])
+        self.assertEqual(result['headers']['Access-Control-Allow-Origin'], '*')
+
+    def test_single_round_and_unknown_round(self):
+        body = json.loads(get_words({'round': '2'})['body'])
+        self.assertEqual(list(body['rounds']), ['2'])
+        self.assertEqual(get_words({'round': '9'})['statusCode'], 400)
+
+    def test_plain_json_by_default(self):
+        # API Gateway 에 binaryMediaTypes 가 없으면 base64 본문이 그대로 전달되므로 기본은 압축하지 않음
+        result = get_words(headers={'accept-encoding': 'gzip, deflate, br'})
+        self.assertFalse(result['isBase64Encoded'])
+        self.assertNotIn('Content-Encoding', result['headers'])
+        self.assertEqual(len(json.loads(result['body'])['rounds']['3']), 12)
+
+    @mock.patch.dict(os.environ, {'WORDS_GZIP': '1'})
+    def test_gzip_when_enabled_and_accepted(self):
+        result = get_words(headers={'accept-encoding': 'gzip, deflate, br'})
+        self.assertTrue(result['isBase64Encoded'])
+        self.assertEqual(result['headers']['Content-Encoding'], 'gzip')
+        body = json.loads(gzip.decompress(base64.b64decode(result['body'])))
+        self.assertEqual(len(body['rounds']['3']), 12)
+
+    def test_conditional_request_returns_304(self):
+        etag = get_words({'round': '1'})['headers']['ETag']
+        result = get_words({'round': '1'}, {'If-None-Match': etag})
+        self.assertEqual(result['statusCode'], 304)
+        self.assertEqual(result['body'], '')
+        self.assertEqual(get_words({'round': '2'}, {'If-None-Match': etag})['statusCode'], 200)
+
+    def test_parses_once_and_reloads_when_file_changes(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        path = os.path.join(tmp, 'words.csv')
+        shutil.copy(words.DEFAULT_PATHS[1], path)
+
+        with mock.patch.dict(os.environ, {'WORDS_CSV_PATH': path}):
+            with mock.patch.object(words, 'parse_words', wraps=words.parse_words) as parse:
+                first = get_words()['headers']['ETag']
+                get_words()
+                self.assertEqual(parse.call_count, 1)
+
+                with open(path, 'a', encoding='utf-8') as f:
+                    f.write('\nnewword,1,,,,뜻,,,,,,,,audio/ne/newword.mp3,,,,,,,7\n')
+                second = get_words()
+                self.assertEqual(parse.call_count, 2)
+                self.assertNotEqual(second['headers']['ETag'], first)
+                self.assertEqual(len(json.loads(second['body'])['rounds']['1']), 13)
+
+                words.invalidate()
+                get_words()
+                self.assertEqual(parse.call_count, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
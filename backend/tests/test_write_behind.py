@@ -0,0 +1,290 @@
+import contextlib
+import io
+import json
+import os
+import random
+import tempfile
+import unittest
+from unittest import mock
+
+import ingest_queue
+import lambda_function
+import retry
+from handler_case import CountingTable, HandlerTestCase
+from metrics import InstrumentedTable, metrics
+from benchmarks.sessions import load_words, session_events
+
+QUEUE_MODE = {'RESPONSE_WRITE_MODE': 'queue'}
+
+
+def snapshot(table):
+    # 설문 timestamp / 요약 갱신 시각은 서버 시각이라 실행마다 다름
+    return {key: {k: v for k, v in item.items() if k not in ('timestamp_survey', 'updated_at')}
+            for key, item in table.items.items()}
+
+
+class TestWriteBehind(HandlerTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        words = load_words()
+        cls.events = [e for p in range(2) for e in session_events(p, words)]
+
+    def setUp(self):
+        super().setUp()
+        self.addCleanup(ingest_queue.set_queue, None)
+        self.addCleanup(metrics.reset)
+        self.queue = ingest_queue.MemoryQueue()
+        ingest_queue.set_queue(self.queue)
+
+    def use_tables(self, fault_rate=0.0, max_attempts=retry.MAX_ATTEMPTS):
+        db = self.use_local_tables()
+        table = self.responses
+        if fault_rate:
+            table.inject_faults(rate=fault_rate, rng=random.Random(3).random)
+        # backoff 는 기록만 (요청 경로의 재시도 횟수)
+        self.sleeps = []
+        lambda_function.table_responses = InstrumentedTable(retry.RetryingTable(
+            table, breaker=retry.CircuitBreaker(threshold=1000), max_attempts=max_attempts,
+            sleep=self.sleeps.append, rng=random.Random(4).random))
+        return db, table
+
+    def replay(self, events=None):
+        return [self.handle(event)['statusCode'] for event in events or self.events]
+
+    def drain(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return ingest_queue.drain_local(self.queue, lambda_function.queue_consumer_handler)
+
+    def sync_state(self):
+        db, table = self.use_tables()
+        statuses = self.replay()
+        self.assertEqual(set(statuses), {200})
+        return snapshot(table), snapshot(db.Table('phonitale-user-consent'))
+
+    def test_queued_writes_reach_the_same_final_state(self):
+        expected_responses, expected_consent = self.sync_state()
+
+        db, table = self.use_tables()
+        with mock.patch.dict(os.environ, QUEUE_MODE):
+            statuses = self.replay()
+        # consent / final_summary 는 그대로 동기 처리
+        self.assertEqual(statuses.count(202), len(self.events) - 4)
+        self.assertEqual(statuses.count(200), 4)
+        # 응답은 아직 큐에 있고, 세션 요약은 그 뒤에 계산되도록 연기됨
+        self.assertEqual({key[1]: item['status'] for key, item in table.items.items()},
+                         {'SUMMARY': 'deferred'})
+
+        batches = self.drain()
+        self.assertGreater(batches, 1)
+        self.assertEqual(len(self.queue), 0)
+        self.assertEqual(snapshot(table), expected_responses)
+        # consent 는 서버 수신 시각이 들어가므로 키만 비교
+        self.assertEqual(db.Table('phonitale-user-consent').items.keys(), expected_consent.keys())
+
+    def test_failed_groups_are_redelivered_until_written(self):
+        expected_responses, _ = self.sync_state()
+
+        _, table = self.use_tables()
+        with mock.patch.dict(os.environ, QUEUE_MODE):
+            self.replay()
+        # 재시도 없이 30% 스로틀: 실패한 그룹은 batchItemFailures 로 다시 큐에 들어감
+        table.inject_faults(rate=0.3, rng=random.Random(5).random)
+        lambda_function.table_responses = InstrumentedTable(retry.RetryingTable(
+            table, breaker=retry.CircuitBreaker(threshold=1000), max_attempts=1))
+        messages = len(self.queue)
+        batches = self.drain()
+
+        self.assertGreater(table.injected_faults, 0)
+        self.assertGreater(batches, -(-messages // ingest_queue.SQS_BATCH_SIZE))
+        self.assertEqual(snapshot(table), expected_responses)
+
+    def test_consumer_merges_per_item_and_reports_failures(self):
+        _, table = self.use_tables()
+        base = {'user': '권수영#0101', 'round_number': 1, 'timestamp_in': '2025-04-20T10:00:00.000Z',
+                'timestamp_out': '2025-04-20T10:00:12.000Z', 'duration': 12}
+        updates = [lambda_function.build_response_update({**base, 'english_word': word, 'page_type': page_type})
+                   for word, page_type in (('abandon', 'learning'), ('abandon', 'recognition'), ('bargain', 'learning'))]
+        event = ingest_queue.sqs_event([(str(i), ingest_queue.encode(u)) for i, u in enumerate(updates)]
+                                       + [('bad', 'not json')])
+        calls = []
+        original_update = table.update_item
+
+        def update_item(**kwargs):
+            calls.append(kwargs['Key']['SK'])
+            if kwargs['Key']['SK'] == 'WORD#bargain':
+                raise RuntimeError('simulated failure')
+            return original_update(**kwargs)
+
+        table.update_item = update_item
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = lambda_function.queue_consumer_handler(event, None)
+
+        self.assertEqual(calls, ['WORD#abandon', 'WORD#bargain'])
+        # 잘못된 메시지는 재시도해도 소용없으므로 실패 목록에 넣지 않음
+        self.assertEqual(result, {'batchItemFailures': [{'itemIdentifier': '2'}]})
+
+    def test_failure_redelivers_the_participants_later_messages(self):
+        _, table = self.use_tables()
+        base = {'user': '권수영#0101', 'timestamp_in': '2025-04-20T10:00:00.000Z',
+                'timestamp_out': '2025-04-20T10:00:12.000Z', 'duration': 12}
+        records = [('abandon', 'learning', 1), ('bargain', 'learning', 1), ('abandon', 'recognition', 1),
+                   ('bargain', 'survey', 0)]
+        updates = [lambda_function.build_response_update(
+            {**base, 'english_word': word, 'page_type': page_type, 'round_number': round_number,
+             'usefulness': 3, 'coherence': 4}) for word, page_type, round_number in records]
+        updates.append(dict(updates[0], user='김민지#0202'))
+        original_update = table.update_item
+
+        def update_item(**kwargs):
+            if kwargs['Key']['SK'] == 'WORD#bargain':
+                raise RuntimeError('simulated failure')
+            return original_update(**kwargs)
+
+        table.update_item = update_item
+        # abandon 쓰기 성공, bargain 실패 -> bargain 부터 같은 참가자의 이후 메시지 재전달
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = lambda_function.queue_consumer_handler(
+                ingest_queue.sqs_event([(str(i), ingest_queue.encode(u)) for i, u in enumerate(updates)]), None)
+        failed = [failure['itemIdentifier'] for failure in result['batchItemFailures']]
+        self.assertEqual(failed, ['1', '2', '3'])
+        self.assertIn(('USER#김민지#0202', 'WORD#abandon'), table.items)
+        item = table.items[('USER#권수영#0101', 'WORD#abandon')]
+        self.assertIn('timestamp_learning_in', item)
+        self.assertIn('timestamp_recognition_in', item)
+
+    def test_batch_route_enqueues_valid_records(self):
+        self.use_tables()
+        responses = [e for e in self.events if e['path'].endswith('/responses')
+                     and json.loads(e['body']).get('page_type') != 'final_summary'][:5]
+        items = [json.loads(e['body']) for e in responses] + [{'page_type': 'learning'}]
+        event = dict(responses[0], path='/dev/responses/batch', body=json.dumps({'items': items}))
+        with mock.patch.dict(os.environ, QUEUE_MODE):
+            statuses = self.replay([event])
+        self.assertEqual(statuses, [207])
+        self.assertEqual(len(self.queue), 5)
+
+    def test_queue_errors_return_503(self):
+        self.use_tables()
+        queue = mock.Mock()
+        queue.send.side_effect = ingest_queue.QueueUnavailable('1 of 1 messages were not queued')
+        ingest_queue.set_queue(queue)
+        with mock.patch.dict(os.environ, QUEUE_MODE):
+            result = self.handle(self.events[1])
+        self.assertEqual(result['statusCode'], 503)
+        self.assertEqual(result['headers']['Retry-After'], '1')
+
+    def test_throttling_stays_off_the_queued_request_path(self):
+        # 지연 시간 비교는 benchmarks/throttle_bench.py (queue 변형)
+        events = [e for e in self.events if e['path'].endswith('/responses')
+                  and json.loads(e['body']).get('page_type') != 'final_summary'][:150]
+        _, table = self.use_tables(fault_rate=0.3)
+        self.replay(events)
+        self.assertGreater(table.injected_faults, 0)
+        self.assertGreater(len(self.sleeps), 0)
+
+        _, table = self.use_tables(fault_rate=0.3)
+        with mock.patch.dict(os.environ, QUEUE_MODE):
+            statuses = self.replay(events)
+        self.assertEqual(statuses, [202] * len(events))
+        self.assertEqual(len(self.queue), len(events))
+        self.assertEqual(table.injected_faults, 0)
+        self.assertEqual(self.sleeps, [])
+
+    def test_idempotency_key_becomes_the_queue_dedup_id(self):
+        # 프론트엔드는 모든 POST 에 Idempotency-Key 를 보냄 - 마커 대신 큐에서 중복 제거
+        events = [e for e in session_events(0, load_words(), idempotency_keys=True)
+                  if e['path'].endswith('/responses')
+                  and json.loads(e['body']).get('page_type') != 'final_summary'][:20]
+        _, table = self.use_tables(fault_rate=1.0)
+        lambda_function.table_responses = responses = CountingTable(lambda_function.table_responses)
+        lambda_function.table_consent = consent = CountingTable(lambda_function.table_consent)
+        with mock.patch.dict(os.environ, QUEUE_MODE):
+            statuses = self.replay(events + events[:5])
+        self.assertEqual(statuses, [202] * 25)
+        self.assertEqual(responses.calls + consent.calls, [])
+        self.assertEqual(self.sleeps, [])
+        # 재전송 5건은 같은 deduplication id 라 큐에 다시 들어가지 않음
+        self.assertEqual(len(self.queue), 20)
+
+        table.clear_faults()
+        lambda_function.table_responses = responses.table
+        self.drain()
+        words = {json.loads(e['body'])['english_word'] for e in events}
+        self.assertEqual(len([key for key in table.items if key[1].startswith('WORD#')]), len(words))
+        self.assertFalse([key for key in table.items if key[0].startswith('IDEMP#')])
+
+    def test_final_summary_keeps_its_marker_in_queue_mode(self):
+        self.use_tables()
+        events = list(session_events(0, load_words(), idempotency_keys=True))
+        with mock.patch.dict(os.environ, QUEUE_MODE):
+            statuses = self.replay([events[0], events[-1]])
+        self.assertEqual(statuses, [200, 200])
+        self.assertEqual(len([key for key in self.responses.items if key[0].startswith('IDEMP#')]), 1)
+
+
+class TestQueues(unittest.TestCase):
+
+    def test_file_queue_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            queue = ingest_queue.FileQueue(os.path.join(tmp, 'responses.jsonl'))
+            queue.send([ingest_queue.encode({'user': '권수영#0101', 'duration': 1.5})] * 3)
+            self.assertEqual(len(queue), 3)
+            batch = queue.receive(2)
+            self.assertEqual(len(batch), 2)
+            self.assertEqual(len(ingest_queue.FileQueue(queue.path)), 1)
+            queue.release(batch[:1])
+            self.assertEqual(len(queue), 2)
+            self.assertEqual(str(ingest_queue.decode(batch[0][1])['duration']), '1.5')
+
+    def test_sqs_queue_batches_and_groups_fifo_messages(self):
+        client = mock.Mock()
+        client.send_message_batch.return_value = {'Successful': []}
+        queue = ingest_queue.SqsQueue('https://sqs.us-east-2.amazonaws.com/1/responses.fifo', client)
+        queue.send([f'm{i}' for i in range(12)], [f'u{i}' for i in range(12)])
+        first, second = client.send_message_batch.call_args_list
+        self.assertEqual(len(first.kwargs['Entries']), 10)
+        self.assertEqual(second.kwargs['Entries'][1]['MessageGroupId'], 'u11')
+
+        client.send_message_batch.return_value = {'Failed': [{'Id': '0', 'Code': 'InternalError'}]}
+        with self.assertRaises(ingest_queue.QueueUnavailable):
+            queue.send(['m'], ['u'])
+
+    def test_sqs_client_errors_become_queue_unavailable(self):
+        from botocore.exceptions import ClientError
+        client = mock.Mock()
+        client.send_message_batch.side_effect = ClientError(
+            {'Error': {'Code': 'ServiceUnavailable', 'Message': 'try again'}}, 'SendMessageBatch')
+        queue = ingest_queue.SqsQueue('https://sqs.us-east-2.amazonaws.com/1/responses.fifo', client)
+        with self.assertRaisesRegex(ingest_queue.QueueUnavailable, 'ServiceUnavailable'):
+            queue.send(['m'], ['u'])
+
+    def test_korean_user_gets_a_valid_fifo_group_id(self):
+        client = mock.Mock()
+        client.send_message_batch.return_value = {'Successful': []}
+        ingest_queue.set_queue(ingest_queue.SqsQueue('https://sqs.us-east-2.amazonaws.com/1/responses.fifo', client))
+        self.addCleanup(ingest_queue.set_queue, None)
+        ingest_queue.enqueue([{'user': '권수영#0101', 'english_word': 'canny', 'set': {}}])
+        group = client.send_message_batch.call_args.kwargs['Entries'][0]['MessageGroupId']
+        # SQS: 1-128 자, 영숫자와 ASCII 문장부호만
+        self.assertRegex(group, r'^[\x21-\x7e]{1,128}$')
+        self.assertEqual(group, ingest_queue.group_id('권수영#0101'))
+        self.assertNotEqual(group, ingest_queue.group_id('권수영#0102'))
+
+    def test_idempotency_key_sets_fifo_dedup_ids(self):
+        client = mock.Mock()
+        client.send_message_batch.return_value = {'Successful': []}
+        ingest_queue.set_queue(ingest_queue.SqsQueue('https://sqs.us-east-2.amazonaws.com/1/responses.fifo', client))
+        self.addCleanup(ingest_queue.set_queue, None)
+        updates = [{'user': '권수영#0101', 'english_word': word, 'set': {}} for word in ('canny', 'abide')]
+        ingest_queue.enqueue(updates, 'key-1')
+        ingest_queue.enqueue(updates, 'key-1')
+        first, second = [[entry['MessageDeduplicationId'] for entry in call.kwargs['Entries']]
+                         for call in client.send_message_batch.call_args_list]
+        self.assertEqual(first, second)
+        self.assertEqual(len(set(first)), 2)
+        self.assertRegex(first[0], r'^[0-9a-f]{64}$')
+
+
+if __name__ == '__main__':
+    unittest.main()
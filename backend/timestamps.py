@@ -0,0 +1,260 @@
+"""ISO-8601 timestamp parsing, server-derived durations and clock-skew checks.
+
+The React app sends ``new Date().toISOString()`` strings
+(``2025-04-20T09:00:12.345Z``). ``parse_epoch_ms`` converts the
+``YYYY-MM-DDTHH:MM:SS`` part of that shape once and memoizes it (the same
+seconds recur across in/out pairs, retries, merged batches and re-reads)
+and adds the milliseconds as an integer. Other shapes (offsets, other
+precisions) go through ``datetime.fromisoformat``. Naive timestamps are
+taken as UTC.
+
+``check_timing`` is what the handler runs on every phase page: it derives
+the duration from ``timestamp_in``/``timestamp_out`` the way the client
+does (``Math.round((out - in) / 1000)``) and flags records whose duration
+disagrees, runs backwards, or whose clock is far from the server's.
+
+For exports and re-derivation jobs, ``to_datetime64``/``derive_durations``
+work on whole columns with NumPy (optional dependency)::
+
+    python timestamps.py exports/2025-05-01
+
+Configuration (environment):
+    DURATION_TOLERANCE_S   allowed |duration - derived| in seconds (default 1)
+    CLOCK_SKEW_S           client clock ahead of the server (default 300)
+    CLOCK_LAG_S            client clock behind the server (default 0 = off;
+                           offline batches and replays legitimately arrive late)
+"""
+import argparse
+import calendar
+import csv
+import functools
+import glob
+import os
+import re
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from table_schema import PHASES, to_float
+
+DURATION_TOLERANCE_S = float(os.environ.get('DURATION_TOLERANCE_S', '1'))
+CLOCK_SKEW_S = float(os.environ.get('CLOCK_SKEW_S', '300'))
+CLOCK_LAG_S = float(os.environ.get('CLOCK_LAG_S', '0'))
+
+# 검사 결과 플래그 (timing_flags_<phase> 에 저장)
+UNPARSEABLE = 'unparseable'
+NEGATIVE = 'negative_duration'
+MISMATCH = 'duration_mismatch'
+CLOCK_AHEAD = 'clock_ahead'
+CLOCK_BEHIND = 'clock_behind'
+
+@functools.lru_cache(maxsize=4096)
+def _second_epoch_ms(prefix: str) -> Optional[int]:
+    """Epoch ms of ``YYYY-MM-DDTHH:MM:SS`` (UTC), None if it is not a valid time."""
+    try:
+        dt = datetime.fromisoformat(prefix)
+    except ValueError:
+        return None
+    return calendar.timegm(dt.timetuple()) * 1000
+
+
+def _general_epoch_ms(value: str) -> Optional[int]:
+    try:
+        parsed = datetime.fromisoformat(value[:-1] + '+00:00' if value.endswith('Z') else value)
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return round(parsed.timestamp() * 1000)
+
+
+def parse_epoch_ms(value: Any) -> Optional[int]:
+    """Epoch milliseconds of an ISO-8601 string (None if it does not parse)."""
+    if not isinstance(value, str) or not value:
+        return None
+    # toISOString() 형식: 같은 초의 앞부분은 메모, 밀리초만 더함
+    if len(value) == 24 and value[19] == '.' and value[23] == 'Z' and value[20:23].isascii() \
+            and value[20:23].isdigit():
+        base = _second_epoch_ms(value[:19])
+        if base is not None:
+            return base + int(value[20:23])
+    return _general_epoch_ms(value)
+
+
+def has_timezone(value: str) -> bool:
+    """Whether an ISO string carries ``Z`` or an offset (naive ones are read as UTC)."""
+    return bool(re.search(r'(Z|[+-]\d{2}:?\d{2})$', value or ''))
+
+
+def parse_many(values: Iterable[Any]) -> List[Optional[int]]:
+    """``parse_epoch_ms`` over a column (shares the per-second memo)."""
+    return [parse_epoch_ms(value) for value in values]
+
+
+def epoch_ms_to_iso(value: Any) -> str:
+    """``YYYY-MM-DDTHH:MM:SS.mmmZ`` (the format the React app sends)."""
+    ms = int(value)
+    dt = datetime.fromtimestamp(ms // 1000, tz=timezone.utc)
+    return dt.strftime('%Y-%m-%dT%H:%M:%S.') + f"{ms % 1000:03d}Z"
+
+
+def now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+# ----------------------------------------------------------------------
+# 한 건 검사 (handler)
+# ----------------------------------------------------------------------
+def check_timing(timestamp_in: Any, timestamp_out: Any, duration: Any,
+                 received_ms: Optional[int] = None) -> Tuple[Optional[int], List[str]]:
+    """(derived whole seconds, flags) of one page record.
+
+    ``derived`` is None when either timestamp is missing or unparseable.
+    """
+    flags: List[str] = []
+    in_ms, out_ms = parse_epoch_ms(timestamp_in), parse_epoch_ms(timestamp_out)
+    if (timestamp_in and in_ms is None) or (timestamp_out and out_ms is None):
+        flags.append(UNPARSEABLE)
+    derived = None
+    if in_ms is not None and out_ms is not None:
+        elapsed = out_ms - in_ms
+        # 클라이언트와 같은 Math.round((out - in) / 1000)
+        derived = (elapsed + 500) // 1000
+        if elapsed < 0:
+            flags.append(NEGATIVE)
+        client = to_float(duration)
+        if client is not None and abs(client - elapsed / 1000.0) > DURATION_TOLERANCE_S:
+            flags.append(MISMATCH)
+    latest = out_ms if out_ms is not None else in_ms
+    if latest is not None and received_ms is not None:
+        if latest - received_ms > CLOCK_SKEW_S * 1000:
+            flags.append(CLOCK_AHEAD)
+        elif CLOCK_LAG_S and received_ms - latest > CLOCK_LAG_S * 1000:
+            flags.append(CLOCK_BEHIND)
+    return derived, flags
+
+
+# ----------------------------------------------------------------------
+# 열 단위 (NumPy) - export / 재계산 작업
+# ----------------------------------------------------------------------
+def _numpy() -> Any:
+    import numpy as np
+    return np
+
+
+def to_datetime64(values: Sequence[Any]) -> Any:
+    """datetime64[ms] array of epoch-ms numbers or ISO strings (NaT where missing)."""
+    np = _numpy()
+    result = np.full(len(values), np.datetime64('NaT'), dtype='datetime64[ms]')
+    if not len(values):
+        return result
+    column = np.asarray(values, dtype=object)
+    is_str = np.frompyfunc(lambda v: isinstance(v, str) and v != '', 1, 1)(column).astype(bool)
+    is_num = np.frompyfunc(lambda v: isinstance(v, (int, float)) and not isinstance(v, bool) and v == v,
+                           1, 1)(column).astype(bool)
+    if is_num.any():
+        result[is_num] = column[is_num].astype('float64').round().astype('int64').astype('datetime64[ms]')
+    if is_str.any():
+        strings = column[is_str].astype(str)
+        # 프론트엔드 형식(…Z)은 Z 만 떼면 NumPy 가 한 번에 파싱 (UTC)
+        canonical = np.char.endswith(strings, 'Z') & (np.char.str_len(strings) <= 27)
+        parsed = np.full(len(strings), np.datetime64('NaT'), dtype='datetime64[ms]')
+        try:
+            parsed[canonical] = np.char.rstrip(strings[canonical], 'Z').astype('datetime64[ms]')
+        except ValueError:
+            canonical[:] = False
+        rest = np.flatnonzero(~canonical)
+        if len(rest):
+            ms = parse_many(strings[rest])
+            parsed[rest] = np.array([m if m is not None else 'NaT' for m in ms], dtype='datetime64[ms]')
+        result[is_str] = parsed
+    return result
+
+
+def derive_durations(timestamps_in: Sequence[Any], timestamps_out: Sequence[Any],
+                     durations: Optional[Sequence[Any]] = None) -> Tuple[Any, Any]:
+    """(derived seconds as float64 with NaN, mismatch flags as bool) for whole columns."""
+    np = _numpy()
+    elapsed = (to_datetime64(timestamps_out) - to_datetime64(timestamps_in)) / np.timedelta64(1, 's')
+    if durations is None:
+        return elapsed, np.zeros(len(elapsed), dtype=bool)
+    client = np.array([to_float(d) for d in durations], dtype='float64')
+    with np.errstate(invalid='ignore'):
+        mismatch = (np.abs(client - elapsed) > DURATION_TOLERANCE_S) | (elapsed < 0)
+    return elapsed, mismatch
+
+
+def derived_columns(phase: str) -> Tuple[str, str]:
+    return f'{phase}_derived_s', f'{phase}_duration_mismatch'
+
+
+def rederive_csv(path: str) -> int:
+    """Add/refresh the derived-duration columns of one export CSV in place."""
+    np = _numpy()
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        fieldnames = list(reader.fieldnames or [])
+        rows = list(reader)
+    for phase in PHASES:
+        in_ms = [int(row[f'{phase}_in_ms']) if row.get(f'{phase}_in_ms') else None for row in rows]
+        out_ms = [int(row[f'{phase}_out_ms']) if row.get(f'{phase}_out_ms') else None for row in rows]
+        derived, mismatch = derive_durations(in_ms, out_ms, [row.get(f'{phase}_duration_s') for row in rows])
+        derived_name, mismatch_name = derived_columns(phase)
+        for name in (derived_name, mismatch_name):
+            if name not in fieldnames:
+                fieldnames.append(name)
+        for row, value, flagged in zip(rows, derived.tolist(), mismatch.tolist()):
+            known = not np.isnan(value)
+            row[derived_name] = value if known else ''
+            row[mismatch_name] = flagged if known else ''
+    tmp = path + '.tmp'
+    with open(tmp, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
+    os.replace(tmp, path)
+    return len(rows)
+
+
+def rederive_parquet(path: str) -> int:
+    """Same for an export Parquet file, column-wise (requires pyarrow)."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    table = pq.read_table(path)
+    for phase in PHASES:
+        derived, mismatch = derive_durations(table.column(f'{phase}_in_ms').to_pylist(),
+                                             table.column(f'{phase}_out_ms').to_pylist(),
+                                             table.column(f'{phase}_duration_s').to_pylist())
+        missing = _numpy().isnan(derived)
+        for name, values in zip(derived_columns(phase), (derived, mismatch)):
+            column = pa.array(values, mask=missing)
+            if name in table.column_names:
+                table = table.set_column(table.column_names.index(name), name, column)
+            else:
+                table = table.append_column(name, column)
+    pq.write_table(table, path + '.tmp')
+    os.replace(path + '.tmp', path)
+    return table.num_rows
+
+
+def rederive_export(out_dir: str) -> Dict[str, int]:
+    """Re-derive durations for every responses file of an export directory."""
+    counts = {}
+    for path in sorted(glob.glob(os.path.join(out_dir, 'responses-*.csv'))):
+        counts[path] = rederive_csv(path)
+    for path in sorted(glob.glob(os.path.join(out_dir, 'responses.parquet'))):
+        counts[path] = rederive_parquet(path)
+    return counts
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Re-derive phase durations of an export from its timestamps.')
+    parser.add_argument('export_dir', help='directory written by export_responses.py')
+    args = parser.parse_args(argv)
+    for path, rows in rederive_export(args.export_dir).items():
+        print(f"{path}\t{rows}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,206 @@
+"""Word list for GET /words, parsed once per container.
+
+The CSV is reduced to the columns the React pages read and grouped by
+round. Each response variant (one round or all rounds) is serialized,
+gzipped and ETag'ed once, then served from the module-level cache until
+the word file changes: the file's size/mtime is checked on every call and
+``invalidate()`` drops the cache explicitly.
+
+When the asset manifest written by build_assets.py matches the word file,
+its version replaces the file hash (so any asset change invalidates the
+cache and the ETags), ``audio_path`` points at the content-hashed clips and
+each response lists the round prefetch bundles. A manifest built from
+another word file is ignored.
+
+Compression: by default responses are plain JSON and compression is left
+to API Gateway (set ``minimumCompressionSize`` on the REST API; it
+compresses for clients that send Accept-Encoding). ``WORDS_GZIP=1`` makes
+the Lambda return the pre-gzipped body itself, base64-encoded with
+``isBase64Encoded`` - only enable it when the API's ``binaryMediaTypes``
+include ``application/json`` (or ``*/*``), otherwise API Gateway passes the
+base64 text through and clients cannot parse it.
+
+Configuration (environment):
+    WORDS_CSV_PATH        path of the word CSV (defaults: backend/data/, then the
+                          React app's public/words/ in a source checkout)
+    ASSETS_MANIFEST_PATH  build_assets.py manifest (defaults: backend/data/, then
+                          the React app's public/bundles/)
+    WORDS_GZIP            "1" to gzip in the Lambda (requires binaryMediaTypes, default off)
+"""
+import base64
+import csv
+import gzip
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+WORDS_FILE_NAME = 'words_data_test_full.csv'
+_BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_PATHS = (
+    os.path.join(_BACKEND_DIR, 'data', WORDS_FILE_NAME),
+    os.path.join(_BACKEND_DIR, '..', 'phonitale-react', 'public', 'words', WORDS_FILE_NAME),
+)
+MANIFEST_FILE_NAME = 'manifest.json'
+DEFAULT_MANIFEST_PATHS = (
+    os.path.join(_BACKEND_DIR, 'data', MANIFEST_FILE_NAME),
+    os.path.join(_BACKEND_DIR, '..', 'phonitale-react', 'public', 'bundles', MANIFEST_FILE_NAME),
+)
+
+# 페이지에서 실제로 사용하는 컬럼만 전달 (CSV 는 21개 컬럼)
+WORD_FIELDS = ('word', 'round', 'meaning', 'audio_path', 'kss_keyword_refined', 'kss_verbal_cue')
+ROUNDS = ('1', '2', '3')
+
+_cache: Optional[Dict[str, Any]] = None
+_cache_lock = threading.Lock()
+
+
+def words_csv_path() -> str:
+    configured = os.environ.get('WORDS_CSV_PATH')
+    if configured:
+        return configured
+    for path in DEFAULT_PATHS:
+        if os.path.exists(path):
+            return path
+    return DEFAULT_PATHS[0]
+
+
+def manifest_path() -> Optional[str]:
+    configured = os.environ.get('ASSETS_MANIFEST_PATH')
+    if configured:
+        return configured
+    for path in DEFAULT_MANIFEST_PATHS:
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def content_version(raw: bytes) -> str:
+    """Version of the word file itself (build_assets.py records it in the manifest)."""
+    return hashlib.sha256(raw).hexdigest()[:12]
+
+
+def _stamp(path: Optional[str]) -> Optional[Tuple[str, int, int]]:
+    try:
+        stat = os.stat(path) if path else None
+    except OSError:
+        return None
+    return (path, stat.st_size, stat.st_mtime_ns) if stat else None
+
+
+def read_manifest(path: Optional[str], words_version: str) -> Optional[Dict[str, Any]]:
+    """The asset manifest if it was built from this word file, else None."""
+    if not path:
+        return None
+    try:
+        with open(path, encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get('words_version') == words_version else None
+
+
+def parse_words(raw: bytes) -> Dict[str, List[Dict[str, str]]]:
+    """Group the CSV rows of rounds 1-3 by round, keeping WORD_FIELDS only."""
+    rounds: Dict[str, List[Dict[str, str]]] = {r: [] for r in ROUNDS}
+    reader = csv.DictReader(raw.decode('utf-8-sig').splitlines())
+    for row in reader:
+        round_number = (row.get('round') or '').strip()
+        if round_number in rounds:
+            rounds[round_number].append({field: (row.get(field) or '').strip() for field in WORD_FIELDS})
+    return rounds
+
+
+def _variant(version: str, rounds: Dict[str, List[Dict[str, str]]],
+             bundles: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    data: Dict[str, Any] = {'version': version, 'rounds': rounds}
+    if bundles:
+        data['bundles'] = {r: bundles[r] for r in rounds if r in bundles}
+    body = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return {
+        'body': body,
+        'gzip': gzip.compress(body, compresslevel=9, mtime=0),
+        'etag': '"' + hashlib.sha256(body).hexdigest()[:20] + '"',
+    }
+
+
+def _load(path: str, stamp: Tuple[Any, ...], manifest_file: Optional[str]) -> Dict[str, Any]:
+    with open(path, 'rb') as f:
+        raw = f.read()
+    version = content_version(raw)
+    rounds = parse_words(raw)
+    manifest = read_manifest(manifest_file, version)
+    bundles = None
+    if manifest is not None:
+        version = manifest['version']
+        audio = manifest.get('audio', {})
+        for rows in rounds.values():
+            for row in rows:
+                row['audio_path'] = audio.get(row['audio_path'], row['audio_path'])
+        bundles = {r: {'bundle': entry['bundle'], 'pack': entry['pack']}
+                   for r, entry in manifest.get('rounds', {}).items()}
+    variants = {'all': _variant(version, rounds, bundles)}
+    for round_number in ROUNDS:
+        variants[round_number] = _variant(version, {round_number: rounds[round_number]}, bundles)
+    return {'path': path, 'stamp': stamp, 'version': version, 'manifest': manifest,
+            'rounds': rounds, 'variants': variants}
+
+
+def get_words() -> Dict[str, Any]:
+    """Cached parse of the word file, reloaded when it or the asset manifest change."""
+    global _cache
+    path = words_csv_path()
+    stat = os.stat(path)
+    manifest_file = manifest_path()
+    stamp = (stat.st_size, stat.st_mtime_ns, _stamp(manifest_file))
+    cache = _cache
+    if cache is None or cache['path'] != path or cache['stamp'] != stamp:
+        with _cache_lock:
+            if _cache is None or _cache['path'] != path or _cache['stamp'] != stamp:
+                _cache = _load(path, stamp, manifest_file)
+            cache = _cache
+    return cache
+
+
+def invalidate() -> None:
+    """Drop the parsed word lists (next request re-reads the file)."""
+    global _cache
+    with _cache_lock:
+        _cache = None
+
+
+def gzip_enabled() -> bool:
+    return os.environ.get('WORDS_GZIP', '0').lower() in ('1', 'true', 'yes')
+
+
+def _header(headers: Optional[Dict[str, str]], name: str) -> str:
+    for key, value in (headers or {}).items():
+        if key.lower() == name:
+            return value or ''
+    return ''
+
+
+def words_response(params: Dict[str, Any], headers: Optional[Dict[str, str]]) -> Tuple[int, Dict[str, str], str, bool]:
+    """(status, headers, body, is_base64) for GET /words[?round=N]."""
+    round_number = str(params.get('round') or 'all')
+    cache = get_words()
+    if round_number not in cache['variants']:
+        raise ValueError(f"Unknown round: {round_number}")
+    variant = cache['variants'][round_number]
+
+    response_headers = {
+        'ETag': variant['etag'],
+        'Cache-Control': 'public, max-age=300',
+        'Vary': 'Accept-Encoding',
+        'X-Words-Version': cache['version'],
+    }
+    if_none_match = _header(headers, 'if-none-match')
+    if if_none_match and variant['etag'] in [tag.strip() for tag in if_none_match.split(',')]:
+        return 304, response_headers, '', False
+
+    response_headers['Content-Type'] = 'application/json; charset=utf-8'
+    if gzip_enabled() and 'gzip' in _header(headers, 'accept-encoding').lower():
+        response_headers['Content-Encoding'] = 'gzip'
+        return 200, response_headers, base64.b64encode(variant['gzip']).decode('ascii'), True
+    return 200, response_headers, variant['body'].decode('utf-8'), False
@@ -1,4 +1,5 @@
 import React, { createContext, useState, useContext, useEffect } from 'react';
+import { fetchWords } from '../utils/api';
 
 // --- CSV 파싱 함수 (여기로 이동) ---
 function parseCSV(csvText) {
@@ -32,20 +33,11 @@ function parseCSV(csvText) {
 }
 // ------------------------------
 
-// 1. Context 생성
-const ExperimentContext = createContext();
-
-// 2. Provider 컴포넌트 생성
-export const ExperimentProvider = ({ children }) => {
-  const [userId, setUserId] = useState(null);
-  const [currentRound, setCurrentRound] = useState(1);
-  const [wordList, setWordList] = useState({});
-  const [isLoadingWords, setIsLoadingWords] = useState(true);
-
-  useEffect(() => {
+// GET /words 를 사용할 수 없을 때의 대체 경로 (기존 CSV 로딩)
+function loadWordsFromCsv() {
     const CSV_PATH = '/words/words_data_test_full.csv';
     console.log("Attempting to load CSV from:", CSV_PATH);
-    fetch(CSV_PATH)
+    return fetch(CSV_PATH)
       .then(response => {
           if (!response.ok) {
               throw new Error(`Network response was not ok: ${response.statusText}`);
@@ -56,22 +48,53 @@ export const ExperimentProvider = ({ children }) => {
           console.log("CSV text loaded, length:", csvText.length);
           const parsedData = parseCSV(csvText);
           console.log("Total parsed words from CSV:", parsedData.length);
-          
+
           const wordsByRound = { 1: [], 2: [], 3: [] };
           parsedData.forEach(word => {
               const round = parseInt(word.round, 10);
               if (round === 1 || round === 2 || round === 3) {
                   wordsByRound[round].push(word);
-              } 
+              }
           });
+          return wordsByRound;
+      });
+}
 
+// 1. Context 생성
+const ExperimentContext = createContext();
+
+// 2. Provider 컴포넌트 생성
+export const ExperimentProvider = ({ children }) => {
+  const [userId, setUserId] = useState(null);
+  const [currentRound, setCurrentRound] = useState(1);
+  const [wordList, setWordList] = useState({});
+  const [isLoadingWords, setIsLoadingWords] = useState(true);
+
+  useEffect(() => {
+    // 1순위: 백엔드 GET /words (라운드별로 정리된 JSON, ETag/gzip 캐시)
+    // 실패 시: 기존처럼 CSV 전체를 받아 브라우저에서 파싱
+    fetchWords()
+      .then(data => {
+          const wordsByRound = {
+              1: data.rounds?.['1'] || [],
+              2: data.rounds?.['2'] || [],
+              3: data.rounds?.['3'] || [],
+          };
+          console.log(`Words loaded from API (version ${data.version})`);
+          return wordsByRound;
+      })
+      .catch(error => {
+          console.warn('GET /words failed, falling back to CSV:', error);
+          return loadWordsFromCsv();
+      })
+      .then(wordsByRound => {
           console.log("Words grouped by round:", wordsByRound);
-          setWordList(wordsByRound); 
+          setWordList(wordsByRound);
           setIsLoadingWords(false);
       })
       .catch(error => {
           console.error('Error fetching/parsing/grouping CSV in Context:', error);
-          setIsLoadingWords(false); 
+          setIsLoadingWords(false);
           setWordList({});
       });
   }, []);
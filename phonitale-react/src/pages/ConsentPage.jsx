@@ -4,7 +4,7 @@ import { useNavigate } from 'react-router-dom'; // 페이지 이동을 위해 
 import BlueButton from '../components/BlueButton';
 import MainLayout from '../components/MainLayout'; // MainLayout import
 import { useExperiment } from '../context/ExperimentContext'; // useExperiment 훅 임포트
-import { submitConsent } from '../utils/api'; // API 유틸리티 임포트
+import { submitConsent, startSession } from '../utils/api'; // API 유틸리티 임포트
 
 const { Title, Paragraph, Link } = Typography;
 
@@ -66,6 +66,7 @@ const ConsentPage = () => {
       sessionStorage.setItem('userName', formData.name);
       sessionStorage.setItem('userEmail', formData.email); // email 저장
       sessionStorage.setItem('consentTimestamp', response.consentTimestamp); // 시작 timestamp 저장
+      startSession(); // 새 세션 식별자 (제출 Idempotency-Key 에 포함)
       navigate('/instruction'); // 다음 페이지로 이동
 
     } catch (err) {
@@ -5,6 +5,7 @@ import MainLayout from '../components/MainLayout';
 import BlueButton from '../components/BlueButton';
 import { useExperiment } from '../context/ExperimentContext';
 import { submitResponse } from '../utils/api';
+import { audioUrl } from '../utils/assets';
 
 // --- Helper Functions (from original script) ---
 // CSV Parser
@@ -319,7 +320,7 @@ const LearningPage = () => {
         audioTimeoutRefs.current = [];
 
         if (currentWordData?.audio_path) {
-            const audioPath = `/${currentWordData.audio_path}`;
+            const audioPath = audioUrl(currentWordData.audio_path);
             const playAudio = () => {
                 try {
                     const audio = new Audio(audioPath);
@@ -5,6 +5,7 @@ import MainLayout from '../components/MainLayout';
 import BlueButton from '../components/BlueButton';
 import { useExperiment } from '../context/ExperimentContext';
 import { submitResponse } from '../utils/api'; // API 유틸리티 임포트
+import { audioUrl } from '../utils/assets';
 
 // --- Helper Functions (제거 또는 이동 필요) ---
 // parseCSV 및 shuffleArray 제거
@@ -108,7 +109,7 @@ const RecognitionPage = () => {
         audioTimeoutRefs.current = [];
 
         if (currentWordData?.audio_path) {
-            const audioPath = `/${currentWordData.audio_path}`; // public 폴더 기준 경로
+            const audioPath = audioUrl(currentWordData.audio_path); // public 폴더 기준 경로
             const playAudio = () => {
                 try {
                     const audio = new Audio(audioPath);
@@ -1,8 +1,9 @@
-import React from 'react';
+import React, { useEffect } from 'react';
 import { Typography, Space } from 'antd';
 import { useNavigate, useParams } from 'react-router-dom';
 import MainLayout from '../components/MainLayout';
 import BlueButton from '../components/BlueButton';
+import { prefetchRound } from '../utils/assets';
 
 const { Text } = Typography;
 
@@ -10,6 +11,11 @@ const RoundStartPage = () => {
   const navigate = useNavigate();
   const { roundNumber } = useParams(); // Get round number from URL parameter
 
+  useEffect(() => {
+    // 안내를 읽는 동안 이번 라운드의 단어/오디오 번들을 미리 받음
+    prefetchRound(roundNumber);
+  }, [roundNumber]);
+
   const handleStartClick = () => {
     navigate(`/round/${roundNumber}/learning/start`);
   };
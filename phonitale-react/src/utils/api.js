@@ -1,7 +1,28 @@
 // src/utils/api.js
 const API_BASE_URL = 'https://wstvol0isg.execute-api.us-east-2.amazonaws.com/dev'; // Lambda 함수 URL
 
-async function callApi(endpoint, method = 'POST', body = null) {
+// 같은 제출을 다시 보내면(재시도/중복 클릭) 서버가 첫 결과를 그대로 돌려주도록 하는 키
+// 헤더 값은 ASCII 만 허용되므로 인코딩 (서버는 키의 해시만 저장)
+const idempotencyKeyFor = (...parts) => encodeURIComponent(parts.map(p => String(p ?? '')).join('|'));
+
+const newIdempotencyKey = () => (
+    (typeof crypto !== 'undefined' && crypto.randomUUID)
+        ? crypto.randomUUID()
+        : `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`
+);
+
+// 세션(시도) 식별자: 동의 후 세션을 시작할 때 한 번 생성해 sessionStorage 에 보관
+// 제출 키에 포함되므로 같은 라운드를 새 세션에서 다시 하면 응답이 새로 기록됨
+// (키 마커는 24시간 유지되므로 세션 구분이 없으면 재시도 세션의 응답이 버려짐)
+export const startSession = () => {
+    const sessionId = newIdempotencyKey();
+    sessionStorage.setItem('sessionId', sessionId);
+    return sessionId;
+};
+
+const currentSessionId = () => sessionStorage.getItem('sessionId') || startSession();
+
+async function callApi(endpoint, method = 'POST', body = null, idempotencyKey = null) {
     const url = `${API_BASE_URL}${endpoint}`;
     const options = {
         method,
@@ -10,6 +31,9 @@ async function callApi(endpoint, method = 'POST', body = null) {
             // 필요에 따라 다른 헤더 추가 가능 (예: 인증 토큰)
         },
     };
+    if (idempotencyKey) {
+        options.headers['Idempotency-Key'] = idempotencyKey;
+    }
     if (body) {
         options.body = JSON.stringify(body);
     }
@@ -61,7 +85,9 @@ export const submitConsent = async (consentData) => {
 export const submitResponse = async (responseData) => {
     // responseData: { user, english_word, round_number, page_type, timestamp_in, timestamp_out, duration?, response?, usefulness?, coherence? }
     // duration은 선택적, Lambda에서 계산 가능
-    return callApi('/responses', 'POST', responseData);
+    // 한 세션 안에서 참가자·단어·페이지별 제출은 한 번뿐이므로 이 조합을 키로 사용 (재제출 시 첫 기록 유지)
+    const key = idempotencyKeyFor(currentSessionId(), responseData.user, responseData.round_number, responseData.english_word, responseData.page_type);
+    return callApi('/responses', 'POST', responseData, key);
 };
 
 export const submitTotalDuration = async (summaryData) => {
@@ -71,5 +97,26 @@ export const submitTotalDuration = async (summaryData) => {
         throw new Error("Invalid summary data for submitting final summary (email, name, page_type, test_end_timestamp required).");
     }
     // 엔드포인트는 /responses 유지
-    return callApi('/responses', 'POST', summaryData);
-}; 
\ No newline at end of file
+    const key = idempotencyKeyFor(currentSessionId(), summaryData.email, summaryData.name, summaryData.page_type);
+    return callApi('/responses', 'POST', summaryData, key);
+}; 
+export const submitResponsesBatch = async (responseList, idempotencyKey = newIdempotencyKey()) => {
+    // responseList: submitResponse 와 같은 형태의 객체 배열
+    // 결과: { succeeded, failed, results: [{ index, status, error?, retryable? }] } (일부 실패 시 HTTP 207)
+    // 같은 배치를 재전송할 때는 idempotencyKey 를 그대로 넘길 것 (실패 항목만 보낼 때는 새 키)
+    return callApi('/responses/batch', 'POST', { items: responseList }, idempotencyKey);
+};
+
+export const fetchUserResponses = async (userId, roundNumber = null, nextToken = null) => {
+    // 참가자의 저장된 응답 조회 (세션 재개/진행 확인용). 결과: { items, count, next_token }
+    const params = new URLSearchParams({ user: userId });
+    if (roundNumber !== null) params.set('round', String(roundNumber));
+    if (nextToken) params.set('next_token', nextToken);
+    return callApi(`/responses?${params.toString()}`, 'GET');
+};
+
+export const fetchWords = async (roundNumber = null) => {
+    // 라운드별 단어 목록 (필요한 컬럼만). 결과: { version, rounds: { '1': [...], ... }, bundles? }
+    const query = roundNumber !== null ? `?round=${roundNumber}` : '';
+    return callApi(`/words${query}`, 'GET');
+};
@@ -0,0 +1,59 @@
+// 라운드별 오디오 미리 받기 (backend/build_assets.py 가 만든 public/bundles/)
+// manifest 가 없으면 (빌드 전, 개발 서버 등) 기존처럼 public/ 의 개별 파일을 재생
+const MANIFEST_PATH = '/bundles/manifest.json';
+
+let manifestPromise = null;
+const roundPromises = {};
+const objectUrls = {}; // 해시된 경로 -> blob URL
+let audioPaths = {}; // CSV 의 audio_path -> 해시된 경로
+
+const loadManifest = () => {
+    if (!manifestPromise) {
+        // manifest 만 매번 확인 (나머지 파일은 이름이 내용 해시라 변경되지 않음)
+        manifestPromise = fetch(MANIFEST_PATH, { cache: 'no-cache' })
+            .then(response => (response.ok ? response.json() : null))
+            .then(manifest => {
+                audioPaths = manifest?.audio || {};
+                return manifest;
+            })
+            .catch(() => null);
+    }
+    return manifestPromise;
+};
+
+const fetchOk = async (path) => {
+    const response = await fetch(`/${path}`);
+    if (!response.ok) throw new Error(`${path}: ${response.status}`);
+    return response;
+};
+
+export const prefetchRound = (roundNumber) => {
+    // 라운드 시작 전에 단어 번들(JSON)과 오디오 묶음(bin) 두 번의 요청으로 받아 둠
+    const key = String(roundNumber);
+    if (!roundPromises[key]) {
+        roundPromises[key] = loadManifest().then(async (manifest) => {
+            const entry = manifest?.rounds?.[key];
+            if (!entry) return null;
+            const [bundle, pack] = await Promise.all([
+                fetchOk(entry.bundle).then(response => response.json()),
+                fetchOk(entry.pack).then(response => response.arrayBuffer()),
+            ]);
+            Object.entries(bundle.audio).forEach(([path, [offset, length]]) => {
+                const clip = new Blob([pack.slice(offset, offset + length)], { type: 'audio/mpeg' });
+                objectUrls[path] = URL.createObjectURL(clip);
+            });
+            return bundle;
+        }).catch(error => {
+            console.warn(`Round ${key} prefetch failed, audio loads per word:`, error);
+            delete roundPromises[key];
+            return null;
+        });
+    }
+    return roundPromises[key];
+};
+
+export const audioUrl = (audioPath) => {
+    // GET /words 는 manifest 가 있으면 이미 해시된 경로를 줌, CSV 대체 경로는 원래 경로
+    const path = audioPaths[audioPath] || audioPath;
+    return objectUrls[path] || `/${path}`;
+};